@@ -1454,6 +1454,7 @@ class CommandWorker(QThread):
         self.process = None
         self.frame_timer = QTimer()
         self.frame_timer.timeout.connect(self.check_for_frames)
+        self.last_preview_mtime = None
         
     def run(self):
         try:
@@ -1511,6 +1512,16 @@ class CommandWorker(QThread):
         try:
             # Look for frame files in output_frames directory
             output_frames_dir = os.path.join(self.working_directory, "output_frames")
+
+            # video.py --preview keeps a single small preview image up to date
+            preview_path = os.path.join(output_frames_dir, "preview.jpg")
+            if os.path.exists(preview_path):
+                mtime = os.path.getmtime(preview_path)
+                if mtime != self.last_preview_mtime:
+                    self.last_preview_mtime = mtime
+                    self.signals.frame_detected.emit(preview_path)
+                return
+
             if os.path.exists(output_frames_dir):
                 frame_files = [f for f in os.listdir(output_frames_dir) if f.startswith("frame_") and f.endswith(".jpg")]
                 if frame_files:
@@ -3272,6 +3283,10 @@ class SafeVisionGUI(QMainWindow):
             if self.delete_frames_toggle.isChecked() and self.enable_df_param.isChecked():
                 command.append("-df")
                 
+            # Live preview image (output_frames/preview.jpg) instead of per-frame dumps
+            if not script_path.endswith('.exe'):
+                command.append("--preview")
+                
             # Enhanced blur
             if self.enhanced_blur_toggle.isChecked():
                 command.append("--enhanced-blur")
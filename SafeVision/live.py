@@ -12,6 +12,7 @@ import argparse
 import time
 import threading
 import queue
+from collections import deque
 from pathlib import Path
 import urllib.request
 import math
@@ -148,13 +149,6 @@ def _get_onnx_status():
 # Try initial import (silent)
 _safe_import_onnx()
 
-# Try to import PIL for image processing
-try:
-    from PIL import Image
-except ImportError:
-    print("Warning: PIL not available, some features may not work")
-    Image = None
-
 # Configuration for live processing - tweak these if you want different behavior
 LIVE_CONFIG = {
     # Blur settings - these are the kernel sizes for different blur levels
@@ -168,6 +162,7 @@ LIVE_CONFIG = {
     'GENITALIA_THRESHOLD': 0.6,              # Even higher bar for the explicit stuff
     'FACE_THRESHOLD': 0.7,                   # High threshold to avoid false face positives
     'TARGET_SIZE': 320,                       # Model input size - don't change this
+    'DYNAMIC_INPUT_SIZES': (320, 256, 192),   # Sizes to fall back to if the model takes any input size
     'FPS_TARGET': 30,                         # What we're aiming for performance-wise
     
     # UI colors (BGR format because OpenCV is weird like that)
@@ -182,7 +177,20 @@ LIVE_CONFIG = {
     
     # Performance tweaks
     'SKIP_FRAMES': 2,                         # Skip frames to keep things running smooth
-    'BUFFER_SIZE': 3,                         # How many frames to queue up
+    'LATENCY_SMOOTHING': 0.1,                 # How fast the latency readout follows new samples
+    'ADAPTIVE_SKIP': True,                    # Skip more frames (and shrink detection input) when we can't keep up
+    'MAX_SKIP_FRAMES': 8,                     # Never skip more than this many frames between detections
+    'ADAPT_WINDOW': 15,                       # Detections between controller adjustments
+    'MAX_DETECTION_LATENCY_MS': 250,          # Shrink the detection input when results lag their frame by more than this
+    
+    # Multi-source monitoring (--sources)
+    'MOSAIC_TILE_SIZE': (480, 270),           # Size of each feed in the monitor grid
+    'STATS_INTERVAL': 1.0,                    # Seconds between per-source FPS updates
+    
+    # Gender/age result cache - faces are matched across frames by box overlap
+    'FACE_CACHE_IOU': 0.4,                    # Overlap needed to call it the same face
+    'FACE_CACHE_REFRESH': 30,                 # Re-analyze a tracked face after this many frames
+    'FACE_CACHE_MAX_IDLE': 15,                # Forget a face not seen for this many frames
     
     # Alert system 
     'ALERT_THRESHOLD': 3,                     # How many frames in a row before we scream
@@ -190,7 +198,11 @@ LIVE_CONFIG = {
     
     # Recording stuff
     'AUTO_RECORD_ON_DETECTION': False,       # Auto-record when shit goes down
-    'RECORD_BUFFER_SECONDS': 5,              # Buffer time for recordings
+    'RECORD_BUFFER_SECONDS': 5,              # Pre-roll kept in memory so auto-records include the lead-up
+    'RECORD_BUFFER_MAX_MB': 64,              # Hard cap on pre-roll memory, whatever the resolution
+    'RECORD_JPEG_QUALITY': 85,               # Pre-roll frames are kept as JPEGs to stay small
+    'RECORD_QUEUE_SIZE': 8,                  # Frames waiting for the encoder before we start dropping
+    'RECORD_FPS': 20.0,                      # Recording frame rate when we can't measure one
     
     # Privacy and masking options
     'PRIVACY_MODE': False,                    # Black screen mode for the paranoid
@@ -302,6 +314,48 @@ def _ensure_opset15(original_path: str) -> str:
         onnx.save(converted, conv_path)
     return conv_path
 
+def _ensure_dynamic_batch(model_path: str) -> str:
+    """
+    Make a copy of the model whose batch dimension is symbolic, so frames from several
+    sources can go through one session.run. Reshape targets that hard-code a leading
+    batch of 1 are rewritten to 0 (copy the input dimension).
+    """
+    base, ext = os.path.splitext(model_path)
+    dyn_path = f"{base}_dynbatch{ext}"
+    if os.path.exists(dyn_path):
+        return dyn_path
+
+    numpy_helper = onnx.numpy_helper
+    model = onnx.load(model_path)
+    graph = model.graph
+    for value in list(graph.input) + list(graph.output):
+        dims = value.type.tensor_type.shape.dim
+        if dims:
+            dims[0].ClearField("dim_value")
+            dims[0].dim_param = "batch"
+
+    # Intermediate shapes were inferred for batch 1; drop them and let the runtime re-infer
+    del graph.value_info[:]
+
+    reshape_shapes = {node.input[1] for node in graph.node if node.op_type == "Reshape" and len(node.input) > 1}
+    for init in graph.initializer:
+        if init.name in reshape_shapes:
+            shape = numpy_helper.to_array(init).copy()
+            if shape.ndim == 1 and shape.size > 1 and shape[0] == 1:
+                shape[0] = 0
+                init.CopyFrom(numpy_helper.from_array(shape, init.name))
+    for node in graph.node:
+        if node.op_type == "Constant" and node.output[0] in reshape_shapes:
+            for attr in node.attribute:
+                if attr.name == "value":
+                    shape = numpy_helper.to_array(attr.t).copy()
+                    if shape.ndim == 1 and shape.size > 1 and shape[0] == 1:
+                        shape[0] = 0
+                        attr.t.CopyFrom(numpy_helper.from_array(shape, attr.t.name))
+
+    onnx.save(model, dyn_path)
+    return dyn_path
+
 def _read_frame_live(frame, target_size=320):
     """Optimized frame preprocessing for live processing."""
     img_height, img_width = frame.shape[:2]
@@ -341,54 +395,64 @@ def _read_frame_live(frame, target_size=320):
 
     return image_data, resize_factor, pad_left, pad_top
 
+def _detection_input_sizes(dim):
+    """Input sizes the detector can run at - a fixed-size model only has the one."""
+    if isinstance(dim, int):
+        return [dim]
+    return list(LIVE_CONFIG['DYNAMIC_INPUT_SIZES'])
+
+# Per-class lookup tables for postprocessing, keyed on the thresholds they were built from
+_class_tables = {}
+
+def _get_class_tables():
+    """Threshold/severity arrays indexed by class id - built once, rebuilt only if thresholds change."""
+    key = (LIVE_CONFIG['DETECTION_THRESHOLD'], LIVE_CONFIG['EXPOSED_THRESHOLD'],
+           LIVE_CONFIG['GENITALIA_THRESHOLD'], LIVE_CONFIG['FACE_THRESHOLD'])
+    tables = _class_tables.get(key)
+    if tables is None:
+        severities = [get_content_severity(label) for label in __labels]
+        tables = {
+            'thresholds': np.array([get_confidence_threshold(label) for label in __labels], dtype=np.float32),
+            'critical': np.array([severity == 'CRITICAL' for severity in severities]),
+            'high': np.array([severity == 'HIGH' for severity in severities]),
+            'severities': severities,
+        }
+        _class_tables.clear()
+        _class_tables[key] = tables
+    return tables
+
 def _postprocess_live(output, resize_factor, pad_left, pad_top):
     """Enhanced postprocessing for live detection with severity-based filtering."""
     outputs = np.transpose(np.squeeze(output[0]))
-    rows = outputs.shape[0]
-    boxes = []
-    scores = []
-    class_ids = []
-
-    for i in range(rows):
-        classes_scores = outputs[i][4:]
-        max_score = np.amax(classes_scores)
-        class_id = np.argmax(classes_scores)
-        
-        # Get the label for this detection
-        if class_id < len(__labels):
-            label = __labels[class_id]
-            required_threshold = get_confidence_threshold(label)
-            
-            # Only accept detections that meet the severity-specific threshold
-            if max_score >= required_threshold:
-                x, y, w, h = outputs[i][0], outputs[i][1], outputs[i][2], outputs[i][3]
-                left = int(round((x - w * 0.5 - pad_left) * resize_factor))
-                top = int(round((y - h * 0.5 - pad_top) * resize_factor))
-                width = int(round(w * resize_factor))
-                height = int(round(h * resize_factor))
-                
-                # Additional validation for critical content
-                severity = get_content_severity(label)
-                if severity == 'CRITICAL':
-                    # Extra strict validation for genitalia detection
-                    # Require even higher confidence and reasonable bounding box size
-                    min_box_area = 500  # Minimum area to avoid tiny false positives
-                    box_area = width * height
-                    if max_score >= 0.7 and box_area >= min_box_area:
-                        class_ids.append(class_id)
-                        scores.append(max_score)
-                        boxes.append([left, top, width, height])
-                elif severity == 'HIGH':
-                    # Strict validation for high-severity content
-                    if max_score >= 0.5:
-                        class_ids.append(class_id)
-                        scores.append(max_score)
-                        boxes.append([left, top, width, height])
-                else:
-                    # Standard validation for other content
-                    class_ids.append(class_id)
-                    scores.append(max_score)
-                    boxes.append([left, top, width, height])
+    tables = _get_class_tables()
+
+    classes_scores = outputs[:, 4:]
+    class_ids = np.argmax(classes_scores, axis=1)
+    max_scores = classes_scores[np.arange(len(class_ids)), class_ids]
+
+    # Drop anything outside our label set, then apply the severity-specific threshold
+    keep = class_ids < len(__labels)
+    class_ids, max_scores, outputs = class_ids[keep], max_scores[keep], outputs[keep]
+    keep = max_scores >= tables['thresholds'][class_ids]
+    class_ids, max_scores, outputs = class_ids[keep], max_scores[keep], outputs[keep]
+
+    x, y, w, h = outputs[:, 0], outputs[:, 1], outputs[:, 2], outputs[:, 3]
+    left = np.round((x - w * 0.5 - pad_left) * resize_factor).astype(np.int64)
+    top = np.round((y - h * 0.5 - pad_top) * resize_factor).astype(np.int64)
+    width = np.round(w * resize_factor).astype(np.int64)
+    height = np.round(h * resize_factor).astype(np.int64)
+
+    # Critical content (genitalia) needs even higher confidence and a reasonable box size
+    # to avoid tiny false positives; high-severity content needs at least 0.5
+    min_box_area = 500
+    critical = tables['critical'][class_ids]
+    high = tables['high'][class_ids]
+    keep = ((~critical | ((max_scores >= 0.7) & (width * height >= min_box_area)))
+            & (~high | (max_scores >= 0.5)))
+
+    class_ids = class_ids[keep]
+    scores = max_scores[keep].tolist()
+    boxes = np.stack([left, top, width, height], axis=1)[keep].tolist()
 
     # Use stricter NMS parameters for better filtering
     indices = cv2.dnn.NMSBoxes(boxes, scores, 0.3, 0.4)
@@ -396,24 +460,21 @@ def _postprocess_live(output, resize_factor, pad_left, pad_top):
     detections = []
     if len(indices) > 0:
         for i in indices:
-            box = boxes[i]
-            score = scores[i]
             class_id = class_ids[i]
-            label = __labels[class_id]
-            severity = get_content_severity(label)
-            
             detections.append({
-                "class": label,
-                "score": float(score),
-                "box": box,
-                "severity": severity
+                "class": __labels[class_id],
+                "score": float(scores[i]),
+                "box": boxes[i],
+                "severity": tables['severities'][class_id]
             })
 
     return detections
 
 class LiveNudeDetector:
-    def __init__(self, providers=None):
+    def __init__(self, providers=None, batched=False):
         print("Initializing Live Nude Detector...")
+        self.input_sizes = [LIVE_CONFIG['TARGET_SIZE']]
+        self.max_batch = 1  # Frames per session.run; None = any batch size
         
         # Force ONNX Runtime import with retry
         print("Attempting to import ONNX Runtime...")
@@ -485,11 +546,17 @@ class LiveNudeDetector:
             # Get model input info
             inp = self.onnx_session.get_inputs()[0]
             self.input_name = inp.name
-            self.input_width = inp.shape[2]
-            self.input_height = inp.shape[3]
+            self.input_sizes = _detection_input_sizes(inp.shape[2])
+            self.input_width = self.input_sizes[0]
+            self.input_height = self.input_sizes[0] if not isinstance(inp.shape[3], int) else inp.shape[3]
             
             print(f"Model input: {self.input_name}, shape: {inp.shape}")
             
+            # Multi-source mode wants several frames per run - swap in a dynamic-batch copy if needed
+            self.max_batch = inp.shape[0] if isinstance(inp.shape[0], int) else None
+            if batched and self.max_batch is not None:
+                self._load_dynamic_batch_model(model_to_load, available_providers)
+            
             # Initialize exception rules to None (will be loaded separately)
             self.blur_exception_rules = None
             
@@ -508,6 +575,26 @@ class LiveNudeDetector:
             self.input_height = 320
             self.blur_exception_rules = None
 
+    def _load_dynamic_batch_model(self, model_path, providers):
+        """Switch to a dynamic-batch copy of the model, but only if it matches the original for a batch of 2."""
+        try:
+            dyn_path = _ensure_dynamic_batch(model_path)
+            session = onnxruntime.InferenceSession(dyn_path, providers=providers)
+            
+            rng = np.random.default_rng(0)
+            sample = rng.random((2, 3, self.input_width, self.input_height), dtype=np.float32)
+            batched = session.run(None, {self.input_name: sample})[0]
+            single = np.concatenate([self.onnx_session.run(None, {self.input_name: sample[i:i + 1]})[0] for i in range(2)])
+            if batched.shape != single.shape or not np.allclose(batched, single, rtol=1e-3, atol=1e-3):
+                raise ValueError("batched output differs from per-frame output")
+        except Exception as e:
+            print(f"Batched inference unavailable, running {self.max_batch} frame(s) per call: {e}")
+            return
+        
+        self.onnx_session = session
+        self.max_batch = None
+        print(f"Using dynamic-batch model: {dyn_path}")
+
     def auto_load_blur_rules(self):
         """Automatically load blur exception rules if file exists in same directory."""
         rule_file_path = "BlurException.rule"
@@ -564,15 +651,15 @@ class LiveNudeDetector:
             return True  # Default behavior if no rules loaded
         return self.blur_exception_rules.get(label, True)
 
-    def detect_frame(self, frame):
-        """Detect nudity in a single frame."""
+    def detect_frame(self, frame, input_size=None):
+        """Detect nudity in a single frame (optionally at a smaller input size for dynamic models)."""
         if self.onnx_session is None:
             # ONNX Runtime not available, return empty detections
             return []
             
         try:
             preprocessed_image, resize_factor, pad_left, pad_top = _read_frame_live(
-                frame, self.input_width
+                frame, input_size or self.input_width
             )
             outputs = self.onnx_session.run(None, {self.input_name: preprocessed_image})
             detections = _postprocess_live(outputs, resize_factor, pad_left, pad_top)
@@ -581,6 +668,33 @@ class LiveNudeDetector:
             print(f"Detection error: {e}")
             return []
 
+    def detect_frames(self, frames, input_size=None):
+        """Detect on several frames (any mix of sizes) with as few session.run calls as the model allows."""
+        if self.onnx_session is None or not frames:
+            return [[] for _ in frames]
+        
+        size = input_size or self.input_width
+        detections = []
+        try:
+            step = self.max_batch or len(frames)
+            for start in range(0, len(frames), step):
+                chunk = frames[start:start + step]
+                # Every frame is letterboxed on its own, so they stack fine whatever their size
+                batch = np.empty((len(chunk), 3, size, size), dtype=np.float32)
+                letterbox = []
+                for i, frame in enumerate(chunk):
+                    image_data, resize_factor, pad_left, pad_top = _read_frame_live(frame, size)
+                    batch[i] = image_data[0]
+                    letterbox.append((resize_factor, pad_left, pad_top))
+                
+                output = self.onnx_session.run(None, {self.input_name: batch})[0]
+                for i, (resize_factor, pad_left, pad_top) in enumerate(letterbox):
+                    detections.append(_postprocess_live([output[i]], resize_factor, pad_left, pad_top))
+            return detections
+        except Exception as e:
+            print(f"Batch detection error: {e}")
+            return [[] for _ in frames]
+
     def apply_censoring(self, frame, detections):
         """Apply real-time censoring to detected regions with severity-based processing."""
         censored_frame = frame.copy()
@@ -709,6 +823,13 @@ class GenderAgeDetector:
             self.input_name = inp.name
             self.input_shape = inp.shape
             
+            # Faces per session.run (None = any) and the size every face gets resized to
+            self.max_batch = inp.shape[0] if isinstance(inp.shape[0], int) else None
+            height = inp.shape[2] if isinstance(inp.shape[2], int) else 224
+            width = inp.shape[3] if isinstance(inp.shape[3], int) else 224
+            self.face_size = (width, height)
+            self._batch_buffer = np.empty((0, 3, height, width), dtype=np.float32)
+            
             print(f"Gender/Age Detector initialized successfully!")
             print(f"Input shape: {self.input_shape}")
             
@@ -721,32 +842,25 @@ class GenderAgeDetector:
         e_x = np.exp(x - np.max(x, axis=1, keepdims=True))
         return e_x / e_x.sum(axis=1, keepdims=True)
 
+    def _fill_face(self, out, face_region):
+        """Resize a BGR face crop straight into one CHW slot of the input tensor (RGB, 0-1)."""
+        width, height = self.face_size
+        shrinking = face_region.shape[1] > width or face_region.shape[0] > height
+        resized = cv2.resize(face_region, (width, height),
+                             interpolation=cv2.INTER_AREA if shrinking else cv2.INTER_LANCZOS4)
+        # BGR -> RGB and HWC -> CHW in a single strided copy
+        out[...] = resized[:, :, ::-1].transpose(2, 0, 1)
+        out *= 1.0 / 255.0
+
     def preprocess_face(self, face_region):
         """Preprocess face region for gender/age detection."""
         if self.session is None:
             return None
             
         try:
-            # Convert BGR to RGB
-            face_rgb = cv2.cvtColor(face_region, cv2.COLOR_BGR2RGB)
-            
-            # Convert to PIL Image
-            pil_image = Image.fromarray(face_rgb)
-            
-            # Resize to model input size (typically 224x224)
-            target_size = (224, 224)
-            pil_image = pil_image.resize(target_size, Image.LANCZOS)
-            
-            # Convert to numpy array and normalize
-            img_array = np.array(pil_image).astype(np.float32)
-            img_array = img_array / 255.0
-            
-            # Convert HWC to CHW format
-            img_array = np.transpose(img_array, (2, 0, 1))
-            
-            # Add batch dimension
-            img_array = np.expand_dims(img_array, axis=0)
-            
+            width, height = self.face_size
+            img_array = np.empty((1, 3, height, width), dtype=np.float32)
+            self._fill_face(img_array[0], face_region)
             return img_array
             
         except Exception as e:
@@ -755,41 +869,379 @@ class GenderAgeDetector:
 
     def predict_gender_age(self, face_region):
         """Predict gender and age from face region."""
-        if self.session is None:
-            return None, None, 0.0, 0.0
+        return self.predict_gender_age_batch([face_region])[0]
+
+    def predict_gender_age_batch(self, face_regions):
+        """
+        Predict gender and age for several faces with one session.run (or one per
+        max_batch faces for fixed-batch models). Returns a
+        (gender, age, gender_conf, age_conf) tuple per face.
+        """
+        failed = (None, None, 0.0, 0.0)
+        if self.session is None or not face_regions:
+            return [failed] * len(face_regions)
             
         try:
-            # Preprocess the face
-            input_tensor = self.preprocess_face(face_region)
-            if input_tensor is None:
-                return None, None, 0.0, 0.0
+            # Grow the preallocated input tensor only when a frame has more faces than ever before
+            count = len(face_regions)
+            if self._batch_buffer.shape[0] < count:
+                width, height = self.face_size
+                self._batch_buffer = np.empty((count, 3, height, width), dtype=np.float32)
+            for i, face_region in enumerate(face_regions):
+                self._fill_face(self._batch_buffer[i], face_region)
             
-            # Run inference
-            outputs = self.session.run(None, {self.input_name: input_tensor})
-            
-            # Process outputs (assuming gender is first output, age is second)
-            if len(outputs) >= 2:
-                gender_logits = outputs[0]
-                age_prediction = outputs[1]
+            step = self.max_batch or count
+            results = []
+            for start in range(0, count, step):
+                end = min(count, start + step)
+                outputs = self.session.run(None, {self.input_name: self._batch_buffer[start:end]})
                 
-                # Process gender prediction
-                gender_probs = self.softmax(gender_logits)
-                gender_idx = int(np.argmax(gender_probs))
-                gender_label = "Female" if gender_idx == 1 else "Male"
-                gender_conf = float(gender_probs[0][gender_idx])
+                # Process outputs (assuming gender is first output, age is second)
+                if len(outputs) < 2:
+                    print("Unexpected model output format")
+                    return [failed] * count
                 
-                # Process age prediction
-                age_estimate = float(age_prediction[0][0])
-                age_conf = 1.0  # Age is regression, so confidence is always high
-                
-                return gender_label, age_estimate, gender_conf, age_conf
-            else:
-                print("Unexpected model output format")
-                return None, None, 0.0, 0.0
+                gender_probs = self.softmax(outputs[0])
+                gender_idx = np.argmax(gender_probs, axis=1)
+                for row, idx in enumerate(gender_idx):
+                    results.append((
+                        "Female" if idx == 1 else "Male",
+                        float(outputs[1][row][0]),
+                        float(gender_probs[row][idx]),
+                        1.0,  # Age is regression, so confidence is always high
+                    ))
+            return results
                 
         except Exception as e:
             print(f"Error in gender/age prediction: {e}")
-            return None, None, 0.0, 0.0
+            return [failed] * len(face_regions)
+
+class FaceAttributeCache:
+    """Keeps gender/age results per face track (matched by box overlap) so faces aren't re-analyzed every frame."""
+
+    def __init__(self, iou_threshold=0.4, refresh_frames=30, max_idle_frames=15):
+        self.iou_threshold = iou_threshold
+        self.refresh_frames = refresh_frames
+        self.max_idle_frames = max_idle_frames
+        self.tracks = []
+
+    @staticmethod
+    def _iou(box1, box2):
+        x1, y1, w1, h1 = box1
+        x2, y2, w2, h2 = box2
+        inter_w = min(x1 + w1, x2 + w2) - max(x1, x2)
+        inter_h = min(y1 + h1, y2 + h2) - max(y1, y2)
+        if inter_w <= 0 or inter_h <= 0:
+            return 0.0
+        inter = inter_w * inter_h
+        return inter / float(w1 * h1 + w2 * h2 - inter)
+
+    def match(self, box, frame_index):
+        """Track for this face box - the best-overlapping one not already claimed this frame, or a new one."""
+        best, best_iou = None, self.iou_threshold
+        for track in self.tracks:
+            if track['last_seen'] == frame_index:
+                continue
+            iou = self._iou(box, track['box'])
+            if iou >= best_iou:
+                best, best_iou = track, iou
+        if best is None:
+            best = {'result': None, 'updated': None}
+            self.tracks.append(best)
+        best['box'] = box
+        best['last_seen'] = frame_index
+        return best
+
+    def is_fresh(self, track, frame_index):
+        return track['result'] is not None and frame_index - track['updated'] < self.refresh_frames
+
+    def update(self, track, result, frame_index):
+        track['result'] = result
+        track['updated'] = frame_index
+
+    def prune(self, frame_index):
+        self.tracks = [track for track in self.tracks
+                       if frame_index - track['last_seen'] <= self.max_idle_frames]
+
+class AdaptiveRateController:
+    """Feedback loop that picks how often (and at what size) to run detection.
+
+    Detection runs on its own thread, so the loop is fed per-detection numbers, not display
+    frame times. When one inference no longer fits between two detections (`skip + 1` frames
+    at the target FPS) it detects less often. When results arrive too long after their frame
+    was captured (over `latency_budget`), or the rate is already at `max_skip`, it shrinks the
+    detection input. Spare headroom undoes those steps in reverse order, but never goes past
+    the configured starting point.
+
+    live.py and live_streamer.py each carry an identical copy of this class (the scripts are
+    standalone) - change both together.
+    """
+
+    def __init__(self, target_fps, min_skip=0, max_skip=8, input_sizes=(320,),
+                 adapt_rate=True, adapt_resolution=True, window=15, latency_budget=None):
+        self.frame_budget = 1.0 / max(1, target_fps)
+        self.min_skip = min_skip
+        self.max_skip = max(min_skip, max_skip)
+        self.skip = min_skip
+        self.input_sizes = list(input_sizes)
+        self.size_index = 0
+        self.adapt_rate = adapt_rate
+        self.adapt_resolution = adapt_resolution and len(self.input_sizes) > 1
+        self.window = window
+        self.latency_budget = latency_budget
+        self.inference_time = 0.0
+        self.latency = 0.0
+        self._detections_since_check = 0
+
+    @staticmethod
+    def _smooth(current, sample, alpha=0.2):
+        return sample if current == 0.0 else current + alpha * (sample - current)
+
+    @property
+    def input_size(self):
+        return self.input_sizes[self.size_index]
+
+    @property
+    def detection_budget(self):
+        """How long one inference may take at the current rate."""
+        return self.frame_budget * (self.skip + 1)
+
+    def record_inference(self, seconds, latency=None):
+        """Feed in how long one detection took and, if known, how old its frame was when the
+        result was ready. Adjusts every `window` detections."""
+        self.inference_time = self._smooth(self.inference_time, seconds)
+        if latency is not None:
+            self.latency = self._smooth(self.latency, latency)
+        self._detections_since_check += 1
+        if self._detections_since_check >= self.window:
+            self._detections_since_check = 0
+            slow = self.inference_time > self.detection_budget * 1.1
+            late = self.latency_budget is not None and self.latency > self.latency_budget * 1.1
+            if slow or late:
+                self._degrade(slow)
+            else:
+                self._recover()
+
+    def _degrade(self, slow):
+        # Detecting less often only helps when the model can't keep up with the rate - it
+        # doesn't make a single result arrive any sooner
+        if slow and self.adapt_rate and self.skip < self.max_skip:
+            self.skip += 1
+        elif self.adapt_resolution and self.size_index < len(self.input_sizes) - 1:
+            self.size_index += 1
+
+    def _recover(self):
+        if self.adapt_resolution and self.size_index > 0:
+            # Inference cost grows roughly with the input area
+            larger = self.inference_time * (self.input_sizes[self.size_index - 1] / self.input_size) ** 2
+            fits_latency = (self.latency_budget is None or
+                            self.latency - self.inference_time + larger <= self.latency_budget * 0.9)
+            if larger <= self.detection_budget * 0.9 and fits_latency:
+                self.size_index -= 1
+                return
+        if self.adapt_rate and self.skip > self.min_skip:
+            # Only detect more often if one inference still fits in the shorter gap
+            if self.inference_time <= self.frame_budget * self.skip * 0.9:
+                self.skip -= 1
+
+    def describe(self):
+        """Short description of the current operating point for the overlay."""
+        text = f"AI every {self.skip + 1} frame{'s' if self.skip else ''}"
+        if len(self.input_sizes) > 1:
+            text += f" @ {self.input_size}px"
+        return text
+
+class LatestFrame:
+    """Single-slot frame holder - the capture thread overwrites it, readers only ever see the newest frame."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._frame_id = 0
+        self._capture_time = 0.0
+        self._closed = False
+
+    def put(self, frame):
+        """Replace the held frame with a freshly captured one."""
+        with self._cond:
+            self._frame_id += 1
+            self._frame = frame
+            self._capture_time = time.perf_counter()
+            self._cond.notify_all()
+
+    def get_newer(self, min_id, timeout=1.0):
+        """Wait for a frame with id >= min_id and return (frame_id, capture_time, frame).
+
+        Returns None on timeout or once the slot is closed.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._closed or self._frame_id >= min_id, timeout):
+                return None
+            if self._closed:
+                return None
+            return self._frame_id, self._capture_time, self._frame
+
+    def close(self):
+        """Wake up everyone waiting on the slot so they can quit."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def frame_id(self):
+        return self._frame_id
+
+class FrameRecorder:
+    """
+    Recording on its own encoder thread. The display loop only hands frames over through a
+    bounded queue (dropping if the encoder falls behind), so it never waits on disk. While not
+    recording, the last RECORD_BUFFER_SECONDS are kept as JPEGs in a ring capped at
+    RECORD_BUFFER_MAX_MB, and written out first when a recording starts with pre-roll.
+    """
+
+    def __init__(self, preroll_seconds=0):
+        self.preroll_seconds = preroll_seconds
+        self.preroll_max_bytes = int(LIVE_CONFIG['RECORD_BUFFER_MAX_MB'] * 1024 * 1024)
+        self.preroll = deque()  # (timestamp, jpeg bytes)
+        self.preroll_bytes = 0
+        self.jpeg_params = [cv2.IMWRITE_JPEG_QUALITY, LIVE_CONFIG['RECORD_JPEG_QUALITY']]
+        
+        # Frames go through a bounded queue, start/stop through an unbounded one so the display
+        # loop never blocks on either. Each command carries the number of frames pushed before
+        # it, which lets the encoder apply it at the right point in the frame stream.
+        self.queue = queue.Queue(maxsize=LIVE_CONFIG['RECORD_QUEUE_SIZE'])
+        self.control = queue.Queue()
+        self.pushed = 0
+        self.writer = None
+        self.recording = False
+        self.dropped = 0
+        self.written = 0
+        self.thread = threading.Thread(target=self._encoder_worker)
+        self.thread.daemon = True
+        self.thread.start()
+
+    @property
+    def wants_frames(self):
+        return self.recording or self.preroll_seconds > 0
+
+    def push(self, frame):
+        """Hand a finished display frame to the encoder - never blocks. The frame must not be modified afterwards."""
+        if not self.wants_frames:
+            return
+        try:
+            self.queue.put_nowait((self.pushed, time.perf_counter(), frame))
+            self.pushed += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self, filename, fps, preroll=False):
+        """Start a recording with the next pushed frame - never blocks."""
+        self.recording = True
+        self.control.put_nowait((self.pushed, "start", filename, fps, preroll))
+
+    def stop(self):
+        """Stop after the frames pushed so far - never blocks."""
+        self.recording = False
+        self.control.put_nowait((self.pushed, "stop"))
+
+    def close(self):
+        """Finish pending frames, close any open file and stop the encoder thread."""
+        self.stop()
+        self.queue.put(None)
+        self.thread.join(timeout=10)
+        if self.thread.is_alive():
+            print("Warning: Recording thread didn't stop cleanly")
+
+    def _buffer(self, timestamp, frame):
+        ok, jpeg = cv2.imencode(".jpg", frame, self.jpeg_params)
+        if not ok:
+            return
+        self.preroll.append((timestamp, jpeg))
+        self.preroll_bytes += jpeg.nbytes
+        # Trim by age and by memory, whichever bites first
+        while self.preroll and (timestamp - self.preroll[0][0] > self.preroll_seconds
+                                or self.preroll_bytes > self.preroll_max_bytes):
+            self.preroll_bytes -= self.preroll.popleft()[1].nbytes
+
+    def _open(self, filename, fps, preroll, frame_size):
+        # The pre-roll timestamps tell us the real frame rate - better than guessing
+        if preroll and len(self.preroll) > 1:
+            span = self.preroll[-1][0] - self.preroll[0][0]
+            if span > 0:
+                fps = (len(self.preroll) - 1) / span
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        self.writer = cv2.VideoWriter(filename, fourcc, fps, frame_size)
+        print(f"Started recording: {filename}")
+        if preroll and self.preroll:
+            print(f"Writing {len(self.preroll)} pre-roll frames ({self.preroll_bytes / 1024 / 1024:.1f} MB)")
+            for _, jpeg in self.preroll:
+                frame = cv2.imdecode(jpeg, cv2.IMREAD_COLOR)
+                if frame.shape[1::-1] == frame_size:
+                    self.writer.write(frame)
+                    self.written += 1
+        self.preroll.clear()
+        self.preroll_bytes = 0
+
+    def _encoder_worker(self):
+        pending = None  # Start command waiting for its first frame (we need the frame size)
+        commands = deque()
+        consumed = 0  # Frames taken off the queue so far
+
+        def apply_commands(upto):
+            # Run the commands issued before frame number `upto` was pushed
+            nonlocal pending
+            while True:
+                try:
+                    commands.append(self.control.get_nowait())
+                except queue.Empty:
+                    break
+            while commands and (upto is None or commands[0][0] <= upto):
+                command = commands.popleft()
+                if command[1] == "start":
+                    pending = command[2:]
+                else:
+                    pending = None
+                    if self.writer:
+                        self.writer.release()
+                        self.writer = None
+                        print(f"Recording stopped ({self.written} frames written, {self.dropped} dropped)")
+                    self.written = 0
+                    self.dropped = 0
+
+        while True:
+            try:
+                # Time out now and then so a stop still closes the file when no frames come
+                item = self.queue.get(timeout=0.1)
+            except queue.Empty:
+                item = False
+            try:
+                if item is None:
+                    apply_commands(None)
+                    break
+                if item is False:
+                    apply_commands(consumed)
+                    continue
+                seq, timestamp, frame = item
+                apply_commands(seq)
+                consumed = seq + 1
+                if pending:
+                    self._open(*pending, frame_size=(frame.shape[1], frame.shape[0]))
+                    pending = None
+                if self.writer:
+                    self.writer.write(frame)
+                    self.written += 1
+                elif self.preroll_seconds > 0:
+                    self._buffer(timestamp, frame)
+            except Exception as e:
+                print(f"Error in recording thread: {e}")
+        
+        if self.writer:
+            self.writer.release()
+            self.writer = None
 
 class LiveProcessor:
     def __init__(self, camera_id=0, show_boxes=True, privacy_mode=False, rules_file=None, enable_gender_detection=False):
@@ -834,7 +1286,11 @@ class LiveProcessor:
         self.exposed_streak = 0
         self.last_alert_time = 0
         self.recording = False
-        self.video_writer = None
+        
+        # Encoder thread + pre-roll ring (only kept when auto-record could need it)
+        self.recorder = FrameRecorder(
+            preroll_seconds=LIVE_CONFIG['RECORD_BUFFER_SECONDS'] if LIVE_CONFIG['AUTO_RECORD_ON_DETECTION'] else 0
+        )
         
         # Performance tracking
         self.fps_counter = 0
@@ -843,45 +1299,93 @@ class LiveProcessor:
         
         # Gender/Age detection results storage
         self.face_analysis_results = {}
+        self.face_cache = FaceAttributeCache(
+            iou_threshold=LIVE_CONFIG['FACE_CACHE_IOU'],
+            refresh_frames=LIVE_CONFIG['FACE_CACHE_REFRESH'],
+            max_idle_frames=LIVE_CONFIG['FACE_CACHE_MAX_IDLE'],
+        )
         
-        # Threading for async processing
-        self.processing_queue = queue.Queue(maxsize=LIVE_CONFIG['BUFFER_SIZE'])
-        self.result_queue = queue.Queue(maxsize=LIVE_CONFIG['BUFFER_SIZE'])
+        # Threading for async processing - capture and detection each get their own thread,
+        # and they only ever hand over the newest frame (no queues for stale frames to pile up in)
+        self.latest_frame = LatestFrame()
+        self.capture_thread = None
         self.processing_thread = None
         self.running = False
+        
+        # Newest detection results, guarded by a lock since the display loop reads them
+        self.detection_lock = threading.Lock()
+        self.detection_frame_id = 0
+        
+        # Detection rate/size controller - backs off when the model can't keep up or results lag
+        self.rate_controller = AdaptiveRateController(
+            LIVE_CONFIG['FPS_TARGET'],
+            min_skip=LIVE_CONFIG['SKIP_FRAMES'],
+            max_skip=LIVE_CONFIG['MAX_SKIP_FRAMES'],
+            input_sizes=self.detector.input_sizes,
+            adapt_rate=LIVE_CONFIG['ADAPTIVE_SKIP'],
+            adapt_resolution=LIVE_CONFIG['ADAPTIVE_SKIP'],
+            window=LIVE_CONFIG['ADAPT_WINDOW'],
+            latency_budget=LIVE_CONFIG['MAX_DETECTION_LATENCY_MS'] / 1000,
+        )
+        
+        # Capture-to-detection latency (how old a frame is when its detections are ready)
+        self.detection_latency = 0.0
+        self.detection_latency_max = 0.0
+        self.detection_lag_frames = 0
 
     def start_processing_thread(self):
-        """Start background processing thread for better performance."""
+        """Start the capture and detection threads for better performance."""
         self.running = True
+        self.capture_thread = threading.Thread(target=self._capture_worker)
+        self.capture_thread.daemon = True
+        self.capture_thread.start()
         self.processing_thread = threading.Thread(target=self._processing_worker)
         self.processing_thread.daemon = True
         self.processing_thread.start()
 
+    def _capture_worker(self):
+        """Read the camera as fast as it delivers and keep only the newest frame."""
+        print("Capture thread started")
+        
+        while self.running:
+            ret, frame = self.cap.read()
+            if not ret:
+                print("Failed to read frame from camera - maybe it got unplugged?")
+                break
+            # cap.read() hands back a fresh array every time, so no copy is needed here
+            self.latest_frame.put(frame)
+        
+        self.latest_frame.close()
+        print("Capture thread stopped")
+
     def _processing_worker(self):
-        """Background worker for frame processing - keeps things running smooth."""
+        """Background worker for frame processing - always grabs the newest frame, never a queued one."""
         print("Background processing thread started")
+        last_id = 0
         
         while self.running:
             try:
-                # Get a frame to process (wait up to 1 second)
-                frame = self.processing_queue.get(timeout=1.0)
-                if frame is None:
-                    print("Got shutdown signal in processing thread")
-                    break
+                # Wait for a frame at least `skip` frames newer than the last one we looked at
+                latest = self.latest_frame.get_newer(last_id + self.rate_controller.skip + 1)
+                if latest is None:
+                    if self.latest_frame.closed:
+                        break
+                    continue
+                frame_id, capture_time, frame = latest
+                last_id = frame_id
                 
                 # Do the actual detection work
-                detections = self.detector.detect_frame(frame)
+                start = time.perf_counter()
+                detections = self.detector.detect_frame(frame, self.rate_controller.input_size)
+                finished = time.perf_counter()
+                latency = finished - capture_time
+                self.rate_controller.record_inference(finished - start, latency)
                 
-                # Put results back (non-blocking to avoid hanging)
-                try:
-                    self.result_queue.put((frame, detections), timeout=0.1)
-                except queue.Full:
-                    # Queue is full, just skip this result - no big deal
-                    pass
+                with self.detection_lock:
+                    self.last_detections = detections
+                    self.detection_frame_id = frame_id
+                    self.update_latency(latency)
                 
-            except queue.Empty:
-                # No frames to process right now, just keep going
-                continue
             except Exception as e:
                 print(f"Error in background processing: {e}")
                 # Don't crash the thread, just keep going
@@ -889,6 +1393,15 @@ class LiveProcessor:
         
         print("Background processing thread stopped")
 
+    def update_latency(self, latency):
+        """Fold one capture-to-detection sample (seconds) into the running stats."""
+        if self.detection_latency == 0.0:
+            self.detection_latency = latency
+        else:
+            alpha = LIVE_CONFIG['LATENCY_SMOOTHING']
+            self.detection_latency += alpha * (latency - self.detection_latency)
+        self.detection_latency_max = max(self.detection_latency_max, latency)
+
     def calculate_fps(self):
         """Calculate actual processing FPS."""
         self.fps_counter += 1
@@ -899,11 +1412,12 @@ class LiveProcessor:
             self.fps_start_time = current_time
 
     def analyze_faces_for_gender_age(self, frame, detections):
-        """Analyze detected faces for gender and age."""
+        """Analyze detected faces for gender and age - cached per tracked face, new ones in one batch."""
         if not self.enable_gender_detection or self.gender_detector is None or self.gender_detector.session is None:
             return {}
         
         face_results = {}
+        pending = []
         
         for i, detection in enumerate(detections):
             label = detection["class"]
@@ -913,6 +1427,12 @@ class LiveProcessor:
                 box = detection["box"]
                 x, y, w, h = box[0], box[1], box[2], box[3]
                 
+                # Same person as a recent frame? Reuse what we already worked out
+                track = self.face_cache.match(box, self.frame_count)
+                if self.face_cache.is_fresh(track, self.frame_count):
+                    face_results[f"face_{i}"] = dict(track['result'], box=box, detected_label=label)
+                    continue
+                
                 # Extract face region with some padding
                 padding = 20
                 x1 = max(0, x - padding)
@@ -924,19 +1444,25 @@ class LiveProcessor:
                 face_region = frame[y1:y2, x1:x2]
                 
                 if face_region.size > 0:
-                    # Predict gender and age
-                    gender, age, gender_conf, age_conf = self.gender_detector.predict_gender_age(face_region)
-                    
-                    if gender is not None and age is not None:
-                        face_results[f"face_{i}"] = {
-                            "box": box,
-                            "gender": gender,
-                            "age": int(round(age)),
-                            "gender_confidence": gender_conf,
-                            "age_confidence": age_conf,
-                            "detected_label": label
-                        }
+                    pending.append((i, box, label, track, face_region))
+        
+        # Predict gender and age for every new/stale face in one go
+        if pending:
+            predictions = self.gender_detector.predict_gender_age_batch([face for *_, face in pending])
+            for (i, box, label, track, _), (gender, age, gender_conf, age_conf) in zip(pending, predictions):
+                if gender is not None and age is not None:
+                    result = {
+                        "box": box,
+                        "gender": gender,
+                        "age": int(round(age)),
+                        "gender_confidence": gender_conf,
+                        "age_confidence": age_conf,
+                        "detected_label": label
+                    }
+                    self.face_cache.update(track, result, self.frame_count)
+                    face_results[f"face_{i}"] = result
         
+        self.face_cache.prune(self.frame_count)
         return face_results
 
     def check_alert_conditions(self, detections):
@@ -976,25 +1502,19 @@ class LiveProcessor:
         
         return False, ""
 
-    def start_recording(self, filename=None):
-        """Start recording video."""
+    def start_recording(self, filename=None, preroll=False):
+        """Start recording video (with the buffered lead-up first if preroll is set)."""
         if filename is None:
             timestamp = time.strftime("%Y%m%d_%H%M%S")
             filename = f"live_recording_{timestamp}.mp4"
         
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        self.video_writer = cv2.VideoWriter(filename, fourcc, 20.0, 
-                                          (self.frame_width, self.frame_height))
+        self.recorder.start(filename, self.actual_fps or LIVE_CONFIG['RECORD_FPS'], preroll=preroll)
         self.recording = True
-        print(f"Started recording: {filename}")
 
     def stop_recording(self):
         """Stop recording video."""
-        if self.video_writer:
-            self.video_writer.release()
-            self.video_writer = None
+        self.recorder.stop()
         self.recording = False
-        print("Recording stopped")
 
     def draw_status_overlay(self, frame):
         """Draw status information overlay."""
@@ -1002,7 +1522,7 @@ class LiveProcessor:
         
         # Status background
         overlay = frame.copy()
-        overlay_height = 200 if self.enable_gender_detection else 150
+        overlay_height = 250 if self.enable_gender_detection else 200
         cv2.rectangle(overlay, (10, 10), (400, overlay_height), (0, 0, 0), -1)
         cv2.addWeighted(overlay, 0.7, frame, 0.3, 0, frame)
         
@@ -1011,6 +1531,8 @@ class LiveProcessor:
             f"FPS: {self.actual_fps:.1f}",
             f"Frame: {self.frame_count}",
             f"Detections: {len(self.last_detections)}",
+            f"Latency: {self.detection_latency * 1000:.0f} ms ({self.detection_lag_frames} frames behind)",
+            f"AI: {self.rate_controller.describe()}",
             f"Exposed Streak: {self.exposed_streak}",
             f"Recording: {'ON' if self.recording else 'OFF'}"
         ]
@@ -1056,38 +1578,33 @@ class LiveProcessor:
         cv2.namedWindow('Live Nudity Detection', cv2.WINDOW_NORMAL)
         cv2.resizeWindow('Live Nudity Detection', 1280, 720)  # Start with a decent size
         
-        # Start background processing thread
+        # Start the capture and detection threads
         self.start_processing_thread()
+        shown_id = 0
         
         try:
             while True:
-                ret, frame = self.cap.read()
-                if not ret:
-                    print("Failed to read frame from camera - maybe it got unplugged?")
-                    break
+                # Always display the newest captured frame
+                latest = self.latest_frame.get_newer(shown_id + 1)
+                if latest is None:
+                    if self.latest_frame.closed:
+                        break
+                    continue
+                shown_id, _, frame = latest
                 
-                self.frame_count += 1
+                self.frame_count = shown_id
                 self.calculate_fps()
                 
-                # Only process every few frames to keep things smooth
-                if self.frame_count % (LIVE_CONFIG['SKIP_FRAMES'] + 1) == 0:
-                    # Add frame to processing queue (don't block if queue is full)
-                    if not self.processing_queue.full():
-                        self.processing_queue.put(frame.copy())
-                
-                # Try to get processed results (non-blocking)
-                try:
-                    processed_frame, detections = self.result_queue.get_nowait()
-                    self.last_detections = detections
-                except queue.Empty:
-                    # No new results yet, use what we had before
+                # Pair it with whatever detections are freshest right now
+                with self.detection_lock:
                     detections = self.last_detections
-                    processed_frame = frame
+                    self.detection_lag_frames = shown_id - self.detection_frame_id
                 
                 # Handle the actual censoring/display logic
                 try:
                     if not self.privacy_mode:
-                        display_frame = self.detector.apply_censoring(frame, detections) if self.show_boxes else frame
+                        # Copy when not censoring - the detection thread may still be reading this frame
+                        display_frame = self.detector.apply_censoring(frame, detections) if self.show_boxes else frame.copy()
                     else:
                         # Privacy mode - black screen with status only
                         display_frame = np.zeros_like(frame)
@@ -1111,14 +1628,13 @@ class LiveProcessor:
                     # Auto-record if we're set up for that
                     if (LIVE_CONFIG['AUTO_RECORD_ON_DETECTION'] and 
                         len(detections) > 0 and not self.recording):
-                        self.start_recording()
+                        self.start_recording(preroll=True)
                     
                     # Draw all the status info on screen
                     self.draw_status_overlay(display_frame)
                     
-                    # Record frame if we're recording
-                    if self.recording and self.video_writer:
-                        self.video_writer.write(display_frame)
+                    # Hand the frame to the recorder (recording or pre-roll) - never blocks
+                    self.recorder.push(display_frame)
                     
                     # Actually show the frame
                     cv2.imshow('Live Nudity Detection', display_frame)
@@ -1164,23 +1680,27 @@ class LiveProcessor:
         print("Cleaning up...")
         self.running = False
         
-        # Stop processing thread nicely
-        if self.processing_thread:
-            # Signal thread to stop
-            try:
-                self.processing_queue.put(None)  # This tells the thread to quit
-                self.processing_thread.join(timeout=5)  # Wait for it to finish
-                if self.processing_thread.is_alive():
-                    print("Warning: Background thread didn't stop cleanly")
-            except Exception as e:
-                print(f"Error stopping processing thread: {e}")
+        # Stop the worker threads nicely
+        self.latest_frame.close()  # This wakes the detection thread so it can quit
+        for name, thread in (("Capture", self.capture_thread), ("Background", self.processing_thread)):
+            if thread:
+                try:
+                    thread.join(timeout=5)  # Wait for it to finish
+                    if thread.is_alive():
+                        print(f"Warning: {name} thread didn't stop cleanly")
+                except Exception as e:
+                    print(f"Error stopping {name.lower()} thread: {e}")
         
-        # Stop recording if it's running
-        if self.recording:
-            try:
-                self.stop_recording()
-            except Exception as e:
-                print(f"Error stopping recording: {e}")
+        if self.detection_latency_max:
+            print(f"Capture-to-detection latency: {self.detection_latency * 1000:.0f} ms average, "
+                  f"{self.detection_latency_max * 1000:.0f} ms worst")
+        
+        # Stop recording if it's running and let the encoder finish what's queued
+        try:
+            self.recording = False
+            self.recorder.close()
+        except Exception as e:
+            print(f"Error stopping recording: {e}")
         
         # Release the camera properly
         if self.cap:
@@ -1202,12 +1722,297 @@ class LiveProcessor:
         # Give things a moment to settle
         time.sleep(0.5)
 
+class FrameSource:
+    """One monitored feed (camera index, stream URL or looped video file) with its own capture thread."""
+
+    def __init__(self, source, frame_ready):
+        self.name = str(source)
+        self.source = int(source) if str(source).isdigit() else source
+        self.is_file = isinstance(self.source, str) and os.path.isfile(self.source)
+        self.frame_ready = frame_ready  # Shared event that wakes up the inference thread
+        
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Cannot open source {self.name}")
+        
+        # Video files stand in for live feeds, so play them back at their own frame rate
+        fps = self.cap.get(cv2.CAP_PROP_FPS) if self.is_file else 0
+        self.frame_interval = 1.0 / fps if fps and fps > 0 else 0.0
+        
+        self.latest_frame = LatestFrame()
+        self.thread = None
+        self.running = False
+        
+        # Latest results, written by the inference thread
+        self.detections = []
+        self.detected_id = 0
+        
+        # Stats
+        self.detected = 0
+        self.dropped = 0
+        self.latency = 0.0
+        self.latency_max = 0.0
+        self.capture_fps = 0.0
+        self.detect_fps = 0.0
+        self._rate_mark = (time.perf_counter(), 0, 0)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._capture_worker)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _capture_worker(self):
+        next_due = time.perf_counter()
+        while self.running:
+            ret, frame = self.cap.read()
+            if not ret and self.is_file:
+                # Loop the file so it keeps behaving like a live feed
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = self.cap.read()
+            if not ret:
+                print(f"[{self.name}] Source stopped delivering frames")
+                break
+            
+            if self.frame_interval:
+                next_due += self.frame_interval
+                delay = next_due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_due = time.perf_counter()
+            
+            self.latest_frame.put(frame)
+            self.frame_ready.set()
+        
+        self.latest_frame.close()
+
+    def take_new_frame(self):
+        """Newest frame the inference thread hasn't seen yet, or None."""
+        return self.latest_frame.get_newer(self.detected_id + 1, timeout=0)
+
+    def record_detections(self, frame_id, capture_time, detections, finished):
+        """Store results for frame_id and count the frames that were never looked at."""
+        self.dropped += frame_id - self.detected_id - 1
+        self.detected_id = frame_id
+        self.detections = detections
+        self.detected += 1
+        
+        latency = finished - capture_time
+        if self.latency == 0.0:
+            self.latency = latency
+        else:
+            self.latency += LIVE_CONFIG['LATENCY_SMOOTHING'] * (latency - self.latency)
+        self.latency_max = max(self.latency_max, latency)
+
+    def update_rates(self):
+        """Refresh capture/detection FPS once per STATS_INTERVAL."""
+        now = time.perf_counter()
+        mark_time, mark_captured, mark_detected = self._rate_mark
+        elapsed = now - mark_time
+        if elapsed >= LIVE_CONFIG['STATS_INTERVAL']:
+            captured = self.latest_frame.frame_id
+            self.capture_fps = (captured - mark_captured) / elapsed
+            self.detect_fps = (self.detected - mark_detected) / elapsed
+            self._rate_mark = (now, captured, self.detected)
+
+    def drop_rate(self):
+        captured = self.detected + self.dropped
+        return self.dropped / captured if captured else 0.0
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=5)
+        self.cap.release()
+
+class MultiSourceMonitor:
+    """Watch several feeds at once - one capture thread per source, one shared batched inference thread."""
+
+    def __init__(self, sources, show_boxes=True, rules_file=None):
+        self.show_boxes = show_boxes
+        
+        # One detector (one ORT session) for every feed
+        self.detector = LiveNudeDetector(batched=True)
+        if rules_file:
+            self.detector.load_exception_rules(rules_file)
+        
+        self.frame_ready = threading.Event()
+        self.sources = [FrameSource(source, self.frame_ready) for source in sources]
+        for source in self.sources:
+            print(f"Source {source.name} opened" + (" (looping file)" if source.is_file else ""))
+        
+        self.running = False
+        self.inference_thread = None
+        self.last_alert_time = {}
+        
+        # Batch stats
+        self.ticks = 0
+        self.batched_frames = 0
+        self.tick_time = 0.0
+
+    def _inference_worker(self):
+        """Each tick, run the newest unseen frame of every source through one batched detection."""
+        print("Shared inference thread started")
+        
+        while self.running:
+            self.frame_ready.wait(timeout=1.0)
+            self.frame_ready.clear()
+            
+            batch = []
+            for source in self.sources:
+                latest = source.take_new_frame()
+                if latest is not None:
+                    batch.append((source, latest))
+            if not batch:
+                if all(source.latest_frame.closed for source in self.sources):
+                    break
+                continue
+            
+            try:
+                start = time.perf_counter()
+                results = self.detector.detect_frames([frame for _, (_, _, frame) in batch])
+                finished = time.perf_counter()
+            except Exception as e:
+                print(f"Error in shared inference: {e}")
+                continue
+            
+            for (source, (frame_id, capture_time, _)), detections in zip(batch, results):
+                source.record_detections(frame_id, capture_time, detections, finished)
+            
+            self.ticks += 1
+            self.batched_frames += len(batch)
+            if self.tick_time == 0.0:
+                self.tick_time = finished - start
+            else:
+                self.tick_time += LIVE_CONFIG['LATENCY_SMOOTHING'] * (finished - start - self.tick_time)
+        
+        print("Shared inference thread stopped")
+
+    def render_tile(self, source):
+        """Censored, downscaled view of one source with its stats burned in."""
+        tile_width, tile_height = LIVE_CONFIG['MOSAIC_TILE_SIZE']
+        latest = source.latest_frame.get_newer(1, timeout=0)
+        if latest is None:
+            tile = np.zeros((tile_height, tile_width, 3), dtype=np.uint8)
+            cv2.putText(tile, f"{source.name}: no signal", (10, tile_height // 2),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+            return tile
+        
+        frame = latest[2]
+        tile = cv2.resize(frame, (tile_width, tile_height), interpolation=cv2.INTER_AREA)
+        
+        # Censor at tile resolution - much cheaper than censoring every full-size feed
+        detections = source.detections
+        if self.show_boxes and detections:
+            scale_x = tile_width / frame.shape[1]
+            scale_y = tile_height / frame.shape[0]
+            scaled = []
+            for detection in detections:
+                x, y, w, h = detection["box"]
+                scaled.append(dict(detection, box=[int(x * scale_x), int(y * scale_y),
+                                                   max(1, int(w * scale_x)), max(1, int(h * scale_y))]))
+            tile = self.detector.apply_censoring(tile, scaled)
+        
+        # Red border (and a console alert, with cooldown) for critical/high content
+        if any(d.get("severity") in ("CRITICAL", "HIGH") for d in detections):
+            cv2.rectangle(tile, (0, 0), (tile_width - 1, tile_height - 1), (0, 0, 255), 6)
+            now = time.time()
+            if now - self.last_alert_time.get(source.name, 0) > LIVE_CONFIG['ALERT_COOLDOWN']:
+                self.last_alert_time[source.name] = now
+                print(f"ALERT [{source.name}]: {len(detections)} regions detected")
+        
+        source.update_rates()
+        stats = (f"{source.name} | cap {source.capture_fps:.1f} / ai {source.detect_fps:.1f} fps | "
+                 f"{source.latency * 1000:.0f} ms | drop {source.drop_rate() * 100:.0f}%")
+        cv2.rectangle(tile, (0, 0), (tile_width, 24), (0, 0, 0), -1)
+        cv2.putText(tile, stats, (6, 17), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1)
+        return tile
+
+    def render_mosaic(self):
+        """Lay all source tiles out in a grid."""
+        tile_width, tile_height = LIVE_CONFIG['MOSAIC_TILE_SIZE']
+        cols = math.ceil(math.sqrt(len(self.sources)))
+        rows = math.ceil(len(self.sources) / cols)
+        mosaic = np.zeros((rows * tile_height, cols * tile_width, 3), dtype=np.uint8)
+        for i, source in enumerate(self.sources):
+            row, col = divmod(i, cols)
+            mosaic[row * tile_height:(row + 1) * tile_height,
+                   col * tile_width:(col + 1) * tile_width] = self.render_tile(source)
+        return mosaic
+
+    def run(self):
+        """Start every feed and the shared inference thread, then show the grid until Q."""
+        print(f"Monitoring {len(self.sources)} sources - B=Toggle Boxes, Q=Quit")
+        cv2.namedWindow('Live Nudity Detection - Multi', cv2.WINDOW_NORMAL)
+        
+        self.running = True
+        for source in self.sources:
+            source.start()
+        self.inference_thread = threading.Thread(target=self._inference_worker)
+        self.inference_thread.daemon = True
+        self.inference_thread.start()
+        
+        frame_time = 1.0 / LIVE_CONFIG['FPS_TARGET']
+        try:
+            while self.running:
+                start = time.perf_counter()
+                if all(source.latest_frame.closed for source in self.sources):
+                    print("All sources stopped")
+                    break
+                
+                cv2.imshow('Live Nudity Detection - Multi', self.render_mosaic())
+                
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'):
+                    break
+                elif key == ord('b'):
+                    self.show_boxes = not self.show_boxes
+                    print(f"Detection boxes: {'ON' if self.show_boxes else 'OFF'}")
+                
+                elapsed = time.perf_counter() - start
+                if elapsed < frame_time:
+                    time.sleep(frame_time - elapsed)
+        except KeyboardInterrupt:
+            print("\nUser hit Ctrl+C - shutting down gracefully...")
+        finally:
+            self.cleanup()
+
+    def print_stats(self):
+        """Per-source summary - handy for sizing how many feeds a box can take."""
+        if self.ticks:
+            print(f"Shared inference: {self.ticks} batches, {self.batched_frames / self.ticks:.1f} frames/batch, "
+                  f"{self.tick_time * 1000:.0f} ms/batch")
+        for source in self.sources:
+            print(f"  {source.name}: {source.detected} frames detected, {source.dropped} dropped "
+                  f"({source.drop_rate() * 100:.0f}%), latency {source.latency * 1000:.0f} ms avg / "
+                  f"{source.latency_max * 1000:.0f} ms worst")
+
+    def cleanup(self):
+        print("Cleaning up...")
+        self.running = False
+        for source in self.sources:
+            source.running = False
+            source.latest_frame.close()
+        self.frame_ready.set()
+        if self.inference_thread:
+            self.inference_thread.join(timeout=5)
+        for source in self.sources:
+            source.stop()
+        try:
+            cv2.destroyAllWindows()
+        except Exception as e:
+            print(f"Error closing windows: {e}")
+        self.print_stats()
+
 def parse_args():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description="Live Nudity Detection and Censoring")
     
     parser.add_argument("-c", "--camera", type=int, default=0,
                        help="Camera ID (default: 0)")
+    parser.add_argument("-s", "--sources", nargs="+", default=None,
+                       help="Monitor several feeds at once: camera IDs, stream URLs (rtsp://...) or video files (looped)")
     parser.add_argument("-r", "--rules", type=str, default=None,
                        help="Path to blur exception rules file (optional - auto-loads BlurException.rule if exists)")
     parser.add_argument("-g", "--gender-detection", action="store_true",
@@ -1228,6 +2033,8 @@ def parse_args():
                        help="Consecutive detections needed for alert")
     parser.add_argument("--skip-frames", type=int, default=2,
                        help="Process every nth frame (for performance)")
+    parser.add_argument("--no-adaptive", action="store_true",
+                       help="Keep --skip-frames fixed instead of backing off under load")
     
     return parser.parse_args()
 
@@ -1248,6 +2055,7 @@ def main():
     LIVE_CONFIG['AUTO_RECORD_ON_DETECTION'] = args.auto_record
     LIVE_CONFIG['ALERT_THRESHOLD'] = args.alert_threshold
     LIVE_CONFIG['SKIP_FRAMES'] = args.skip_frames
+    LIVE_CONFIG['ADAPTIVE_SKIP'] = not args.no_adaptive
     
     # Parse mask color
     if args.solid_color:
@@ -1260,6 +2068,12 @@ def main():
     
     try:
         print("Starting up live detection system...")
+        if args.sources:
+            # Multi-source mode - every feed shares one batched detector
+            monitor = MultiSourceMonitor(args.sources, show_boxes=not args.no_boxes, rules_file=args.rules)
+            monitor.run()
+            return
+        
         print(f"Using camera {args.camera}")
         if args.rules:
             print(f"Using blur rules from: {args.rules}")
@@ -184,6 +184,15 @@ STREAMER_CONFIG = {
     'MULTI_THREADING': True,
     'FRAME_SKIP_ON_LOAD': True,           # Skip frames when system is loaded
     'DYNAMIC_QUALITY': True,              # Lower quality when performance drops
+    'MAX_FRAME_SKIP': 8,                  # Most frames to skip between AI runs under load
+    'MAX_AI_LATENCY_MS': 250,             # Lower the detection size when results lag their frame by more than this
+    'DYNAMIC_INPUT_SIZES': (320, 256, 192),  # Detection sizes to step through (dynamic-size models only)
+    
+    # Screen change detection (SCREEN / WINDOW input)
+    'CHANGE_DETECTION': True,             # Only run AI on the parts of the desktop that changed
+    'CHANGE_GRID': (16, 9),               # Tiles compared between frames (columns, rows)
+    'CHANGE_THRESHOLD': 12,               # Gray-level difference that marks a tile as changed
+    'CHANGE_FULL_FRAME_RATIO': 0.5,       # Detect the whole frame once this much of it changed
 }
 
 # Content labels with streaming safety levels
@@ -249,128 +258,286 @@ def get_streaming_threshold(label):
     else:
         return STREAMER_CONFIG['DETECTION_THRESHOLD']
 
+# Per-class lookup tables for postprocessing, keyed on the thresholds they were built from
+_streaming_class_tables = {}
+
+def get_streaming_class_tables():
+    """Threshold/severity arrays indexed by class id - built once, rebuilt only if thresholds change."""
+    key = (STREAMER_CONFIG['DETECTION_THRESHOLD'], STREAMER_CONFIG['EXPOSED_THRESHOLD'],
+           STREAMER_CONFIG['GENITALIA_THRESHOLD'], STREAMER_CONFIG['FACE_THRESHOLD'])
+    tables = _streaming_class_tables.get(key)
+    if tables is None:
+        severities = [get_streaming_safety(label) for label in STREAMING_LABELS]
+        tables = {
+            'thresholds': np.array([get_streaming_threshold(label) for label in STREAMING_LABELS], dtype=np.float32),
+            'critical': np.array([severity == 'CRITICAL' for severity in severities]),
+            'high': np.array([severity == 'HIGH' for severity in severities]),
+            'severities': severities,
+        }
+        _streaming_class_tables.clear()
+        _streaming_class_tables[key] = tables
+    return tables
+
+def iou_matrix(boxes1, boxes2):
+    """IoU of every box in boxes1 (N, 4) against every box in boxes2 (M, 4), boxes as x, y, w, h."""
+    boxes1 = np.asarray(boxes1, dtype=np.float64).reshape(-1, 4)
+    boxes2 = np.asarray(boxes2, dtype=np.float64).reshape(-1, 4)
+    x1, y1, w1, h1 = [c[:, None] for c in boxes1.T]
+    x2, y2, w2, h2 = [c[None, :] for c in boxes2.T]
+    
+    inter_w = np.clip(np.minimum(x1 + w1, x2 + w2) - np.maximum(x1, x2), 0, None)
+    inter_h = np.clip(np.minimum(y1 + h1, y2 + h2) - np.maximum(y1, y2), 0, None)
+    inter_area = inter_w * inter_h
+    union_area = w1 * h1 + w2 * h2 - inter_area
+    return np.where(union_area > 0, inter_area / np.where(union_area > 0, union_area, 1), 0.0)
+
+def boxes_overlap(box, region):
+    """Whether an x, y, w, h box touches an (x0, y0, x1, y1) region."""
+    x, y, w, h = box
+    return x < region[2] and x + w > region[0] and y < region[3] and y + h > region[1]
+
+def linear_assignment(cost):
+    """
+    Minimum-cost assignment for a rectangular cost matrix (Hungarian method with
+    shortest augmenting paths, vectorized per row). Returns matched (rows, cols).
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    if n == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    
+    # 1-based potentials/matching as in the classic formulation; column 0 is a virtual start
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    match = np.zeros(m + 1, dtype=int)  # match[j] = row assigned to column j (0 = none)
+    way = np.zeros(m + 1, dtype=int)
+    for i in range(1, n + 1):
+        match[0] = i
+        j0 = 0
+        min_slack = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = match[j0]
+            free = ~used
+            free[0] = False
+            slack = cost[i0 - 1] - u[i0] - v[1:]
+            better = free[1:] & (slack < min_slack[1:])
+            min_slack[1:][better] = slack[better]
+            way[1:][better] = j0
+            candidates = np.where(free, min_slack, np.inf)
+            j1 = int(np.argmin(candidates))
+            delta = candidates[j1]
+            u[match[used]] += delta
+            v[used] -= delta
+            min_slack[free] -= delta
+            j0 = j1
+            if match[j0] == 0:
+                break
+        # Flip the augmenting path
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+    
+    cols = np.nonzero(match[1:])[0]
+    rows = match[1:][cols] - 1
+    if transposed:
+        rows, cols = cols, rows
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
 class DetectionTracker:
-    """Tracks detections across frames to maintain consistent blur."""
+    """
+    Tracks detections across frames to maintain consistent blur.
+    
+    Every track carries a constant-velocity Kalman filter over (cx, cy, w, h), so predict()
+    can move the blur with the content on frames where the AI doesn't run. Tracks live in
+    flat arrays and detections are assigned with an IoU cost matrix + optimal assignment.
+    """
+    
+    # Kalman noise, relative to box size (as in SORT/DeepSORT)
+    POSITION_STD = 1.0 / 20
+    VELOCITY_STD = 1.0 / 160
     
     def __init__(self, max_age=30, iou_threshold=0.3, confidence_decay=0.95):
-        self.max_age = max_age  # Maximum frames to keep a track alive
+        self.max_age = max_age  # Maximum AI updates to keep an unmatched track alive
         self.iou_threshold = iou_threshold  # IoU threshold for matching detections
-        self.confidence_decay = confidence_decay  # How much confidence decays per frame
-        
-        self.tracks = []  # List of active tracks
-        self.next_id = 0  # Next track ID
-        
-    def calculate_iou(self, box1, box2):
-        """Calculate Intersection over Union of two bounding boxes."""
-        x1_1, y1_1, w1, h1 = box1
-        x1_2, y1_2, w2, h2 = box2
-        
-        x2_1, y2_1 = x1_1 + w1, y1_1 + h1
-        x2_2, y2_2 = x1_2 + w2, y1_2 + h2
+        self.confidence_decay = confidence_decay  # How much confidence decays per update
         
-        # Calculate intersection
-        xi1 = max(x1_1, x1_2)
-        yi1 = max(y1_1, y1_2)
-        xi2 = min(x2_1, x2_2)
-        yi2 = min(y2_1, y2_2)
+        # Constant-velocity model: state (cx, cy, w, h, vcx, vcy, vw, vh), one frame per step
+        self._motion = np.eye(8)
+        self._motion[:4, 4:] = np.eye(4)
+        self._observe = np.eye(4, 8)
         
-        if xi2 <= xi1 or yi2 <= yi1:
-            return 0.0
-        
-        inter_area = (xi2 - xi1) * (yi2 - yi1)
-        
-        # Calculate union
-        box1_area = w1 * h1
-        box2_area = w2 * h2
-        union_area = box1_area + box2_area - inter_area
-        
-        if union_area <= 0:
-            return 0.0
-        
-        return inter_area / union_area
+        self.next_id = 0  # Next track ID
+        self.clear()
+    
+    def clear(self):
+        """Clear all tracks."""
+        self.state = np.zeros((0, 8))
+        self.covariance = np.zeros((0, 8, 8))
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.confidence = np.zeros(0)
+        self.age = np.zeros(0, dtype=np.int64)
+        self.labels = np.zeros(0, dtype=object)
+        self.severities = np.zeros(0, dtype=object)
+        self.active_tracks = []
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def _size_scale(self, wh):
+        """(N, 4) per-dimension scale (w, h, w, h) used for the noise terms."""
+        wh = np.maximum(wh, 1.0)
+        return np.concatenate([wh, wh], axis=1)
+    
+    def boxes(self):
+        """Current track boxes as (N, 4) float x, y, w, h."""
+        cx, cy = self.state[:, 0], self.state[:, 1]
+        w, h = np.maximum(self.state[:, 2], 1.0), np.maximum(self.state[:, 3], 1.0)
+        return np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+    
+    def predict(self):
+        """Move every track one frame forward along its velocity and return the active tracks."""
+        self._advance()
+        return self._refresh_active()
+    
+    def _advance(self):
+        if len(self):
+            scale = self._size_scale(self.state[:, 2:4])
+            noise = np.concatenate([self.POSITION_STD * scale, self.VELOCITY_STD * scale], axis=1) ** 2
+            self.state = self.state @ self._motion.T
+            self.covariance = self._motion @ self.covariance @ self._motion.T
+            self.covariance[:, np.arange(8), np.arange(8)] += noise
+    
+    def save(self):
+        """Copy of the tracks as they are now, for update_late() once this frame's detections arrive."""
+        return (self.state.copy(), self.covariance.copy(), self.ids.copy(), self.confidence.copy(),
+                self.age.copy(), self.labels.copy(), self.severities.copy())
+    
+    def update_late(self, detections, saved, frames):
+        """Update tracks with detections of a frame `frames` frames ago, whose tracks save() returned.
+        
+        The detections are matched and corrected against the tracks as they were on that frame,
+        then the predictions since are replayed, so the boxes end up where the content is now.
+        """
+        (self.state, self.covariance, self.ids, self.confidence,
+         self.age, self.labels, self.severities) = saved
+        self.update(detections)
+        for _ in range(frames):
+            self._advance()
+        return self._refresh_active()
+    
+    def _correct(self, indices, measured):
+        """Kalman update of the tracks at `indices` with measured (M, 4) cx, cy, w, h."""
+        scale = self._size_scale(self.state[indices, 2:4])
+        measurement_noise = np.zeros((len(indices), 4, 4))
+        measurement_noise[:, np.arange(4), np.arange(4)] = (self.POSITION_STD * scale) ** 2
+        
+        covariance = self.covariance[indices]
+        projected_cov = self._observe @ covariance @ self._observe.T + measurement_noise
+        gain = covariance @ self._observe.T @ np.linalg.inv(projected_cov)
+        innovation = measured - self.state[indices, :4]
+        self.state[indices] += np.einsum('nij,nj->ni', gain, innovation)
+        self.covariance[indices] = covariance - gain @ self._observe @ covariance
     
     def update(self, detections):
         """Update tracks with new detections."""
         # Age existing tracks
-        for track in self.tracks:
-            track['age'] += 1
-            track['confidence'] *= self.confidence_decay
+        self.age += 1
+        self.confidence *= self.confidence_decay
         
         # Remove old tracks
-        self.tracks = [track for track in self.tracks if track['age'] < self.max_age]
-        
-        # Match new detections to existing tracks
-        matched_tracks = set()
-        matched_detections = set()
-        
-        for i, detection in enumerate(detections):
-            best_iou = 0
-            best_track_idx = -1
+        keep = self.age < self.max_age
+        if not keep.all():
+            self.state, self.covariance = self.state[keep], self.covariance[keep]
+            self.ids, self.confidence, self.age = self.ids[keep], self.confidence[keep], self.age[keep]
+            self.labels, self.severities = self.labels[keep], self.severities[keep]
+        
+        if detections:
+            boxes = np.array([d['box'] for d in detections], dtype=np.float64).reshape(-1, 4)
+            scores = np.array([d['score'] for d in detections], dtype=np.float64)
+            measured = np.concatenate([boxes[:, :2] + boxes[:, 2:] / 2, boxes[:, 2:]], axis=1)
             
-            for j, track in enumerate(self.tracks):
-                if j in matched_tracks:
-                    continue
-                    
-                iou = self.calculate_iou(detection['box'], track['box'])
-                if iou > best_iou and iou > self.iou_threshold:
-                    best_iou = iou
-                    best_track_idx = j
-            
-            if best_track_idx >= 0:
-                # Update existing track
-                track = self.tracks[best_track_idx]
-                track['box'] = detection['box']
-                track['confidence'] = max(track['confidence'], detection['score'])
-                track['severity'] = detection['severity']
-                track['class'] = detection['class']
-                track['age'] = 0  # Reset age
-                track['last_seen'] = time.time()
+            # Optimal one-to-one matching on IoU against the predicted boxes
+            track_idx = det_idx = np.empty(0, dtype=int)
+            if len(self):
+                iou = iou_matrix(boxes, self.boxes())
+                candidates = iou > self.iou_threshold
+                
+                # A detection and track that only overlap each other are a match outright
+                row_count = candidates.sum(axis=1)
+                col_count = candidates.sum(axis=0)
+                pair_rows = np.nonzero(row_count == 1)[0]
+                pair_cols = np.argmax(candidates[pair_rows], axis=1)
+                lonely = col_count[pair_cols] == 1
+                pair_rows, pair_cols = pair_rows[lonely], pair_cols[lonely]
                 
-                matched_tracks.add(best_track_idx)
-                matched_detections.add(i)
+                # Everything else that has a usable overlap goes through optimal assignment
+                candidates[pair_rows] = False
+                candidates[:, pair_cols] = False
+                rows = np.nonzero(candidates.any(axis=1))[0]
+                cols = np.nonzero(candidates.any(axis=0))[0]
+                sub_rows, sub_cols = linear_assignment(1.0 - iou[np.ix_(rows, cols)])
+                good = iou[rows[sub_rows], cols[sub_cols]] > self.iou_threshold
+                det_idx = np.concatenate([pair_rows, rows[sub_rows][good]])
+                track_idx = np.concatenate([pair_cols, cols[sub_cols][good]])
+            
+            if len(track_idx):
+                # Update matched tracks
+                self._correct(track_idx, measured[det_idx])
+                self.confidence[track_idx] = np.maximum(self.confidence[track_idx], scores[det_idx])
+                self.labels[track_idx] = [detections[i]['class'] for i in det_idx]
+                self.severities[track_idx] = [detections[i]['severity'] for i in det_idx]
+                self.age[track_idx] = 0  # Reset age
             
-        # Create new tracks for unmatched detections
-        for i, detection in enumerate(detections):
-            if i not in matched_detections:
-                new_track = {
-                    'id': self.next_id,
-                    'box': detection['box'],
-                    'confidence': detection['score'],
-                    'severity': detection['severity'],
-                    'class': detection['class'],
-                    'age': 0,
-                    'created': time.time(),
-                    'last_seen': time.time()
-                }
-                self.tracks.append(new_track)
-                self.next_id += 1
-        
-        return self.get_active_tracks()
+            # Create new tracks for unmatched detections
+            new = np.setdiff1d(np.arange(len(detections)), det_idx)
+            if len(new):
+                scale = self._size_scale(measured[new, 2:4])
+                std = np.concatenate([2 * self.POSITION_STD * scale, 10 * self.VELOCITY_STD * scale], axis=1)
+                covariance = np.zeros((len(new), 8, 8))
+                covariance[:, np.arange(8), np.arange(8)] = std ** 2
+                
+                self.state = np.concatenate([self.state, np.concatenate([measured[new], np.zeros((len(new), 4))], axis=1)])
+                self.covariance = np.concatenate([self.covariance, covariance])
+                self.ids = np.concatenate([self.ids, np.arange(self.next_id, self.next_id + len(new))])
+                self.next_id += len(new)
+                self.confidence = np.concatenate([self.confidence, scores[new]])
+                self.age = np.concatenate([self.age, np.zeros(len(new), dtype=np.int64)])
+                self.labels = np.concatenate([self.labels, np.array([detections[i]['class'] for i in new], dtype=object)])
+                self.severities = np.concatenate([self.severities, np.array([detections[i]['severity'] for i in new], dtype=object)])
+        
+        return self._refresh_active()
+    
+    def _refresh_active(self):
+        """Rebuild the list of tracks that should be blurred (once per step, not per caller)."""
+        # Only include tracks with sufficient confidence or critical severity, or recent ones
+        active = ((self.confidence > 0.1)
+                  | np.isin(self.severities, ['CRITICAL', 'HIGH'])
+                  | (self.age < 5))
+        indices = np.nonzero(active)[0]
+        boxes = np.round(self.boxes()[indices]).astype(int).tolist()
+        self.active_tracks = [
+            {
+                'id': int(self.ids[i]),
+                'box': box,
+                'confidence': float(self.confidence[i]),
+                'severity': self.severities[i],
+                'class': self.labels[i],
+                'age': int(self.age[i])
+            }
+            for i, box in zip(indices, boxes)
+        ]
+        return self.active_tracks
     
     def get_active_tracks(self):
         """Get all active tracks that should be blurred."""
-        active_tracks = []
-        
-        for track in self.tracks:
-            # Only include tracks with sufficient confidence or critical severity
-            if (track['confidence'] > 0.1 or 
-                track['severity'] in ['CRITICAL', 'HIGH'] or
-                track['age'] < 5):  # Keep recent tracks visible
-                
-                active_tracks.append({
-                    'id': track['id'],
-                    'box': track['box'],
-                    'confidence': track['confidence'],
-                    'severity': track['severity'],
-                    'class': track['class'],
-                    'age': track['age']
-                })
-        
-        return active_tracks
-    
-    def clear(self):
-        """Clear all tracks."""
-        self.tracks = []
+        return self.active_tracks
 
 class OBSIntegration:
     """OBS WebSocket integration for streamers."""
@@ -467,6 +634,7 @@ class ScreenCapture:
     def __init__(self, monitor=1):
         self.monitor = monitor
         self.sct = None
+        self._buffers = {}
         
         if MSS_AVAILABLE:
             self.sct = mss.mss()
@@ -477,8 +645,18 @@ class ScreenCapture:
         else:
             print("Screen capture disabled - mss not available")
     
-    def capture_screen(self, monitor_num=None):
-        """Capture screen or specific monitor."""
+    def _buffer(self, name, shape):
+        """Reusable output array, reallocated only when the shape changes."""
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = self._buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buffer
+    
+    def capture_screen(self, monitor_num=None, size=None):
+        """Capture screen or specific monitor, optionally resized to `size` (width, height).
+        
+        The returned frame is reused by the next capture - copy it if it has to outlive the frame.
+        """
         if not MSS_AVAILABLE or not self.sct:
             return None
         
@@ -492,11 +670,12 @@ class ScreenCapture:
             monitor = self.monitors[monitor_num]
             screenshot = self.sct.grab(monitor)
             
-            # Convert to OpenCV format
-            frame = np.array(screenshot)
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+            # View the BGRA pixels in place, resize before dropping alpha so fewer pixels get converted
+            frame = np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(screenshot.height, screenshot.width, 4)
+            if size is not None and (screenshot.width, screenshot.height) != tuple(size):
+                frame = cv2.resize(frame, tuple(size), dst=self._buffer('scaled', (size[1], size[0], 4)))
             
-            return frame
+            return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR, dst=self._buffer('frame', frame.shape[:2] + (3,)))
             
         except Exception as e:
             print(f"Screen capture error: {e}")
@@ -508,6 +687,78 @@ class ScreenCapture:
         print(f"Window capture not implemented for: {window_title}")
         return None
 
+class ScreenChangeDetector:
+    """
+    Finds the part of a (mostly static) screen that changed since the AI last looked at it.
+    
+    Frames are shrunk to a small gray thumbnail and compared tile by tile against the
+    thumbnail of what was last handed to the AI, so slow fades add up instead of slipping
+    under the threshold one frame at a time.
+    """
+    
+    THUMB_TILE = 8  # Thumbnail pixels per tile side
+    
+    def __init__(self, grid=(16, 9), threshold=12, full_frame_ratio=0.5):
+        self.grid = grid
+        self.threshold = threshold
+        self.full_frame_ratio = full_frame_ratio
+        
+        columns, rows = grid
+        thumb_size = (rows * self.THUMB_TILE, columns * self.THUMB_TILE)
+        self._small = np.empty(thumb_size + (3,), dtype=np.uint8)
+        self._thumb = np.empty(thumb_size, dtype=np.uint8)
+        self._diff = np.empty(thumb_size, dtype=np.uint8)
+        self._seen = np.empty(thumb_size, dtype=np.uint8)
+        self.reset()
+    
+    def reset(self):
+        """Forget what the AI has seen - the next frame counts as fully changed."""
+        self._frame_size = None
+    
+    def _tile_box(self, columns, rows):
+        """Pixel box (x0, y0, x1, y1) covering tile ranges `columns` and `rows`."""
+        width, height = self._frame_size
+        grid_w, grid_h = self.grid
+        return (columns[0] * width // grid_w, rows[0] * height // grid_h,
+                columns[1] * width // grid_w, rows[1] * height // grid_h)
+    
+    def update(self, frame):
+        """Changed box (x0, y0, x1, y1) of `frame`, or None when nothing changed."""
+        height, width = frame.shape[:2]
+        cv2.resize(frame, self._small.shape[1::-1], dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._thumb)
+        
+        if self._frame_size != (width, height):
+            self._frame_size = (width, height)
+            return (0, 0, width, height)
+        
+        cv2.absdiff(self._thumb, self._seen, dst=self._diff)
+        grid_w, grid_h = self.grid
+        tiles = self._diff.reshape(grid_h, self.THUMB_TILE, grid_w, self.THUMB_TILE).max(axis=(1, 3))
+        changed = tiles > self.threshold
+        if not changed.any():
+            return None
+        if changed.mean() > self.full_frame_ratio:
+            return (0, 0, width, height)
+        
+        # Bounding box of the changed tiles, padded by a tile so objects on the edge aren't cut
+        rows = np.flatnonzero(changed.any(axis=1))
+        columns = np.flatnonzero(changed.any(axis=0))
+        return self._tile_box((max(columns[0] - 1, 0), min(columns[-1] + 2, grid_w)),
+                              (max(rows[0] - 1, 0), min(rows[-1] + 2, grid_h)))
+    
+    def mark_seen(self, box):
+        """Record that the AI got `box` of the last frame passed to update()."""
+        x0, y0, x1, y1 = box
+        width, height = self._frame_size
+        grid_w, grid_h = self.grid
+        # Only tiles completely inside the box count as seen
+        columns = (-(-x0 * grid_w // width), x1 * grid_w // width)
+        rows = (-(-y0 * grid_h // height), y1 * grid_h // height)
+        t = self.THUMB_TILE
+        self._seen[rows[0] * t:rows[1] * t, columns[0] * t:columns[1] * t] = \
+            self._thumb[rows[0] * t:rows[1] * t, columns[0] * t:columns[1] * t]
+
 class VirtualCamera:
     """Virtual camera output for OBS."""
     
@@ -517,10 +768,22 @@ class VirtualCamera:
         self.fps = fps
         self.cam = None
         self.enabled = False
+        self.accepts_bgr = False
+        
+        # Output buffers, reused every frame
+        self._resized = np.empty((height, width, 3), dtype=np.uint8)
+        self._rgb = None
         
         if PYVIRTUALCAM_AVAILABLE:
             try:
-                self.cam = pyvirtualcam.Camera(width=width, height=height, fps=fps)
+                pixel_format = getattr(pyvirtualcam, 'PixelFormat', None)
+                if pixel_format is not None:
+                    # Send OpenCV frames as they are instead of converting to RGB
+                    self.cam = pyvirtualcam.Camera(width=width, height=height, fps=fps, fmt=pixel_format.BGR)
+                    self.accepts_bgr = True
+                else:
+                    self.cam = pyvirtualcam.Camera(width=width, height=height, fps=fps)
+                    self._rgb = np.empty((height, width, 3), dtype=np.uint8)
                 self.enabled = True
                 print(f"Virtual camera initialized: {width}x{height} @ {fps}FPS")
             except Exception as e:
@@ -529,20 +792,21 @@ class VirtualCamera:
             print("Virtual camera disabled - pyvirtualcam not available")
     
     def send_frame(self, frame):
-        """Send frame to virtual camera."""
+        """Send a BGR frame to the virtual camera."""
         if not self.enabled or not self.cam:
             return False
         
         try:
             # Ensure frame is the right size
             if frame.shape[:2] != (self.height, self.width):
-                frame = cv2.resize(frame, (self.width, self.height))
+                frame = cv2.resize(frame, (self.width, self.height), dst=self._resized)
             
-            # Convert BGR to RGB
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # Older pyvirtualcam versions only take RGB
+            if not self.accepts_bgr:
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
             
             # Send to virtual camera
-            self.cam.send(frame_rgb)
+            self.cam.send(frame)
             return True
             
         except Exception as e:
@@ -560,6 +824,8 @@ class StreamerDetector:
     
     def __init__(self):
         print("Initializing Streamer Detector...")
+        self.input_size = 320
+        self.input_sizes = [self.input_size]
         
         # Import ONNX Runtime
         if not _safe_import_onnx(force_retry=True):
@@ -615,7 +881,13 @@ class StreamerDetector:
             # Get model info
             inp = self.onnx_session.get_inputs()[0]
             self.input_name = inp.name
-            self.input_size = inp.shape[2]  # Assuming square input
+            if isinstance(inp.shape[2], int):
+                self.input_size = inp.shape[2]  # Assuming square input
+                self.input_sizes = [self.input_size]
+            else:
+                # Dynamic input - we get to pick the size, so DYNAMIC_QUALITY can shrink it
+                self.input_sizes = list(STREAMER_CONFIG['DYNAMIC_INPUT_SIZES'])
+                self.input_size = self.input_sizes[0]
             
             print(f"Streamer Detector initialized successfully!")
             print(f"Model input: {self.input_name}, size: {self.input_size}")
@@ -671,51 +943,36 @@ class StreamerDetector:
     def postprocess_detections(self, outputs, resize_factor, pad_left, pad_top):
         """Process model outputs with live.py compatible filtering."""
         outputs = np.transpose(np.squeeze(outputs[0]))
-        rows = outputs.shape[0]
-        boxes = []
-        scores = []
-        class_ids = []
-
-        for i in range(rows):
-            classes_scores = outputs[i][4:]
-            max_score = np.amax(classes_scores)
-            class_id = np.argmax(classes_scores)
-            
-            if class_id < len(STREAMING_LABELS):
-                label = STREAMING_LABELS[class_id]
-                required_threshold = get_streaming_threshold(label)
-                
-                # Only accept detections that meet the severity-specific threshold
-                if max_score >= required_threshold:
-                    x, y, w, h = outputs[i][0], outputs[i][1], outputs[i][2], outputs[i][3]
-                    
-                    # Scale back to original coordinates (matching live.py format)
-                    left = int(round((x - w * 0.5 - pad_left) * resize_factor))
-                    top = int(round((y - h * 0.5 - pad_top) * resize_factor))
-                    width = int(round(w * resize_factor))
-                    height = int(round(h * resize_factor))
-                    
-                    # Additional validation for critical content
-                    severity = get_streaming_safety(label)
-                    if severity == 'CRITICAL':
-                        # Extra strict validation for genitalia detection
-                        min_box_area = 500  # Minimum area to avoid tiny false positives
-                        box_area = width * height
-                        if max_score >= 0.7 and box_area >= min_box_area:
-                            class_ids.append(class_id)
-                            scores.append(max_score)
-                            boxes.append([left, top, width, height])
-                    elif severity == 'HIGH':
-                        # Strict validation for high-severity content
-                        if max_score >= 0.5:
-                            class_ids.append(class_id)
-                            scores.append(max_score)
-                            boxes.append([left, top, width, height])
-                    else:
-                        # Standard validation for other content
-                        class_ids.append(class_id)
-                        scores.append(max_score)
-                        boxes.append([left, top, width, height])
+        tables = get_streaming_class_tables()
+        
+        classes_scores = outputs[:, 4:]
+        class_ids = np.argmax(classes_scores, axis=1)
+        max_scores = classes_scores[np.arange(len(class_ids)), class_ids]
+        
+        # Only accept known labels that meet the severity-specific threshold
+        keep = class_ids < len(STREAMING_LABELS)
+        class_ids, max_scores, outputs = class_ids[keep], max_scores[keep], outputs[keep]
+        keep = max_scores >= tables['thresholds'][class_ids]
+        class_ids, max_scores, outputs = class_ids[keep], max_scores[keep], outputs[keep]
+        
+        # Scale back to original coordinates (matching live.py format)
+        x, y, w, h = outputs[:, 0], outputs[:, 1], outputs[:, 2], outputs[:, 3]
+        left = np.round((x - w * 0.5 - pad_left) * resize_factor).astype(np.int64)
+        top = np.round((y - h * 0.5 - pad_top) * resize_factor).astype(np.int64)
+        width = np.round(w * resize_factor).astype(np.int64)
+        height = np.round(h * resize_factor).astype(np.int64)
+        
+        # Extra strict validation for critical content (min score 0.7 and box area to avoid
+        # tiny false positives), strict validation for high-severity content
+        min_box_area = 500
+        critical = tables['critical'][class_ids]
+        high = tables['high'][class_ids]
+        keep = ((~critical | ((max_scores >= 0.7) & (width * height >= min_box_area)))
+                & (~high | (max_scores >= 0.5)))
+        
+        class_ids = class_ids[keep]
+        scores = max_scores[keep].tolist()
+        boxes = np.stack([left, top, width, height], axis=1)[keep].tolist()
 
         # Use stricter NMS parameters matching live.py for better filtering
         indices = cv2.dnn.NMSBoxes(boxes, scores, 0.3, 0.4)
@@ -723,22 +980,17 @@ class StreamerDetector:
         detections = []
         if len(indices) > 0:
             for i in indices:
-                box = boxes[i]
-                score = scores[i]
                 class_id = class_ids[i]
-                label = STREAMING_LABELS[class_id]
-                severity = get_streaming_safety(label)
-                
                 detections.append({
-                    "class": label,
-                    "score": float(score),
-                    "box": box,
-                    "severity": severity
+                    "class": STREAMING_LABELS[class_id],
+                    "score": float(scores[i]),
+                    "box": boxes[i],
+                    "severity": tables['severities'][class_id]
                 })
 
         return detections
     
-    def detect_frame(self, frame):
+    def detect_frame(self, frame, input_size=None):
         """Detect content in frame optimized for streaming."""
         if self.onnx_session is None:
             return []
@@ -746,7 +998,7 @@ class StreamerDetector:
         try:
             # Preprocess
             input_data, resize_factor, pad_left, pad_top = self.preprocess_frame(
-                frame, self.input_size
+                frame, input_size or self.input_size
             )
             
             # Run inference
@@ -761,6 +1013,135 @@ class StreamerDetector:
             print(f"Detection error: {e}")
             return []
 
+class AdaptiveRateController:
+    """Feedback loop that picks how often (and at what size) to run detection.
+
+    Detection runs on its own thread, so the loop is fed per-detection numbers, not display
+    frame times. When one inference no longer fits between two detections (`skip + 1` frames
+    at the target FPS) it detects less often. When results arrive too long after their frame
+    was captured (over `latency_budget`), or the rate is already at `max_skip`, it shrinks the
+    detection input. Spare headroom undoes those steps in reverse order, but never goes past
+    the configured starting point.
+
+    live.py and live_streamer.py each carry an identical copy of this class (the scripts are
+    standalone) - change both together.
+    """
+
+    def __init__(self, target_fps, min_skip=0, max_skip=8, input_sizes=(320,),
+                 adapt_rate=True, adapt_resolution=True, window=15, latency_budget=None):
+        self.frame_budget = 1.0 / max(1, target_fps)
+        self.min_skip = min_skip
+        self.max_skip = max(min_skip, max_skip)
+        self.skip = min_skip
+        self.input_sizes = list(input_sizes)
+        self.size_index = 0
+        self.adapt_rate = adapt_rate
+        self.adapt_resolution = adapt_resolution and len(self.input_sizes) > 1
+        self.window = window
+        self.latency_budget = latency_budget
+        self.inference_time = 0.0
+        self.latency = 0.0
+        self._detections_since_check = 0
+
+    @staticmethod
+    def _smooth(current, sample, alpha=0.2):
+        return sample if current == 0.0 else current + alpha * (sample - current)
+
+    @property
+    def input_size(self):
+        return self.input_sizes[self.size_index]
+
+    @property
+    def detection_budget(self):
+        """How long one inference may take at the current rate."""
+        return self.frame_budget * (self.skip + 1)
+
+    def record_inference(self, seconds, latency=None):
+        """Feed in how long one detection took and, if known, how old its frame was when the
+        result was ready. Adjusts every `window` detections."""
+        self.inference_time = self._smooth(self.inference_time, seconds)
+        if latency is not None:
+            self.latency = self._smooth(self.latency, latency)
+        self._detections_since_check += 1
+        if self._detections_since_check >= self.window:
+            self._detections_since_check = 0
+            slow = self.inference_time > self.detection_budget * 1.1
+            late = self.latency_budget is not None and self.latency > self.latency_budget * 1.1
+            if slow or late:
+                self._degrade(slow)
+            else:
+                self._recover()
+
+    def _degrade(self, slow):
+        # Detecting less often only helps when the model can't keep up with the rate - it
+        # doesn't make a single result arrive any sooner
+        if slow and self.adapt_rate and self.skip < self.max_skip:
+            self.skip += 1
+        elif self.adapt_resolution and self.size_index < len(self.input_sizes) - 1:
+            self.size_index += 1
+
+    def _recover(self):
+        if self.adapt_resolution and self.size_index > 0:
+            # Inference cost grows roughly with the input area
+            larger = self.inference_time * (self.input_sizes[self.size_index - 1] / self.input_size) ** 2
+            fits_latency = (self.latency_budget is None or
+                            self.latency - self.inference_time + larger <= self.latency_budget * 0.9)
+            if larger <= self.detection_budget * 0.9 and fits_latency:
+                self.size_index -= 1
+                return
+        if self.adapt_rate and self.skip > self.min_skip:
+            # Only detect more often if one inference still fits in the shorter gap
+            if self.inference_time <= self.frame_budget * self.skip * 0.9:
+                self.skip -= 1
+
+    def describe(self):
+        """Short description of the current operating point for the overlay."""
+        text = f"AI every {self.skip + 1} frame{'s' if self.skip else ''}"
+        if len(self.input_sizes) > 1:
+            text += f" @ {self.input_size}px"
+        return text
+
+class LatestFrame:
+    """Single-slot frame holder - the capture thread overwrites it, readers only ever see the newest frame."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._frame_id = 0
+        self._capture_time = 0.0
+        self._closed = False
+
+    def put(self, frame):
+        """Replace the held frame with a freshly captured one."""
+        with self._cond:
+            self._frame_id += 1
+            self._frame = frame
+            self._capture_time = time.perf_counter()
+            self._cond.notify_all()
+
+    def get_newer(self, min_id, timeout=1.0):
+        """Wait for a frame with id >= min_id and return (frame_id, capture_time, frame).
+
+        Returns None on timeout or once the slot is closed.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._closed or self._frame_id >= min_id, timeout):
+                return None
+            if self._closed:
+                return None
+            return self._frame_id, self._capture_time, self._frame
+
+    def close(self):
+        """Wake up everyone waiting on the slot so they can quit."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
 class StreamProcessor:
     """Main streaming processor with all integrations."""
     
@@ -792,11 +1173,48 @@ class StreamProcessor:
         self.safe_mode = False
         self.safe_mode_start = 0
         
+        # Adaptive AI rate - PROCESSING_FPS is the best case (one inference per 1/PROCESSING_FPS),
+        # a model that can't keep up with it pushes the rate and then the input size down
+        self.rate_controller = AdaptiveRateController(
+            self.config['TARGET_FPS'],
+            min_skip=max(1, self.config['TARGET_FPS'] // self.config['PROCESSING_FPS']) - 1,
+            max_skip=self.config['MAX_FRAME_SKIP'],
+            input_sizes=self.detector.input_sizes,
+            adapt_rate=self.config['FRAME_SKIP_ON_LOAD'],
+            adapt_resolution=self.config['DYNAMIC_QUALITY'],
+            latency_budget=self.config['MAX_AI_LATENCY_MS'] / 1000,
+        )
+        
+        # Background AI - the render loop drops every frame into a latest-frame slot and
+        # picks up results whenever they're ready, so inference never stalls the output
+        self.ai_frames = LatestFrame()
+        self.ai_thread = None
+        self.ai_lock = threading.Lock()
+        self.ai_busy = False  # Set while a handed-off frame is being analyzed
+        self.ai_next_frame = 0  # First frame_count due for AI again
+        self.ai_detections = []  # Full-frame detections as of the last AI run
+        self.ai_result = None  # Detections not yet fed to the tracker
+        self.ai_completed = 0
+        self.ai_unchanged = 0  # AI runs skipped because the screen didn't change
+        
+        # Censored output is rendered into one reused buffer shared by the virtual camera and preview
+        self.output_frame = None
+        
+        # Desktop capture is mostly static - only look again at what changed
+        self.change_detector = None
+        if self.config['CHANGE_DETECTION']:
+            self.change_detector = ScreenChangeDetector(
+                grid=self.config['CHANGE_GRID'],
+                threshold=self.config['CHANGE_THRESHOLD'],
+                full_frame_ratio=self.config['CHANGE_FULL_FRAME_RATIO'],
+            )
+        
         # Performance tracking
         self.fps_counter = 0
         self.fps_start = time.time()
         self.actual_fps = 0
         self.processing_fps = 0
+        self._ai_completed_mark = 0
         
         # Detection logging
         self.detection_log = []
@@ -868,7 +1286,7 @@ class StreamProcessor:
                 frame = None
                 
         elif self.input_mode == 'SCREEN' and self.screen_capture:
-            frame = self.screen_capture.capture_screen()
+            frame = self.screen_capture.capture_screen(size=self.config['RESOLUTION'])
             
         elif self.input_mode == 'WINDOW' and self.screen_capture:
             frame = self.screen_capture.capture_window(self.config['WINDOW_TITLE'])
@@ -881,29 +1299,131 @@ class StreamProcessor:
         
         return frame
     
+    def start_ai_worker(self):
+        """Start the background detection thread (if there's a model to run)."""
+        if self.detector.onnx_session is None:
+            return
+        self.ai_thread = threading.Thread(target=self._ai_worker)
+        self.ai_thread.daemon = True
+        self.ai_thread.start()
+    
+    def _ai_worker(self):
+        """Run detection on each frame (or changed region) handed over by submit_ai_frame()."""
+        last_id = 0
+        while self.running:
+            latest = self.ai_frames.get_newer(last_id + 1)
+            if latest is None:
+                if self.ai_frames.closed:
+                    break
+                continue
+            last_id, submit_time, (frame, region, submitted_frame, saved_tracks) = latest
+            
+            ai_start = time.perf_counter()
+            detections = self.detector.detect_frame(frame, self.rate_controller.input_size)
+            finished = time.perf_counter()
+            self.rate_controller.record_inference(finished - ai_start, finished - submit_time)
+            
+            if region is not None:
+                # Detections outside the changed region still stand, the region's are replaced
+                x0, y0 = region[:2]
+                for detection in detections:
+                    box = detection['box']
+                    detection['box'] = [box[0] + x0, box[1] + y0, box[2], box[3]]
+                detections = [d for d in self.ai_detections
+                              if not boxes_overlap(d['box'], region)] + detections
+            
+            with self.ai_lock:
+                self.ai_detections = detections
+                self.ai_result = (detections, submitted_frame, saved_tracks)
+                self.ai_completed += 1
+                self.ai_busy = False
+    
+    def submit_ai_frame(self, frame):
+        """
+        Hand the AI thread this frame, or just the part of it that changed, when it's due.
+        Returns True if the AI was due but the screen hasn't changed since it last looked.
+        """
+        if self.ai_busy or self.frame_count < self.ai_next_frame:
+            return False
+        self.ai_next_frame = self.frame_count + self.rate_controller.skip + 1
+        
+        region = None
+        if self.change_detector is not None and self.input_mode in ('SCREEN', 'WINDOW'):
+            region = self.change_detector.update(frame)
+            if region is None:
+                self.ai_unchanged += 1
+                return True
+            
+            # Grow the region over detections it touches, so they get re-detected whole
+            height, width = frame.shape[:2]
+            grown = True
+            while grown:
+                grown = False
+                for detection in self.ai_detections:
+                    x, y, w, h = detection['box']
+                    if boxes_overlap(detection['box'], region):
+                        bigger = (max(min(region[0], x), 0), max(min(region[1], y), 0),
+                                  min(max(region[2], x + w), width), min(max(region[3], y + h), height))
+                        grown |= bigger != region
+                        region = bigger
+            self.change_detector.mark_seen(region)
+            if region == (0, 0, width, height):
+                region = None
+        
+        # The capture may reuse its buffer, so the AI gets its own copy
+        if region is None:
+            ai_frame = frame.copy()
+        else:
+            x0, y0, x1, y1 = region
+            ai_frame = frame[y0:y1, x0:x1].copy()
+        self.ai_busy = True
+        # The tracks as of this frame travel with it, so the result can be applied where it belongs
+        self.ai_frames.put((ai_frame, region, self.frame_count, self.tracker.save()))
+        return False
+    
+    def take_ai_result(self):
+        """(detections, submitted frame_count, saved tracks) finished since the last call, or None."""
+        with self.ai_lock:
+            result, self.ai_result = self.ai_result, None
+        return result
+    
     def process_frame(self, frame):
         """Process frame with AI detection and apply safety measures with tracking."""
         if frame is None:
             return frame
         
-        processed_frame = frame.copy()
-        
-        # Skip AI processing on some frames for performance
-        should_process_ai = (self.frame_count % max(1, self.config['TARGET_FPS'] // self.config['PROCESSING_FPS']) == 0)
-        
-        raw_detections = []
-        if should_process_ai and self.detector.onnx_session is not None:
-            raw_detections = self.detector.detect_frame(frame)
-        
-        # Update tracker with new detections
-        if raw_detections or should_process_ai:
-            # Update tracker even with empty detections to age existing tracks
-            self.stable_tracks = self.tracker.update(raw_detections)
+        if self.output_frame is None or self.output_frame.shape != frame.shape:
+            self.output_frame = np.empty_like(frame)
+        np.copyto(self.output_frame, frame)
+        processed_frame = self.output_frame
+        
+        # Move tracked boxes along with the content on every frame, even without fresh AI results
+        self.stable_tracks = self.tracker.predict()
+        
+        # Hand the frame to the AI thread when it's free
+        unchanged = self.ai_thread is not None and self.submit_ai_frame(frame)
+        
+        # Update tracker when the AI thread has finished a frame
+        raw_detections = None
+        result = self.take_ai_result()
+        if result is not None:
+            # The result describes a frame submitted a few frames ago - apply it to the tracks as
+            # they were then and catch up, so the blur doesn't trail moving content by the AI latency.
+            # Update even with empty detections to age existing tracks.
+            raw_detections, submitted_frame, saved_tracks = result
+            self.stable_tracks = self.tracker.update_late(raw_detections, saved_tracks,
+                                                          self.frame_count - submitted_frame)
+        elif unchanged:
+            # Static screen - the last detections still hold, re-feeding them keeps the tracks
+            # pinned in place (and alive) without running the model
+            self.stable_tracks = self.tracker.update(self.ai_detections)
         
         # Use stable tracks for consistent blur
         if self.stable_tracks:
             self.last_detections = self.stable_tracks
-            self.detection_count += len([t for t in self.stable_tracks if t['age'] == 0])  # Only count new detections
+            if raw_detections is not None:
+                # Only count fresh AI results - re-fed detections on a static screen aren't new
+                self.detection_count += len([t for t in self.stable_tracks if t['age'] == 0])
             
             # Log detections
             if self.config['LOG_DETECTIONS'] and raw_detections:
@@ -926,8 +1446,8 @@ class StreamProcessor:
         return processed_frame
     
     def apply_safety_measures(self, frame, tracks):
-        """Apply real-time censoring to tracked regions with stable blur."""
-        censored_frame = frame.copy()
+        """Apply real-time censoring to tracked regions with stable blur (in place)."""
+        censored_frame = frame
         font = cv2.FONT_HERSHEY_SIMPLEX
         
         # Define severity colors for visual feedback
@@ -948,9 +1468,12 @@ class StreamProcessor:
             track_id = track["id"]
             age = track["age"]
             
-            # Check bounds
-            if x < 0 or y < 0 or x + w > frame.shape[1] or y + h > frame.shape[0]:
+            # Predicted boxes can run past the frame edge - censor the part still on screen
+            x0, y0 = max(0, x), max(0, y)
+            x1, y1 = min(frame.shape[1], x + w), min(frame.shape[0], y + h)
+            if x1 <= x0 or y1 <= y0:
                 continue
+            x, y, w, h = x0, y0, x1 - x0, y1 - y0
             
             # Determine if censoring should be applied based on severity
             should_censor = False
@@ -976,9 +1499,7 @@ class StreamProcessor:
                 
                 if self.config.get('SOLID_COLOR_MASK', False):
                     # Solid color mask
-                    censored_frame[y:y + h, x:x + w] = np.full(
-                        (h, w, 3), self.config['MASK_COLOR'], dtype=np.uint8
-                    )
+                    roi[:] = self.config['MASK_COLOR']
                 else:
                     # Apply blur based on severity with age consideration
                     if severity == 'CRITICAL':
@@ -999,8 +1520,7 @@ class StreamProcessor:
                     if blur_strength % 2 == 0:
                         blur_strength += 1
                     
-                    blurred_roi = cv2.GaussianBlur(roi, (blur_strength, blur_strength), 0)
-                    censored_frame[y:y + h, x:x + w] = blurred_roi
+                    cv2.GaussianBlur(roi, (blur_strength, blur_strength), 0, dst=roi)
             
             # Draw detection box and label with severity-based colors
             if self.config.get('SHOW_DETECTION_BOXES', True):
@@ -1083,6 +1603,7 @@ class StreamProcessor:
         if self.config['PERFORMANCE_OVERLAY']:
             perf_text = f"FPS: {self.actual_fps:.1f} | AI: {self.processing_fps:.1f}"
             cv2.putText(frame, perf_text, (10, frame.shape[0] - 60), font, 0.6, (255, 255, 255), 2)
+            cv2.putText(frame, self.rate_controller.describe(), (10, frame.shape[0] - 90), font, 0.6, (255, 255, 255), 2)
         
         # Detection counter
         if self.config['DETECTION_COUNTER']:
@@ -1124,7 +1645,10 @@ class StreamProcessor:
         self.fps_counter += 1
         if self.fps_counter % 30 == 0:
             current_time = time.time()
-            self.actual_fps = 30 / (current_time - self.fps_start)
+            elapsed = current_time - self.fps_start
+            self.actual_fps = 30 / elapsed
+            self.processing_fps = (self.ai_completed - self._ai_completed_mark) / elapsed
+            self._ai_completed_mark = self.ai_completed
             self.fps_start = current_time
     
     def run(self):
@@ -1137,6 +1661,7 @@ class StreamProcessor:
         print(f"Virtual Camera: {'Enabled' if self.virtual_camera and self.virtual_camera.enabled else 'Disabled'}")
         
         self.running = True
+        self.start_ai_worker()
         
         # Create display window
         if not self.config['PRIVACY_MODE']:
@@ -1164,8 +1689,8 @@ class StreamProcessor:
                 
                 # Display frame (if not in privacy mode)
                 if not self.config['PRIVACY_MODE']:
-                    display_frame = cv2.resize(processed_frame, (1280, 720))
-                    cv2.imshow('SafeVision Streamer', display_frame)
+                    # The window is resizable, so it scales the output buffer itself
+                    cv2.imshow('SafeVision Streamer', processed_frame)
                 
                 # Handle keyboard input
                 if not self.config['PRIVACY_MODE']:
@@ -1211,6 +1736,8 @@ class StreamProcessor:
         
         self.input_mode = modes[next_index]
         print(f"Switched to input mode: {self.input_mode}")
+        if self.change_detector:
+            self.change_detector.reset()
         
         # Reinitialize input source
         if self.input_mode == 'CAMERA':
@@ -1222,6 +1749,13 @@ class StreamProcessor:
         
         self.running = False
         
+        # Stop the AI thread
+        self.ai_frames.close()
+        if self.ai_thread:
+            self.ai_thread.join(timeout=5)
+        if self.ai_unchanged:
+            print(f"AI runs skipped on an unchanged screen: {self.ai_unchanged}")
+        
         # Save final detection log
         if self.detection_log:
             self.save_detection_log()
@@ -1281,6 +1815,10 @@ def parse_streamer_args():
     parser.add_argument("--gpu", action="store_true", help="Enable GPU acceleration")
     parser.add_argument("--quality", choices=['low', 'medium', 'high'], default='high',
                        help="Processing quality")
+    parser.add_argument("--no-adaptive", action="store_true",
+                       help="Keep the AI rate fixed instead of backing off under load")
+    parser.add_argument("--no-change-detection", action="store_true",
+                       help="Run AI on every screen frame, even when nothing changed")
     
     return parser.parse_args()
 
@@ -1319,6 +1857,11 @@ def main():
     config['OBS_PORT'] = args.obs_port
     config['OBS_PASSWORD'] = args.obs_password
     config['AUTO_SCENE_SWITCH'] = args.auto_scene_switch
+    if args.no_adaptive:
+        config['FRAME_SKIP_ON_LOAD'] = False
+        config['DYNAMIC_QUALITY'] = False
+    if args.no_change_detection:
+        config['CHANGE_DETECTION'] = False
     
     # Parse resolution
     try:
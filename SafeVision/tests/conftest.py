@@ -0,0 +1,9 @@
+"""
+SafeVision - Test fixtures
+Run from SafeVision/:  python -m pytest tests
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,87 @@
+"""
+Tracker and censoring tests for live_streamer.py (no camera, model or virtual camera needed).
+"""
+
+import numpy as np
+
+from live_streamer import STREAMER_CONFIG, DetectionTracker, StreamProcessor
+
+WIDTH, HEIGHT = 640, 360
+MASK = (255, 0, 255)
+
+
+def censor(tracks):
+    """Run apply_safety_measures with a solid mask on a blank frame and return the frame."""
+    processor = StreamProcessor.__new__(StreamProcessor)
+    processor.config = dict(STREAMER_CONFIG, SOLID_COLOR_MASK=True, MASK_COLOR=MASK,
+                            SHOW_DETECTION_BOXES=False)
+    frame = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    return processor.apply_safety_measures(frame, tracks)
+
+
+def masked(frame):
+    return np.all(frame == MASK, axis=2)
+
+
+def track(box, severity="CRITICAL"):
+    return {"id": 0, "box": box, "confidence": 0.9, "severity": severity,
+            "class": "FEMALE_BREAST_EXPOSED", "age": 0}
+
+
+def test_box_past_the_edge_is_censored_up_to_the_edge():
+    frame = censor([track([600, 100, 80, 80])])
+    assert masked(frame)[100:180, 600:].all()
+    assert masked(frame).sum() == 40 * 80
+
+
+def test_box_fully_off_screen_is_dropped():
+    frame = censor([track([WIDTH + 10, 100, 80, 80]), track([-100, -100, 50, 50])])
+    assert not masked(frame).any()
+
+
+def test_track_moving_off_the_edge_stays_censored():
+    # Content moves right at 6 px/frame and the AI only sees every third frame. The
+    # detector reports the on-screen part, while the tracker keeps extrapolating past the edge.
+    tracker = DetectionTracker()
+    uncovered = []
+    for frame_index in range(120):
+        x = 400 + 6 * frame_index
+        if x >= WIDTH:
+            break
+        tracks = tracker.predict()
+        if frame_index % 3 == 0:
+            visible = min(WIDTH, x + 80) - x
+            tracks = tracker.update([{"box": [x, 100, visible, 80], "score": 0.9,
+                                      "class": "FEMALE_BREAST_EXPOSED", "severity": "CRITICAL"}])
+        covered = masked(censor(tracks))[100:180, x:x + 80]
+        if not covered.any():
+            uncovered.append(frame_index)
+    assert uncovered == []
+
+
+def follow_with_latency(late_update, speed=6, latency=3, frames=90):
+    """Track content moving `speed` px/frame when each AI result arrives `latency` frames late.
+    Returns how far the track box trails the content on the last frame."""
+    tracker = DetectionTracker()
+    in_flight = None
+    for frame_index in range(frames):
+        tracks = tracker.predict()
+        if in_flight is not None and frame_index - in_flight[1] == latency:
+            detections, submitted, saved = in_flight
+            if late_update:
+                tracks = tracker.update_late(detections, saved, frame_index - submitted)
+            else:
+                tracks = tracker.update(detections)
+            in_flight = None
+        if in_flight is None:
+            box = [20 + speed * frame_index, 100, 80, 80]
+            detections = [{"box": box, "score": 0.9, "class": "FEMALE_BREAST_EXPOSED",
+                           "severity": "CRITICAL"}]
+            in_flight = (detections, frame_index, tracker.save())
+    return 20 + speed * (frames - 1) - tracks[0]["box"][0]
+
+
+def test_late_results_are_applied_at_their_own_frame():
+    # Applied as if fresh, a result 3 frames old leaves the blur trailing by ~3 frames of motion
+    assert follow_with_latency(late_update=False) > 12
+    assert abs(follow_with_latency(late_update=True)) <= 2
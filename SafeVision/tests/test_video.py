@@ -0,0 +1,29 @@
+"""
+Keyframe tracking tests for video.py (no model needed).
+"""
+
+import pytest
+
+from video import KeyframeTracker
+
+FRAME_SHAPE = (360, 640, 3)
+
+
+def detection(x):
+    return {"class": "FEMALE_BREAST_EXPOSED", "score": 0.9, "box": [x, 100, 100, 80]}
+
+
+@pytest.mark.parametrize("detect_every", [2, 3, 5])
+def test_linear_motion_is_predicted_between_keyframes(detect_every):
+    # Content moves +10 px per frame; the model only sees every `detect_every`th frame
+    tracker = KeyframeTracker(margin=0.0)
+    predicted = {}
+    for frame_index in range(4 * detect_every):
+        if frame_index % detect_every == 0:
+            tracker.update([detection(10 * frame_index)])
+        else:
+            predicted[frame_index] = tracker.predict(FRAME_SHAPE)[0]["box"][0]
+
+    # From the second keyframe on, the velocity is known and predictions follow the content
+    expected = {i: 10 * i for i in predicted if i > detect_every}
+    assert {i: x for i, x in predicted.items() if i > detect_every} == expected
@@ -3,7 +3,7 @@ import math
 import cv2
 import numpy as np
 import onnx
-from onnx import version_converter 
+from onnx import version_converter, numpy_helper
 import onnxruntime
 from onnxruntime.capi import _pybind_state as C
 import argparse
@@ -16,6 +16,13 @@ import platform
 import zipfile
 import urllib.request
 import tempfile
+import re
+import hashlib
+import threading
+import queue
+import heapq
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 # Configuration variables - adjust these for different visual effects
@@ -51,11 +58,48 @@ CONFIG = {
     'USE_SOLID_COLOR': False,              # When True, uses solid color instead of blur
     'SOLID_COLOR': (0, 0, 0),              # BGR color for masking (black by default)
     
+    # Memory
+    'FRAME_BUFFER_LIMIT_MB': 1024,         # Decoded frames are kept in RAM between passes only below this size; larger videos are re-decoded (streaming)
+
+    # Pipeline (decode -> inference -> censor -> encode run as concurrent stages)
+    'PIPELINE_QUEUE_SIZE': 16,             # Max frames waiting between two stages
+    'PIPELINE_BATCH_SIZE': 8,              # Frames per batched inference call (overridden by --batch-size)
+    'PIPELINE_CENSOR_WORKERS': 0,          # Censoring threads (0 = one per CPU core, up to 8)
+    'ONNX_INTRA_OP_THREADS': 0,            # Threads per ONNX session (0 = onnxruntime default); split across --segments workers
+
+    # Parallel segments (--segments N)
+    'SEGMENT_MIN_SECONDS': 30,             # Never split the input into segments shorter than this
+
+    # FFmpeg encoder (--encoder ffmpeg/auto)
+    'FFMPEG_VIDEO_CODEC': 'libx264',       # H.264 encoder used when frames are piped to ffmpeg
+    'FFMPEG_PRESET': 'medium',             # x264 speed/size trade-off (overridden by --preset)
+    'FFMPEG_CRF': 23,                      # x264 quality, lower is better (overridden by --crf)
+    'MP4_AUDIO_COPY_CODECS': ('aac', 'mp3', 'ac3', 'eac3', 'alac', 'opus', 'flac'),  # Copied as-is, others re-encoded to AAC
+
+    # Frame dumps and GUI preview
+    'FRAME_DUMP_QUEUE_SIZE': 32,           # Dump images waiting for the background JPEG writer
+    'FRAME_DUMP_WORKERS': 2,               # Background JPEG writer threads
+    'PREVIEW_INTERVAL_SECONDS': 1.0,       # Minimum time between preview image updates (--preview)
+    'PREVIEW_WIDTH': 480,                  # Width of the preview image
+    'PREVIEW_FILENAME': 'preview.jpg',     # Written into output_frames/
+
+    # Keyframe sampling (--detect-every N)
+    'SCENE_CUT_CORRELATION': 0.6,          # Histogram correlation below this between consecutive frames is a scene cut
+    'SCENE_CUT_MEAN_DIFF': 40.0,           # Mean absolute grayscale difference above this is a scene cut
+    'TRACK_IOU_THRESHOLD': 0.2,            # Minimum IoU to match a detection to an existing track
+    'TRACK_BOX_MARGIN': 0.05,              # Tracked boxes are widened by this fraction per side on in-between frames
+
+    # Quick scan (--scan)
+    'SCAN_SAMPLE_FPS': 1.0,                # Base sampling rate of --scan (overridden by --scan-fps)
+    'SCAN_DENSE_FACTOR': 4,                # Around a hit, sample this many times more densely
+    'SCAN_GRAB_LIMIT': 48,                 # Gaps up to this many frames are decoded through instead of seeking
+
     # Output naming
     'OUTPUT_VIDEO_SUFFIX': '_processed.mp4',
     'OUTPUT_VIDEO_BOXES_SUFFIX': '_with_boxes.mp4',
     'OUTPUT_VIDEO_AUDIO_SUFFIX': '_with_audio.mp4',
     'OUTPUT_VIDEO_BOXES_AUDIO_SUFFIX': '_with_boxes_audio.mp4',
+    'DETECTIONS_SUFFIX': '.detections.npz',  # Detection sidecar written next to the output videos
 }
 
 # Try to import ffmpeg, but don't fail if it's not available
@@ -84,29 +128,66 @@ __labels = [
     "BUTTOCKS_COVERED",
 ]
 
-def process_frames(video_path, detector, output_folder):
+def process_frames(video_path, detector, output_folder, detect_every=1):
     """
-    Read a video, run the detector on each frame,
-    censor/save each frame to output_folder.
+    Read a video, run the detector on each frame (or every detect_every-th frame and
+    on scene cuts, tracking boxes in between), censor/save each frame to output_folder.
     """
     import os
     cap = cv2.VideoCapture(video_path)
     os.makedirs(output_folder, exist_ok=True)
-    frame_idx = 0
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        frame_idx += 1
 
-        # detect + censor
-        dets = detector.detect_frame(frame)
+    def censor(frame_idx, frame, dets):
         out_path = os.path.join(output_folder, f"frame_{frame_idx:04d}.jpg")
         detector.censor_frame(frame, dets, out_path)
+        return frame
+
+    # JPEG encoding and disk writes happen on background threads
+    detector.frame_writer = FrameDumpWriter()
+
+    # detect + censor, with decoding, inference and censoring running concurrently
+    sampler = KeyframeSampler(detector.detect_frames, detect_every) if detect_every > 1 else None
+    pipeline = FramePipeline(
+        read_video_frames(cap),
+        detect=sampler or detector.detect_frames,
+        censor=censor,
+    )
+    try:
+        pipeline.run(lambda *_: None, sink_name="save")
+    finally:
+        detector.frame_writer.close()
+        detector.frame_writer = None
+    print(f"Stage throughput (frames/s): {pipeline.summary()}")
+    if sampler:
+        print(sampler.summary())
 
     cap.release()
-def _read_frame(frame, target_size=320):
+
+def open_video_at(video_path, first_frame=0):
+    """Open video_path with cv2.VideoCapture, positioned so the next read returns frame first_frame (0-based)."""
+    cap = cv2.VideoCapture(video_path)
+    if first_frame > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first_frame)
+        position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        if position != first_frame:
+            print(f"Warning: seeking {video_path} to frame {first_frame} landed on frame {position}")
+    return cap
+
+def read_video_frames(cap, first_frame=0, frame_count=None):
+    """
+    Yield (frame_number, frame, None) for each frame of an opened cv2.VideoCapture, numbering
+    from first_frame + 1 and stopping after frame_count frames (None = until the input ends).
+    """
+    frame_number = first_frame
+    while frame_count is None or frame_number < first_frame + frame_count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame_number += 1
+        yield frame_number, frame, None
+
+def _letterbox(frame, target_size=320):
+    """Resize and pad a BGR frame into an RGB target_size square; returns (img, resize_factor, pad_left, pad_top)."""
     img_height, img_width = frame.shape[:2]
     img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
@@ -143,47 +224,65 @@ def _read_frame(frame, target_size=320):
 
     img = cv2.resize(img, (target_size, target_size))
 
-    image_data = img.astype("float32") / 255.0
-    image_data = np.transpose(image_data, (2, 0, 1))
-    image_data = np.expand_dims(image_data, axis=0)
+    return img, resize_factor, pad_left, pad_top
+
+
+def _read_frame(frame, target_size=320):
+    return _read_frames([frame], target_size)
+
+
+def _read_frames(frames, target_size=320):
+    """
+    Preprocess same-sized frames into one (N, 3, target_size, target_size) float32 tensor.
+    Frames of equal size share the letterbox parameters, which are returned once.
+    """
+    image_data = np.empty((len(frames), 3, target_size, target_size), dtype=np.float32)
+    for i, frame in enumerate(frames):
+        img, resize_factor, pad_left, pad_top = _letterbox(frame, target_size)
+        image_data[i] = np.transpose(img.astype("float32") / 255.0, (2, 0, 1))
 
     return image_data, resize_factor, pad_left, pad_top
 
 
 def _postprocess(output, resize_factor, pad_left, pad_top):
-    outputs = np.transpose(np.squeeze(output[0]))
-    rows = outputs.shape[0]
-    boxes = []
-    scores = []
-    class_ids = []
-
-    for i in range(rows):
-        classes_scores = outputs[i][4:]
-        max_score = np.amax(classes_scores)
-
-        if max_score >= 0.2:
-            class_id = np.argmax(classes_scores)
-            x, y, w, h = outputs[i][0], outputs[i][1], outputs[i][2], outputs[i][3]
-            left = int(round((x - w * 0.5 - pad_left) * resize_factor))
-            top = int(round((y - h * 0.5 - pad_top) * resize_factor))
-            width = int(round(w * resize_factor))
-            height = int(round(h * resize_factor))
-            class_ids.append(class_id)
-            scores.append(max_score)
-            boxes.append([left, top, width, height])
-
-    indices = cv2.dnn.NMSBoxes(boxes, scores, 0.25, 0.45)
-
-    detections = []
-    for i in indices:
-        box = boxes[i]
-        score = scores[i]
-        class_id = class_ids[i]
-        detections.append(
-            {"class": __labels[class_id], "score": float(score), "box": box}
-        )
+    return _postprocess_batch(output, resize_factor, pad_left, pad_top)[0]
 
-    return detections
+
+def _postprocess_batch(output, resize_factor, pad_left, pad_top):
+    """
+    Vectorized postprocessing of a (N, 4 + classes, anchors) model output.
+    Returns one detection list per frame.
+    """
+    predictions = np.transpose(output[0], (0, 2, 1))
+    class_scores = predictions[..., 4:]
+    max_scores = class_scores.max(axis=2)
+    class_ids = class_scores.argmax(axis=2)
+
+    batch_detections = []
+    for n in range(predictions.shape[0]):
+        keep = max_scores[n] >= 0.2
+        if not keep.any():
+            batch_detections.append([])
+            continue
+
+        x, y, w, h = predictions[n, keep, :4].T
+        boxes = np.stack([
+            np.round((x - w * 0.5 - pad_left) * resize_factor),
+            np.round((y - h * 0.5 - pad_top) * resize_factor),
+            np.round(w * resize_factor),
+            np.round(h * resize_factor),
+        ], axis=1).astype(int)
+        scores = max_scores[n, keep]
+        labels = class_ids[n, keep]
+
+        indices = cv2.dnn.NMSBoxes(boxes.tolist(), scores.tolist(), 0.25, 0.45)
+
+        batch_detections.append([
+            {"class": __labels[labels[i]], "score": float(scores[i]), "box": boxes[i].tolist()}
+            for i in np.ravel(indices)
+        ])
+
+    return batch_detections
 
 
 def _ensure_opset15(original_path: str) -> str:
@@ -199,6 +298,47 @@ def _ensure_opset15(original_path: str) -> str:
         onnx.save(converted, conv_path)
     return conv_path
 
+def _ensure_dynamic_batch(model_path: str) -> str:
+    """
+    Make a copy of the model whose batch dimension is symbolic, so several frames can be
+    run in one session.run. Reshape targets that hard-code a leading batch of 1 are
+    rewritten to 0 (copy the input dimension). Returns the path to the dynamic-batch model.
+    """
+    base, ext = os.path.splitext(model_path)
+    dyn_path = f"{base}_dynbatch{ext}"
+    if os.path.exists(dyn_path):
+        return dyn_path
+
+    model = onnx.load(model_path)
+    graph = model.graph
+    for value in list(graph.input) + list(graph.output):
+        dims = value.type.tensor_type.shape.dim
+        if dims:
+            dims[0].ClearField("dim_value")
+            dims[0].dim_param = "batch"
+
+    # Intermediate shapes were inferred for batch 1; drop them and let the runtime re-infer
+    del graph.value_info[:]
+
+    reshape_shapes = {node.input[1] for node in graph.node if node.op_type == "Reshape" and len(node.input) > 1}
+    for init in graph.initializer:
+        if init.name in reshape_shapes:
+            shape = numpy_helper.to_array(init).copy()
+            if shape.ndim == 1 and shape.size > 1 and shape[0] == 1:
+                shape[0] = 0
+                init.CopyFrom(numpy_helper.from_array(shape, init.name))
+    for node in graph.node:
+        if node.op_type == "Constant" and node.output[0] in reshape_shapes:
+            for attr in node.attribute:
+                if attr.name == "value":
+                    shape = numpy_helper.to_array(attr.t).copy()
+                    if shape.ndim == 1 and shape.size > 1 and shape[0] == 1:
+                        shape[0] = 0
+                        attr.t.CopyFrom(numpy_helper.from_array(shape, attr.t.name))
+
+    onnx.save(model, dyn_path)
+    return dyn_path
+
 # Function to create a video writer with fallback codecs
 def create_safe_video_writer(output_path, width, height, fps, codec_preference=None):
     """
@@ -238,6 +378,592 @@ def create_safe_video_writer(output_path, width, height, fps, codec_preference=N
     
     return writer
 
+class StageStats:
+    """Frames handled and time spent working by one pipeline stage."""
+
+    def __init__(self, name, workers=1):
+        self.name = name
+        self.workers = workers
+        self.frames = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, frames, seconds):
+        with self._lock:
+            self.frames += frames
+            self.busy += seconds
+
+    def fps(self):
+        """Throughput of the stage when it never waits on its neighbours (all workers busy)."""
+        return self.frames * self.workers / self.busy if self.busy > 0 else 0.0
+
+
+_PIPELINE_END = object()
+
+
+class FramePipeline:
+    """
+    Runs frames through concurrent stages connected by bounded queues:
+
+        decoder thread -> inference thread (batches) -> censor thread pool -> sink (calling thread)
+
+    source yields (frame_number, frame, detections) in order. detect(frames) returns one
+    detection list per frame and replaces the detections of each item; censor(frame_number,
+    frame, detections) returns the frame to hand on. Both stages are optional. The sink
+    receives items in their original order. Bounded queues keep only a handful of frames in
+    flight, and a slow stage back-pressures the stages before it.
+    """
+
+    def __init__(self, source, detect=None, censor=None, batch_size=None, workers=None, queue_size=None):
+        self.source = source
+        self.detect = detect
+        self.censor = censor
+        self.batch_size = max(1, batch_size or CONFIG['PIPELINE_BATCH_SIZE'])
+        self.workers = max(1, workers or CONFIG['PIPELINE_CENSOR_WORKERS'] or min(8, os.cpu_count() or 1))
+        self.queue_size = max(1, queue_size or CONFIG['PIPELINE_QUEUE_SIZE'])
+
+        self.stats = {"decode": StageStats("decode")}
+        if detect:
+            self.stats["infer"] = StageStats("infer")
+        if censor:
+            self.stats["censor"] = StageStats("censor", self.workers)
+
+        self._stop = threading.Event()
+        self._error = None
+
+    def summary(self):
+        """Per-stage throughput in frames/s, e.g. 'decode=410 infer=95 censor=300 encode=800'."""
+        return " ".join(f"{s.name}={s.fps():.0f}" for s in self.stats.values())
+
+    def _put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while True:
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return _PIPELINE_END
+
+    def _run_stage(self, stage, *stage_args):
+        try:
+            stage(*stage_args)
+        except BaseException as e:
+            if self._error is None:
+                self._error = e
+            self._stop.set()
+
+    def _decode(self, out_q):
+        stats = self.stats["decode"]
+        frames = iter(self.source)
+        try:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                item = next(frames, None)
+                if item is None:
+                    break
+                stats.add(1, time.perf_counter() - start)
+                if not self._put(out_q, item):
+                    return
+            self._put(out_q, _PIPELINE_END)
+        finally:
+            if hasattr(frames, "close"):
+                frames.close()
+
+    def _infer(self, in_q, out_q):
+        stats = self.stats["infer"]
+        finished = False
+        while not finished:
+            batch = []
+            while len(batch) < self.batch_size:
+                item = self._get(in_q)
+                if item is _PIPELINE_END:
+                    finished = True
+                    break
+                batch.append(item)
+            if not batch:
+                break
+
+            start = time.perf_counter()
+            results = self.detect([frame for _, frame, _ in batch])
+            stats.add(len(batch), time.perf_counter() - start)
+
+            for (frame_number, frame, _), detections in zip(batch, results):
+                if not self._put(out_q, (frame_number, frame, detections)):
+                    return
+        self._put(out_q, _PIPELINE_END)
+
+    def _censor_one(self, item):
+        frame_number, frame, detections = item
+        start = time.perf_counter()
+        frame = self.censor(frame_number, frame, detections)
+        self.stats["censor"].add(1, time.perf_counter() - start)
+        return frame_number, frame, detections
+
+    def _dispatch(self, in_q, out_q, pool):
+        # Futures are queued in submission order, so the sink sees frames in order
+        while True:
+            item = self._get(in_q)
+            if item is _PIPELINE_END:
+                break
+            future = pool.submit(self._censor_one, item)
+            if not self._put(out_q, future):
+                future.cancel()
+                return
+        self._put(out_q, _PIPELINE_END)
+
+    def run(self, sink, pbar=None, sink_name="encode"):
+        """Run the pipeline to completion, calling sink(frame_number, frame, detections) per frame."""
+        stats = self.stats[sink_name] = StageStats(sink_name)
+
+        decoded = queue.Queue(self.queue_size)
+        threads = [threading.Thread(target=self._run_stage, args=(self._decode, decoded), name="decode", daemon=True)]
+        tail = decoded
+        if self.detect:
+            inferred = queue.Queue(self.queue_size)
+            threads.append(threading.Thread(target=self._run_stage, args=(self._infer, tail, inferred), name="infer", daemon=True))
+            tail = inferred
+        pool = None
+        if self.censor:
+            pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="censor")
+            censored = queue.Queue(self.queue_size)
+            threads.append(threading.Thread(target=self._run_stage, args=(self._dispatch, tail, censored, pool), name="censor", daemon=True))
+            tail = censored
+
+        for thread in threads:
+            thread.start()
+
+        last_report = time.monotonic()
+        try:
+            while True:
+                item = self._get(tail)
+                if item is _PIPELINE_END:
+                    break
+                if pool is not None:
+                    item = item.result()
+
+                start = time.perf_counter()
+                sink(*item)
+                stats.add(1, time.perf_counter() - start)
+
+                if pbar is not None:
+                    pbar.update(1)
+                    now = time.monotonic()
+                    if now - last_report >= 1.0:
+                        pbar.set_postfix_str(self.summary(), refresh=False)
+                        last_report = now
+        except BaseException as e:
+            if self._error is None:
+                self._error = e
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        if self._error is not None:
+            raise self._error
+        if pbar is not None:
+            pbar.set_postfix_str(self.summary())
+
+
+class FrameDumpWriter:
+    """
+    Writes dump images on background threads. submit() blocks when the bounded queue is
+    full, so a slow disk throttles processing instead of buffering frames without limit.
+    """
+
+    def __init__(self, queue_size=None, workers=None):
+        self._queue = queue.Queue(queue_size or CONFIG['FRAME_DUMP_QUEUE_SIZE'])
+        self._threads = [
+            threading.Thread(target=self._run, name=f"frame-writer-{i}", daemon=True)
+            for i in range(max(1, workers or CONFIG['FRAME_DUMP_WORKERS']))
+        ]
+        self.written = 0
+        self.failed = 0
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, path, image):
+        self._queue.put((path, image))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            path, image = item
+            if cv2.imwrite(path, image):
+                self.written += 1
+            else:
+                self.failed += 1
+
+    def close(self):
+        """Wait until every submitted image is on disk."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        if self.failed:
+            print(f"Warning: {self.failed} frame image(s) could not be written")
+
+
+class PreviewWriter:
+    """
+    Lightweight progress channel for the GUI: at most once per PREVIEW_INTERVAL_SECONDS the
+    latest censored output frame is downscaled and atomically replaced at
+    output_frames/preview.jpg, so readers never see a half-written file.
+    """
+
+    def __init__(self, folder="output_frames", interval=None, width=None):
+        os.makedirs(folder, exist_ok=True)
+        self.path = os.path.join(folder, CONFIG['PREVIEW_FILENAME'])
+        if os.path.exists(self.path):
+            os.remove(self.path)  # never show a stale preview from an earlier run
+        self.interval = CONFIG['PREVIEW_INTERVAL_SECONDS'] if interval is None else interval
+        self.width = width or CONFIG['PREVIEW_WIDTH']
+        self._last_update = 0.0
+
+    def due(self):
+        return time.monotonic() - self._last_update >= self.interval
+
+    def update(self, frame):
+        self._last_update = time.monotonic()
+
+        height, width = frame.shape[:2]
+        if width > self.width:
+            frame = cv2.resize(frame, (self.width, int(height * self.width / width)), interpolation=cv2.INTER_AREA)
+        tmp_path = f"{self.path}.tmp.jpg"
+        if cv2.imwrite(tmp_path, frame):
+            os.replace(tmp_path, self.path)
+
+
+class SceneCutDetector:
+    """Flags hard cuts by comparing consecutive downscaled frames (colour histogram + pixel difference)."""
+
+    def __init__(self, correlation_threshold=None, mean_diff_threshold=None):
+        self.correlation_threshold = CONFIG['SCENE_CUT_CORRELATION'] if correlation_threshold is None else correlation_threshold
+        self.mean_diff_threshold = CONFIG['SCENE_CUT_MEAN_DIFF'] if mean_diff_threshold is None else mean_diff_threshold
+        self._previous = None
+
+    def is_cut(self, frame):
+        small = cv2.resize(frame, (64, 36), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        hist = cv2.calcHist([cv2.cvtColor(small, cv2.COLOR_BGR2HSV)], [0, 1], None, [16, 8], [0, 180, 0, 256])
+        cv2.normalize(hist, hist)
+
+        previous, self._previous = self._previous, (gray, hist)
+        if previous is None:
+            return False
+
+        previous_gray, previous_hist = previous
+        if cv2.compareHist(previous_hist, hist, cv2.HISTCMP_CORREL) < self.correlation_threshold:
+            return True
+        return float(cv2.absdiff(previous_gray, gray).mean()) > self.mean_diff_threshold
+
+
+class KeyframeTracker:
+    """
+    Carries keyframe detections to the frames in between. Detections are matched to tracks
+    by IoU (like DetectionTracker in live_streamer.py); each matched track gets a per-frame
+    velocity from its previous keyframe box, and predict() moves every track one frame on.
+    """
+
+    def __init__(self, iou_threshold=None, margin=None):
+        self.iou_threshold = CONFIG['TRACK_IOU_THRESHOLD'] if iou_threshold is None else iou_threshold
+        self.margin = CONFIG['TRACK_BOX_MARGIN'] if margin is None else margin
+        self.tracks = []
+
+    @staticmethod
+    def calculate_iou(box1, box2):
+        x1, y1, w1, h1 = box1
+        x2, y2, w2, h2 = box2
+        xi1, yi1 = max(x1, x2), max(y1, y2)
+        xi2, yi2 = min(x1 + w1, x2 + w2), min(y1 + h1, y2 + h2)
+        if xi2 <= xi1 or yi2 <= yi1:
+            return 0.0
+        inter_area = (xi2 - xi1) * (yi2 - yi1)
+        union_area = w1 * h1 + w2 * h2 - inter_area
+        return inter_area / union_area if union_area > 0 else 0.0
+
+    def update(self, detections):
+        """Replace the tracks with the detections of a new keyframe."""
+        tracks = []
+        matched = set()
+        for detection in detections:
+            box = [float(v) for v in detection["box"]]
+            best_iou, best_index = self.iou_threshold, -1
+            for j, track in enumerate(self.tracks):
+                if j in matched:
+                    continue
+                iou = self.calculate_iou(box, track["box"])
+                if iou >= best_iou:
+                    best_iou, best_index = iou, j
+
+            velocity = [0.0, 0.0]
+            if best_index >= 0:
+                matched.add(best_index)
+                previous = self.tracks[best_index]
+                gap = previous["frames_since_keyframe"] + 1  # Frames from the last keyframe to this one
+                velocity = [(box[0] - previous["keyframe_box"][0]) / gap, (box[1] - previous["keyframe_box"][1]) / gap]
+
+            tracks.append({
+                "class": detection["class"],
+                "score": detection["score"],
+                "box": box,
+                "keyframe_box": box,
+                "velocity": velocity,
+                "frames_since_keyframe": 0,
+            })
+        self.tracks = tracks
+
+    def predict(self, frame_shape):
+        """Advance all tracks by one frame and return them as detections clipped to the frame."""
+        frame_height, frame_width = frame_shape[:2]
+        detections = []
+        for track in self.tracks:
+            track["frames_since_keyframe"] += 1
+            x, y, w, h = track["box"]
+            x, y = x + track["velocity"][0], y + track["velocity"][1]
+            track["box"] = [x, y, w, h]
+
+            # Widen the box a little to cover motion the linear prediction misses
+            dx, dy = w * self.margin, h * self.margin
+            left, top = max(0, int(round(x - dx))), max(0, int(round(y - dy)))
+            right = min(frame_width - 1, int(round(x + w + dx)))
+            bottom = min(frame_height - 1, int(round(y + h + dy)))
+            if right <= left or bottom <= top:
+                continue
+            detections.append({"class": track["class"], "score": track["score"], "box": [left, top, right - left, bottom - top]})
+        return detections
+
+
+class KeyframeSampler:
+    """
+    Detection callable for FramePipeline that runs the model only on every Nth frame and on
+    scene cuts; the frames in between get the keyframe boxes carried by a KeyframeTracker.
+    Must be called with consecutive frames in order (as the pipeline's inference stage does).
+    """
+
+    def __init__(self, detect_frames, detect_every):
+        self.detect_frames = detect_frames
+        self.detect_every = max(1, detect_every)
+        self.scene_cuts = SceneCutDetector()
+        self.tracker = KeyframeTracker()
+        self.frames_seen = 0
+        self.frames_inferred = 0
+        self.scene_cut_count = 0
+        self._since_keyframe = None
+
+    def __call__(self, frames):
+        is_keyframe = []
+        is_cut = []
+        for frame in frames:
+            cut = self.scene_cuts.is_cut(frame)
+            if cut:
+                self.scene_cut_count += 1
+            keyframe = cut or self._since_keyframe is None or self._since_keyframe + 1 >= self.detect_every
+            self._since_keyframe = 0 if keyframe else self._since_keyframe + 1
+            is_keyframe.append(keyframe)
+            is_cut.append(cut)
+
+        keyframes = [frame for frame, keyframe in zip(frames, is_keyframe) if keyframe]
+        keyframe_detections = iter(self.detect_frames(keyframes) if keyframes else [])
+
+        results = []
+        for frame, keyframe, cut in zip(frames, is_keyframe, is_cut):
+            if keyframe:
+                detections = next(keyframe_detections)
+                if cut:
+                    # Nothing carries over a cut, so no motion is inferred across it
+                    self.tracker.tracks = []
+                self.tracker.update(detections)
+            else:
+                detections = self.tracker.predict(frame.shape)
+            results.append(detections)
+
+        self.frames_seen += len(frames)
+        self.frames_inferred += len(keyframes)
+        return results
+
+    def summary(self):
+        fraction = self.frames_inferred / self.frames_seen * 100 if self.frames_seen else 0.0
+        return (f"Detector ran on {self.frames_inferred}/{self.frames_seen} frames ({fraction:.1f}%), "
+                f"{self.scene_cut_count} scene cut(s)")
+
+
+def find_ffmpeg_command(ffmpeg_path=None):
+    """Return the ffmpeg executable to run (the provided path, else the one on PATH), or None."""
+    if ffmpeg_path and os.path.exists(ffmpeg_path):
+        return ffmpeg_path
+    return shutil.which("ffmpeg")
+
+
+def ffmpeg_has_encoder(ffmpeg_cmd, encoder):
+    try:
+        result = subprocess.run([ffmpeg_cmd, "-hide_banner", "-encoders"], stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, universal_newlines=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return re.search(rf"^\s*\S+\s+{re.escape(encoder)}\s", result.stdout, re.MULTILINE) is not None
+
+
+def probe_audio_codec(ffmpeg_cmd, media_path):
+    """
+    Return (has_audio, codec_name) for the first audio stream of media_path, parsed from
+    `ffmpeg -i` (ffprobe is not always shipped alongside ffmpeg).
+    """
+    try:
+        result = subprocess.run([ffmpeg_cmd, "-hide_banner", "-i", media_path], stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE, universal_newlines=True, errors="replace", timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return False, None
+    match = re.search(r"Stream #\d+:\d+.*?: Audio: (\w+)", result.stderr)
+    return (True, match.group(1)) if match else (False, None)
+
+
+def keyframe_times(ffmpeg_cmd, media_path):
+    """
+    Presentation times (seconds) of the video keyframes of media_path. Only keyframes are
+    decoded (-skip_frame nokey), so this stays fast for long inputs. Returns [] on failure.
+    """
+    command = [ffmpeg_cmd, "-hide_banner", "-nostats", "-skip_frame", "nokey", "-i", media_path,
+               "-map", "0:v:0", "-vf", "showinfo", "-f", "null", "-"]
+    try:
+        result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                universal_newlines=True, errors="replace", timeout=600)
+    except (OSError, subprocess.SubprocessError):
+        return []
+    if result.returncode != 0:
+        return []
+    return [float(t) for t in re.findall(r"Parsed_showinfo.*?pts_time:\s*(-?[\d.]+)", result.stderr)]
+
+
+def concat_segments(ffmpeg_cmd, part_paths, output_path, audio_source=None):
+    """
+    Join encoded segment files losslessly with the ffmpeg concat demuxer (stream copy). With
+    audio_source, its first audio track is muxed in the same run. Returns True on success.
+    """
+    list_path = f"{output_path}.segments.txt"
+    with open(list_path, "w", encoding="utf-8") as list_file:
+        for part_path in part_paths:
+            escaped = os.path.abspath(part_path).replace("'", "'\\''")
+            list_file.write(f"file '{escaped}'\n")
+
+    command = [ffmpeg_cmd, "-hide_banner", "-loglevel", "error", "-y", "-f", "concat", "-safe", "0", "-i", list_path]
+    if audio_source:
+        has_audio, audio_codec = probe_audio_codec(ffmpeg_cmd, audio_source)
+        if has_audio:
+            audio_mode = "copy" if audio_codec in CONFIG['MP4_AUDIO_COPY_CODECS'] else "aac"
+            command += ["-i", audio_source, "-map", "0:v:0", "-map", "1:a:0", "-c:a", audio_mode]
+    command += ["-c:v", "copy", "-movflags", "+faststart", output_path]
+
+    try:
+        result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                universal_newlines=True, errors="replace")
+    except OSError as e:
+        print(f"Could not run ffmpeg to join segments: {e}")
+        return False
+    finally:
+        os.remove(list_path)
+    if result.returncode != 0:
+        print(f"Joining segments into {output_path} failed: {result.stderr.strip()}")
+        return False
+    return True
+
+
+class FFmpegPipeWriter:
+    """
+    Drop-in for cv2.VideoWriter (isOpened/write/release) that pipes raw BGR frames into one
+    ffmpeg process over stdin. Video is encoded once with H.264 (configurable preset/CRF).
+    When audio_source is given, its first audio track is muxed in the same run, stream-copied
+    when MP4 can hold it and re-encoded to AAC otherwise, with no temporary files.
+    """
+
+    def __init__(self, output_path, width, height, fps, ffmpeg_cmd, audio_source=None, preset=None, crf=None):
+        self.output_path = output_path
+        self.has_audio = False
+        self.error = None
+        self._stderr = []
+
+        command = [
+            ffmpeg_cmd, "-hide_banner", "-loglevel", "error", "-y",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", f"{fps}", "-i", "-",
+        ]
+        if audio_source:
+            self.has_audio, audio_codec = probe_audio_codec(ffmpeg_cmd, audio_source)
+            if self.has_audio:
+                audio_mode = "copy" if audio_codec in CONFIG['MP4_AUDIO_COPY_CODECS'] else "aac"
+                command += ["-i", audio_source, "-map", "0:v:0", "-map", "1:a:0", "-c:a", audio_mode]
+                print(f"Muxing audio from {audio_source} ({audio_codec}, {'stream copy' if audio_mode == 'copy' else 're-encoded to AAC'})")
+            else:
+                print(f"No audio stream found in {audio_source}; encoding video only")
+        if width % 2 or height % 2:
+            # yuv420p needs even dimensions
+            command += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"]
+        command += [
+            "-c:v", CONFIG['FFMPEG_VIDEO_CODEC'],
+            "-preset", preset or CONFIG['FFMPEG_PRESET'],
+            "-crf", str(CONFIG['FFMPEG_CRF'] if crf is None else crf),
+            "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+            output_path,
+        ]
+
+        try:
+            self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except OSError as e:
+            self.process = None
+            self.error = str(e)
+            return
+        # Drain stderr continuously so a chatty ffmpeg can never block on a full pipe
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_thread.start()
+        print(f"Using FFmpeg encoder: {CONFIG['FFMPEG_VIDEO_CODEC']} (preset {preset or CONFIG['FFMPEG_PRESET']}, "
+              f"crf {CONFIG['FFMPEG_CRF'] if crf is None else crf})")
+
+    def _drain_stderr(self):
+        for line in iter(self.process.stderr.readline, b""):
+            self._stderr.append(line.decode("utf-8", "replace").rstrip())
+            del self._stderr[:-20]
+
+    def isOpened(self):
+        return self.process is not None and self.error is None and self.process.poll() is None
+
+    def write(self, frame):
+        if self.error is not None:
+            return
+        try:
+            self.process.stdin.write(memoryview(np.ascontiguousarray(frame)).cast("B"))
+        except (BrokenPipeError, OSError) as e:
+            self.error = f"ffmpeg stopped accepting frames: {e}"
+
+    def release(self):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        returncode = self.process.wait()
+        self._stderr_thread.join(timeout=5)
+        if returncode != 0 and self.error is None:
+            self.error = f"ffmpeg exited with code {returncode}"
+        if self.error is not None and self._stderr:
+            self.error += ": " + " | ".join(self._stderr[-3:])
+
+    @property
+    def succeeded(self):
+        return self.error is None
+
+
 def download_model(url, save_path):
     """Download the ONNX model from the provided URL and save it to the specified path."""
     import urllib.request
@@ -255,6 +981,13 @@ def download_model(url, save_path):
         print(f"Error downloading model: {str(e)}")
         return False
 
+def _session_options():
+    """onnxruntime session options; limits intra-op threads when CONFIG['ONNX_INTRA_OP_THREADS'] is set."""
+    options = onnxruntime.SessionOptions()
+    if CONFIG['ONNX_INTRA_OP_THREADS'] > 0:
+        options.intra_op_num_threads = CONFIG['ONNX_INTRA_OP_THREADS']
+    return options
+
 class NudeDetector:
     def __init__(self, providers=None):
         # 1) locate the shipped model
@@ -272,10 +1005,8 @@ class NudeDetector:
         # 2) convert/downgrade to opset15 on first run
         model_to_load = _ensure_opset15(model_orig)
         # 3) now load the compatible model
-        self.onnx_session = onnxruntime.InferenceSession(
-            model_to_load,
-            providers=C.get_available_providers() if not providers else providers,
-        )
+        self.providers = C.get_available_providers() if not providers else providers
+        self.onnx_session = onnxruntime.InferenceSession(model_to_load, sess_options=_session_options(), providers=self.providers)
 
         # 4) pull out input shape & name as before
         inp = self.onnx_session.get_inputs()[0]
@@ -283,9 +1014,18 @@ class NudeDetector:
         self.input_width  = inp.shape[2]  # 320
         self.input_height = inp.shape[3]  # 320
 
+        # 5) frames per session.run; None = any batch size (dynamic batch dimension)
+        self.max_batch = None
+        if isinstance(inp.shape[0], int):
+            self.max_batch = inp.shape[0]
+            self._load_dynamic_batch_model(model_to_load)
+
         # Initialize exception rules to None
         self.blur_exception_rules = None
 
+        # Optional FrameDumpWriter; without one, frame dumps are written synchronously
+        self.frame_writer = None
+
     def load_exception_rules(self, rule_file_path):
         if not rule_file_path:
             rule_file_path = "BlurException.rule"
@@ -304,18 +1044,61 @@ class NudeDetector:
     def should_apply_blur(self, label):
         return self.blur_exception_rules.get(label, True)
 
+    def _load_dynamic_batch_model(self, model_path):
+        """
+        The exported graph has a fixed batch dimension: switch to a dynamic-batch copy,
+        but only if it gives the same results as the original for a batch of 2.
+        """
+        try:
+            dyn_path = _ensure_dynamic_batch(model_path)
+            session = onnxruntime.InferenceSession(dyn_path, sess_options=_session_options(), providers=self.providers)
+
+            rng = np.random.default_rng(0)
+            sample = rng.random((2, 3, self.input_width, self.input_height), dtype=np.float32)
+            batched = session.run(None, {self.input_name: sample})[0]
+            single = np.concatenate([self.onnx_session.run(None, {self.input_name: sample[i:i + 1]})[0] for i in range(2)])
+            if batched.shape != single.shape or not np.allclose(batched, single, rtol=1e-3, atol=1e-3):
+                raise ValueError("batched output differs from per-frame output")
+        except Exception as e:
+            print(f"Batched inference unavailable, running {self.max_batch} frame(s) per call: {e}")
+            return
+
+        self.onnx_session = session
+        self.max_batch = None
+        print(f"Using dynamic-batch model: {dyn_path}")
+
     def detect_frame(self, frame):
-        preprocessed_image, resize_factor, pad_left, pad_top = _read_frame(
-            frame, self.input_width
-        )
-        outputs = self.onnx_session.run(None, {self.input_name: preprocessed_image})
-        detections = _postprocess(outputs, resize_factor, pad_left, pad_top)
+        return self.detect_frames([frame])[0]
+
+    def detect_frames(self, frames):
+        """
+        Detect on several frames with one session.run per batch. Consecutive frames of the
+        same size are stacked into one NCHW tensor; returns one detection list per frame.
+        """
+        detections = []
+        start = 0
+        while start < len(frames):
+            limit = len(frames) if self.max_batch is None else min(len(frames), start + self.max_batch)
+            end = start + 1
+            while end < limit and frames[end].shape == frames[start].shape:
+                end += 1
+
+            preprocessed_images, resize_factor, pad_left, pad_top = _read_frames(frames[start:end], self.input_width)
+            outputs = self.onnx_session.run(None, {self.input_name: preprocessed_images})
+            detections.extend(_postprocess_batch(outputs, resize_factor, pad_left, pad_top))
+            start = end
 
         return detections
 
     def censor_frame(self, frame, detections, output_path, nsfw_percentage=None, force_full_blur=False):
-        img_boxes = frame.copy()
-        img_combined = frame.copy()
+        """
+        Censor frame in place. When output_path is set, the censored image and a copy with
+        boxes are also dumped to output_frames/ (through frame_writer when one is attached).
+        output_path=None skips the dump images entirely.
+        """
+        dump = output_path is not None
+        img_boxes = frame.copy() if dump else None
+        img_combined = frame.copy() if dump else None
 
         font = cv2.FONT_HERSHEY_SIMPLEX
         font_scale = CONFIG['FONT_SCALE']
@@ -326,16 +1109,9 @@ class NudeDetector:
             # Check if we should use solid color or blur
             if CONFIG['USE_SOLID_COLOR']:
                 # Apply a solid color to the entire frame
-                height, width = img_combined.shape[:2]
-                img_combined = np.full((height, width, 3), CONFIG['SOLID_COLOR'], dtype=np.uint8)
-                # Also update the original frame for video output
-                frame[:] = np.full((height, width, 3), CONFIG['SOLID_COLOR'], dtype=np.uint8)
+                frame[:] = CONFIG['SOLID_COLOR']
             else:
                 # Apply a strong blur to the entire frame to fully conceal all content
-                img_combined = cv2.GaussianBlur(img_combined, 
-                                              (CONFIG['FULL_BLUR_STRENGTH'][0], CONFIG['FULL_BLUR_STRENGTH'][1]), 
-                                              CONFIG['FULL_BLUR_STRENGTH'][2])
-                # Also update the original frame for video output
                 frame[:] = cv2.GaussianBlur(frame, 
                                           (CONFIG['FULL_BLUR_STRENGTH'][0], CONFIG['FULL_BLUR_STRENGTH'][1]), 
                                           CONFIG['FULL_BLUR_STRENGTH'][2])
@@ -343,20 +1119,21 @@ class NudeDetector:
             # Add a warning text overlay
             warning_text = "Content Filtered - Excessive NSFW Content"
             text_size = cv2.getTextSize(warning_text, font, 1.0, 2)[0]
-            text_x = (img_combined.shape[1] - text_size[0]) // 2
-            text_y = (img_combined.shape[0] + text_size[1]) // 2
-            cv2.putText(img_combined, warning_text, (text_x, text_y), font, 1.0, (0, 0, 255), 2, cv2.LINE_AA)
-            # Also add warning text to the original frame
+            text_x = (frame.shape[1] - text_size[0]) // 2
+            text_y = (frame.shape[0] + text_size[1]) // 2
             cv2.putText(frame, warning_text, (text_x, text_y), font, 1.0, (0, 0, 255), 2, cv2.LINE_AA)
-            
-            # Still draw boxes on the box image for reference
-            for detection in detections:
-                box = detection["box"]
-                x, y, w, h = box[0], box[1], box[2], box[3]
-                label = detection["class"]
-                is_exposed = "EXPOSED" in label
-                box_color = CONFIG['BOX_COLOR_EXPOSED'] if is_exposed else CONFIG['BOX_COLOR_NORMAL']
-                cv2.rectangle(img_boxes, (x, y), (x + w, y + h), box_color, 2)
+
+            if dump:
+                # The combined image is the fully filtered frame itself
+                img_combined = frame.copy()
+                # Still draw boxes on the box image for reference
+                for detection in detections:
+                    box = detection["box"]
+                    x, y, w, h = box[0], box[1], box[2], box[3]
+                    label = detection["class"]
+                    is_exposed = "EXPOSED" in label
+                    box_color = CONFIG['BOX_COLOR_EXPOSED'] if is_exposed else CONFIG['BOX_COLOR_NORMAL']
+                    cv2.rectangle(img_boxes, (x, y), (x + w, y + h), box_color, 2)
         else:
             # Normal processing for individual detections
             for detection in detections:
@@ -381,41 +1158,43 @@ class NudeDetector:
                     if is_exposed and self.should_apply_blur(label):
                         # Check if we should use solid color instead of blur
                         if CONFIG['USE_SOLID_COLOR']:
-                            # Apply solid color mask
-                            img_combined[y:y + h, x:x + w] = np.full(
-                                (h, w, 3), CONFIG['SOLID_COLOR'], dtype=np.uint8
-                            )
-                            # Also update the original frame for video output
-                            frame[y:y + h, x:x + w] = np.full(
-                                (h, w, 3), CONFIG['SOLID_COLOR'], dtype=np.uint8
-                            )
+                            # Apply solid color mask to the video frame (and the dump image)
+                            frame[y:y + h, x:x + w] = CONFIG['SOLID_COLOR']
+                            if dump:
+                                img_combined[y:y + h, x:x + w] = CONFIG['SOLID_COLOR']
                         else:
                             # Apply blur with configured strength
-                            img_combined[y:y + h, x:x + w] = cv2.GaussianBlur(img_combined[y:y + h, x:x + w], 
-                                                                       (blur_kernel[0], blur_kernel[1]), 
-                                                                       blur_kernel[2])
-                            # Also update the original frame for video output
                             frame[y:y + h, x:x + w] = cv2.GaussianBlur(frame[y:y + h, x:x + w], 
                                                                      (blur_kernel[0], blur_kernel[1]), 
                                                                      blur_kernel[2])
-                    else:
+                            if dump:
+                                img_combined[y:y + h, x:x + w] = cv2.GaussianBlur(img_combined[y:y + h, x:x + w], 
+                                                                           (blur_kernel[0], blur_kernel[1]), 
+                                                                           blur_kernel[2])
+                    elif dump:
                         cv2.rectangle(img_boxes, (x, y), (x + w, y + h), box_color, 2)
                         cv2.putText(img_boxes, label_text, (x, y - 5), font, font_scale, text_color, font_thickness, cv2.LINE_AA)
-                else:
+                elif dump:
                     cv2.rectangle(img_boxes, (x, y), (x + w, y + h), box_color, 2)
                     cv2.putText(img_boxes, label_text, (x, y - 5), font, font_scale, text_color, font_thickness, cv2.LINE_AA)
 
-                # Always draw boxes and labels on combined image
-                cv2.rectangle(img_combined, (x, y), (x + w, y + h), box_color, 2)
-                cv2.putText(img_combined, label_text, (x, y - 5), font, font_scale, text_color, font_thickness, cv2.LINE_AA)
+                if dump:
+                    # Always draw boxes and labels on combined image
+                    cv2.rectangle(img_combined, (x, y), (x + w, y + h), box_color, 2)
+                    cv2.putText(img_combined, label_text, (x, y - 5), font, font_scale, text_color, font_thickness, cv2.LINE_AA)
+
+        if not dump:
+            return
 
         # Save frames to the "output_frames" folder instead of the provided output path
         output_path = os.path.join("output_frames", f"{os.path.basename(output_path)}")
-        cv2.imwrite(output_path, img_combined)
-        cv2.imwrite(f"{output_path}_boxes.jpg", img_boxes)
+        if self.frame_writer is not None:
+            self.frame_writer.submit(output_path, img_combined)
+            self.frame_writer.submit(f"{output_path}_boxes.jpg", img_boxes)
+        else:
+            cv2.imwrite(output_path, img_combined)
+            cv2.imwrite(f"{output_path}_boxes.jpg", img_boxes)
 
-       # print(f"Processed frame {output_path}")
-        
     def blur_all_frames(self, frame_list, nsfw_percentage=None):
         exposed_frame_count = 0
 
@@ -443,127 +1222,531 @@ class NudeDetector:
         return exposed_count
 
 
+DETECTIONS_FORMAT_VERSION = 1
+
+def source_fingerprint(path, samples=64, chunk_size=1024 * 1024):
+    """
+    Fingerprint of a (possibly very large) file: SHA-256 over its size and `samples` evenly
+    spaced chunks. Cheap enough to compute on every run, and any re-encode or edit changes it.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, "rb") as source:
+        if size <= samples * chunk_size:
+            for block in iter(lambda: source.read(chunk_size), b""):
+                digest.update(block)
+        else:
+            step = (size - chunk_size) // (samples - 1)
+            for index in range(samples):
+                source.seek(index * step)
+                digest.update(source.read(chunk_size))
+    return digest.hexdigest()
+
+def save_detections(path, frame_detections, fingerprint, fps):
+    """
+    Write per-frame detections as a columnar .npz: one row per box (frame_index, boxes, classes,
+    scores) plus the number of frames, the class names and the source fingerprint.
+    """
+    class_names = sorted({d["class"] for detections in frame_detections for d in detections})
+    class_ids = {name: i for i, name in enumerate(class_names)}
+    rows = [(frame_index, d) for frame_index, detections in enumerate(frame_detections) for d in detections]
+
+    tmp_path = f"{path}.tmp.npz"
+    np.savez_compressed(
+        tmp_path,
+        version=np.int32(DETECTIONS_FORMAT_VERSION),
+        source_fingerprint=np.str_(fingerprint),
+        fps=np.float64(fps),
+        frame_count=np.int64(len(frame_detections)),
+        class_names=np.array(class_names, dtype=str),
+        frame_index=np.array([frame_index for frame_index, _ in rows], dtype=np.int64),
+        boxes=np.array([d["box"] for _, d in rows], dtype=np.int32).reshape(-1, 4),
+        classes=np.array([class_ids[d["class"]] for _, d in rows], dtype=np.int16),
+        scores=np.array([d["score"] for _, d in rows], dtype=np.float32),
+    )
+    os.replace(tmp_path, path)
+
+def load_detections(path):
+    """
+    Read a sidecar written by save_detections. Returns (frame_detections, source_fingerprint);
+    raises ValueError if the file is not a detection sidecar of a supported version.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        if "version" not in data or int(data["version"]) != DETECTIONS_FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {DETECTIONS_FORMAT_VERSION} detection file")
+        class_names = data["class_names"].tolist()
+        frame_detections = [[] for _ in range(int(data["frame_count"]))]
+        for frame_index, box, class_id, score in zip(data["frame_index"].tolist(), data["boxes"].tolist(),
+                                                     data["classes"].tolist(), data["scores"].tolist()):
+            frame_detections[frame_index].append({"class": class_names[class_id], "score": score, "box": box})
+        return frame_detections, str(data["source_fingerprint"])
+
+
 class NudeVideoProcessor:
-    def __init__(self, video_path, output_folder, task="video", providers=None, video_output_folder="video_output", blur_rule=0.5):
+    def __init__(self, video_path, output_folder, task="video", providers=None, video_output_folder="video_output", blur_rule=0.5, streaming=None, detect_every=1,
+                 save_frames="none", frame_sample=1, preview=False, frame_range=None, detector=None, progress=True,
+                 from_detections=None):
         self.task = task.lower()
         self.video_path = video_path
-        self.cap = cv2.VideoCapture(video_path)
+        # frame_range=(first_frame, frame_count) restricts processing to one segment of the input
+        # (0-based first frame, count None = to the end); frame numbers stay global
+        self.first_frame, self.segment_frames = frame_range or (0, None)
+        self.cap = open_video_at(video_path, self.first_frame)
         self.frame_width = int(self.cap.get(3))
         self.frame_height = int(self.cap.get(4))
+        self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if frame_range:
+            self.total_frames = self.segment_frames if self.segment_frames is not None else max(0, self.total_frames - self.first_frame)
+        # Progress bars and stage summaries (off in --segments worker processes)
+        self.progress = progress
+
+        # Per-frame detections from the detection pass (index 0 = frame 1)
+        self.frame_detections = []
+        # Decoded frames kept for the render passes, or None when streaming (frames are re-decoded)
+        self.frame_buffer = None
+
+        # Streaming mode keeps peak memory independent of video length.
+        # None = decide automatically from the estimated size of the decoded frames.
+        if streaming is None:
+            estimated_mb = self.total_frames * self.frame_width * self.frame_height * 3 / (1024 * 1024)
+            streaming = self.total_frames <= 0 or estimated_mb > CONFIG['FRAME_BUFFER_LIMIT_MB']
+        self.streaming = streaming
+
+        # Run the detector on every Nth frame (and scene cuts) only; boxes are tracked in between
+        self.detect_every = max(1, detect_every)
+
+        # Frame dumps in video mode: "none", "all" or "flagged" (frames with exposed content),
+        # sampled every frame_sample frames. -t frames always dumps (that is its output).
+        self.save_frames = "all" if self.task == "frames" else save_frames
+        self.frame_sample = max(1, frame_sample)
+        self.preview = PreviewWriter() if preview else None
 
         # Extract the input filename without extension for output naming
         self.input_filename = os.path.splitext(os.path.basename(video_path))[0]
-        print(f"Processing input file: {self.input_filename}")
+        if progress:
+            print(f"Processing input file: {self.input_filename}")
 
         # Get the original frame rate
         self.original_fps = self.cap.get(cv2.CAP_PROP_FPS)
         if self.original_fps <= 0:
             self.original_fps = 30.0  # Default to 30 fps if unable to determine
-        print(f"Original video FPS: {self.original_fps}")
+        if progress:
+            print(f"Original video FPS: {self.original_fps}")
 
-        self.detector = NudeDetector(providers)
-        self.detector.load_exception_rules("BlurException.rule")
+        if detector is None:
+            detector = NudeDetector(providers)
+            detector.load_exception_rules("BlurException.rule")
+        self.detector = detector
 
         self.output_folder = output_folder or "output_frames"
         self.video_output_folder = video_output_folder
         os.makedirs(self.output_folder, exist_ok=True)
         os.makedirs(self.video_output_folder, exist_ok=True)
 
+        # Detection sidecar: written after every detection pass; with from_detections ("auto" for
+        # the default location, or a path) the detections are loaded from it instead
+        self.detections_path = os.path.join(self.video_output_folder, f"{self.input_filename}{CONFIG['DETECTIONS_SUFFIX']}")
+        self.from_detections = self.detections_path if from_detections == "auto" else from_detections
+
         self.blur_rule = blur_rule
         # Store command line arguments for access within class methods
         global args
 
-    def process_video(self):
-        frame_count = 0
-        frame_list = []
-        exposed_count = 0
-        self.original_video_path = self.video_path  # Store original video path for audio extraction
+    def _frame_output_path(self, frame_number):
+        return os.path.join(self.output_folder, f"frame_{frame_number}.jpg")
 
-        with tqdm(total=int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)), desc="Processing Frames", unit="frames", ncols=100, mininterval=0.5) as pbar:
-            while True:
-                ret, frame = self.cap.read()
+    def _dump_path(self, frame_number, detections):
+        """Path censor_frame should dump this frame to, or None when it is not dumped."""
+        if self.save_frames == "none" or (frame_number - 1) % self.frame_sample:
+            return None
+        if self.save_frames == "flagged" and not self.check_exposed_count(detections):
+            return None
+        return self._frame_output_path(frame_number)
+
+    def iter_frames(self):
+        """
+        Yield (frame_number, frame, detections) for every frame of the detection pass.
+        In streaming mode frames are re-decoded from the input, so no pass ever holds
+        more than one decoded frame; otherwise the buffered frames are replayed.
+        Callers that modify a frame must copy it first when frames are buffered.
+        """
+        if self.frame_buffer is not None:
+            for frame_number, (frame, detections) in enumerate(zip(self.frame_buffer, self.frame_detections), start=self.first_frame + 1):
+                yield frame_number, frame, detections
+            return
 
+        cap = open_video_at(self.video_path, self.first_frame)
+        try:
+            for frame_number, detections in enumerate(self.frame_detections, start=self.first_frame + 1):
+                ret, frame = cap.read()
                 if not ret:
+                    print(f"Warning: input ended at frame {frame_number - 1} while re-decoding (expected {self.first_frame + len(self.frame_detections)})")
                     break
+                yield frame_number, frame, detections
+        finally:
+            cap.release()
+
+    def _detect_batch(self, frames):
+        return self.detector.detect_frames(frames)
+
+    def _writable(self, frame):
+        """Buffered frames are reused by later passes, so censor a copy of them."""
+        return frame.copy() if self.frame_buffer is not None else frame
+
+    def _render_pass(self, desc, censor, write, preview=False, **tqdm_kwargs):
+        """
+        Re-render every frame through censor() in a thread pool; write() receives frames in order.
+        censor() may return a tuple of frames (one per output video) that is passed to write() as is.
+        With preview=True the rendered frames (the first of a tuple) also feed the GUI preview image.
+        """
+        def sink(frame_number, frame, detections):
+            write(frame)
+            if preview and self.preview and self.preview.due():
+                self.preview.update(frame[0] if isinstance(frame, tuple) else frame)
+
+        pipeline = FramePipeline(self.iter_frames(), censor=censor)
+        with tqdm(total=len(self.frame_detections), desc=desc, unit="frames", ncols=100, mininterval=0.5,
+                  disable=not self.progress, **tqdm_kwargs) as pbar:
+            pipeline.run(sink, pbar)
+        if self.progress:
+            tqdm.write(f"{desc} - stage throughput (frames/s): {pipeline.summary()}")
+
+    def _open_video_writer(self, output_path, audio_output_path=None):
+        """
+        Open the encoder for one output video. With --encoder ffmpeg/auto and ffmpeg available,
+        frames are piped into a single H.264 encode. With --encoder ffmpeg and audio_output_path
+        given, the original audio is muxed in the same run and the file is written there directly.
+        Otherwise (cv2.VideoWriter, or auto) the video goes to output_path and audio is added
+        afterwards by add_audio_to_video, so -a still leaves both files as before.
+        An explicit -c selects the OpenCV writer under auto.
+        Returns (writer, path being written, audio handled by the encoder).
+        """
+        encoder = args.encoder if args and hasattr(args, 'encoder') else "opencv"
+        if encoder == "auto":
+            if getattr(args, 'codec', None):
+                # The user picked an OpenCV codec
+                encoder = "opencv"
+            else:
+                audio_output_path = None
+        if encoder != "opencv":
+            ffmpeg_cmd = find_ffmpeg_command(args.ffmpeg_path if hasattr(args, 'ffmpeg_path') else None)
+            if ffmpeg_cmd and ffmpeg_has_encoder(ffmpeg_cmd, CONFIG['FFMPEG_VIDEO_CODEC']):
+                has_audio = False
+                if audio_output_path:
+                    has_audio, _ = probe_audio_codec(ffmpeg_cmd, self.video_path)
+                    if not has_audio:
+                        print(f"No audio stream found in {self.video_path}; writing video only")
+                target_path = audio_output_path if has_audio else output_path
+                writer = FFmpegPipeWriter(
+                    target_path, self.frame_width, self.frame_height, self.original_fps, ffmpeg_cmd,
+                    audio_source=self.video_path if has_audio else None,
+                    preset=getattr(args, 'preset', None), crf=getattr(args, 'crf', None),
+                )
+                if writer.isOpened():
+                    # Under auto, audio is still added afterwards
+                    return writer, target_path, encoder == "ffmpeg"
+                print(f"FFmpeg encoder could not be started ({writer.error}); falling back to OpenCV")
+            elif encoder == "ffmpeg":
+                print(f"FFmpeg with {CONFIG['FFMPEG_VIDEO_CODEC']} not found; falling back to OpenCV VideoWriter")
+
+        # Get codec preference from command line args
+        codec_preference = getattr(args, 'codec', None) or "mp4v"
+        # Create a safe video writer with the original FPS and preferred codec
+        writer = create_safe_video_writer(output_path, self.frame_width, self.frame_height, self.original_fps, codec_preference)
+        return writer, output_path, False
+
+    def _report_video(self, writer, video_path, audio_handled, audio_output_path, description):
+        """Print where an output ended up, adding audio afterwards when the encoder did not handle it."""
+        if isinstance(writer, FFmpegPipeWriter) and not writer.succeeded:
+            print(f"\nFFmpeg encoding of {video_path} failed: {writer.error}")
+            return
+        if audio_handled:
+            print(f"\n{description}{' with audio' if writer.has_audio else ''} saved at: {video_path}")
+        elif audio_output_path:
+            success = self.add_audio_to_video(video_path, self.video_path, audio_output_path)
+            if success:
+                print(f"\n{description} with audio saved at: {audio_output_path}")
+            else:
+                print(f"\nFailed to add audio. {description} saved at: {video_path}")
+        else:
+            print(f"\n{description} saved at: {video_path}")
 
-                frame_count += 1
-                detections = self.detector.detect_frame(frame)
-                output_path = os.path.join(self.output_folder, f"frame_{frame_count}.jpg")
+    def _audio_output_path(self, suffix):
+        """Output path of the audio variant, or None when -a is not set (or the input is gone)."""
+        if args and hasattr(args, 'with_audio') and args.with_audio and os.path.exists(self.video_path):
+            return os.path.join(self.video_output_folder, f"{self.input_filename}{suffix}")
+        return None
+
+    def _finish_frame_dumps(self):
+        """Wait for queued frame dumps to reach the disk."""
+        if self.detector.frame_writer is not None:
+            self.detector.frame_writer.close()
+            self.detector.frame_writer = None
+
+    def process_video(self):
+        self.original_video_path = self.video_path  # Store original video path for audio extraction
+
+        # Frame dumps are JPEG-encoded and written on background threads
+        if self.save_frames != "none":
+            self.detector.frame_writer = FrameDumpWriter()
 
-                if self.task == "frames":
-                    self.detector.censor_frame(frame, detections, output_path)
+        if self.task == "video" and self.from_detections and self.load_detection_sidecar(self.from_detections):
+            exposed_count = sum(1 for count in self.frame_exposed_counts if count > 0)
+        else:
+            exposed_count = self.detect_video()
+            if self.task == "video":
+                self.save_detection_sidecar()
+
+        try:
+            if self.task == "video":
+                if args and hasattr(args, 'boxes') and args.boxes:
+                    # When -b is specified, create a video with boxes
+                    # If --blur is also specified, include blur effect
+                    self.create_video_with_boxes(include_blur=hasattr(args, 'blur') and args.blur)
                 else:
-                    frame_list.append((frame.copy(), detections, output_path))
-                    
-                    # Count frames with exposed content (for monitoring)
-                    frame_exposed_count = self.check_exposed_count(detections)
-                    if frame_exposed_count > 0:
-                        exposed_count += 1  # Count frames with any exposed content
-                    
-                    # Log detection information for debugging
-                    if frame_count % 50 == 0:
-                        if frame_exposed_count > 0:
-                            exposed_labels = [d["class"] for d in detections if "EXPOSED" in d["class"]]
-                            print(f"Frame {frame_count}: {frame_exposed_count} exposed regions - {', '.join(exposed_labels)}")
-                        if frame_exposed_count >= CONFIG['FULL_BLUR_LABELS']:
-                            print(f"Frame {frame_count}: Has {frame_exposed_count} exposed labels (trigger threshold: {CONFIG['FULL_BLUR_LABELS']})")
+                    self.create_video(exposed_count, self.blur_rule)
+        finally:
+            self._finish_frame_dumps()
 
-                pbar.update(1)
+        # Release buffered frames as soon as rendering is done
+        self.frame_buffer = None
+
+    def detect_video(self):
+        """
+        Detection pass: decode the input (or this processor's segment of it) once and collect
+        per-frame detections. For -t frames the frames are censored and dumped on the way.
+        Returns the number of frames with exposed content.
+        """
+        exposed_count = 0
+        self.frame_detections = []
+        self.frame_exposed_counts = []
+        self.frame_buffer = None if self.streaming else []
+
+        if self.task == "video" and self.progress:
+            print(f"Frame buffering: {'streaming (frames re-decoded per pass)' if self.streaming else 'in memory'}")
+
+        def censor(frame_count, frame, detections):
+            self.detector.censor_frame(frame, detections, self._dump_path(frame_count, detections))
+            return frame
+
+        def collect(frame_count, frame, detections):
+            nonlocal exposed_count
+            if self.task == "frames":
+                return
+
+            # Only the compact detections are kept; frames are buffered only when small enough
+            self.frame_detections.append(detections)
+            if self.frame_buffer is not None:
+                self.frame_buffer.append(frame)
+
+            # The GUI preview only ever shows censored frames
+            if self.preview and self.preview.due():
+                preview_frame = frame.copy()
+                self.detector.censor_frame(preview_frame, detections, None)
+                self.preview.update(preview_frame)
+            
+            # Count frames with exposed content (for monitoring); the per-frame counts are
+            # all the full-blur rules need, so the verdict is known before rendering
+            frame_exposed_count = self.check_exposed_count(detections)
+            self.frame_exposed_counts.append(frame_exposed_count)
+            if frame_exposed_count > 0:
+                exposed_count += 1  # Count frames with any exposed content
+            
+            # Log detection information for debugging
+            if frame_count % 50 == 0:
+                if frame_exposed_count > 0:
+                    exposed_labels = [d["class"] for d in detections if "EXPOSED" in d["class"]]
+                    tqdm.write(f"Frame {frame_count}: {frame_exposed_count} exposed regions - {', '.join(exposed_labels)}")
+                if frame_exposed_count >= CONFIG['FULL_BLUR_LABELS']:
+                    tqdm.write(f"Frame {frame_count}: Has {frame_exposed_count} exposed labels (trigger threshold: {CONFIG['FULL_BLUR_LABELS']})")
+
+        sampler = KeyframeSampler(self._detect_batch, self.detect_every) if self.detect_every > 1 else None
+
+        # Decoding, inference (and censoring for -t frames) run as concurrent stages
+        pipeline = FramePipeline(
+            read_video_frames(self.cap, self.first_frame, self.segment_frames),
+            detect=sampler or self._detect_batch,
+            censor=censor if self.task == "frames" else None,
+        )
+        with tqdm(total=self.total_frames, desc="Processing Frames", unit="frames", ncols=100, mininterval=0.5,
+                  disable=not self.progress) as pbar:
+            pipeline.run(collect, pbar, sink_name="collect")
+        if self.progress:
+            tqdm.write(f"Detection - stage throughput (frames/s): {pipeline.summary()}")
+            if sampler:
+                tqdm.write(sampler.summary())
 
         self.cap.release()
+        return exposed_count
 
-        if self.task == "video":
-            if args and hasattr(args, 'boxes') and args.boxes:
-                # When -b is specified, create a video with boxes
-                # If --blur is also specified, include blur effect
-                self.create_video_with_boxes(frame_list, include_blur=hasattr(args, 'blur') and args.blur)
-            else:
-                self.create_video(frame_list, exposed_count, self.blur_rule)
+    def save_detection_sidecar(self):
+        """Write this run's detections to the sidecar, so --from-detections can re-render without inference."""
+        try:
+            save_detections(self.detections_path, self.frame_detections, source_fingerprint(self.video_path), self.original_fps)
+            print(f"Detections saved at: {self.detections_path}")
+        except (OSError, ValueError) as e:
+            print(f"Could not write detections file {self.detections_path}: {e}")
 
+    def load_detection_sidecar(self, path):
+        """Use the detections stored in a sidecar instead of running the detector. Returns False if it cannot be used."""
+        try:
+            frame_detections, fingerprint = load_detections(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not read detections file {path} ({e}); running the detector instead")
+            return False
+        if fingerprint != source_fingerprint(self.video_path):
+            print(f"Detections file {path} was written for a different input; running the detector instead")
+            return False
 
- 
-    def create_video(self, frame_list, exposed_count, blur_rule):
-        if not frame_list:
-            return
+        self.cap.release()
+        self.frame_detections = frame_detections
+        self.frame_exposed_counts = [self.check_exposed_count(detections) for detections in frame_detections]
+        # Frames are decoded by the render pass only
+        self.frame_buffer = None
+        print(f"Loaded detections for {len(frame_detections)} frames from {path}; skipping inference")
+        return True
 
-        img_height, img_width = frame_list[0][0].shape[:2]
-        
-        # Get codec preference from command line args
-        codec_preference = args.codec if args and hasattr(args, 'codec') else "mp4v"
-        
-        # Use input filename for output naming
-        output_filename = f"{self.input_filename}{CONFIG['OUTPUT_VIDEO_SUFFIX']}"
-        output_path = os.path.join(self.video_output_folder, output_filename)
-        
-        # Create a safe video writer with the original FPS and preferred codec
-        out = create_safe_video_writer(output_path, img_width, img_height, self.original_fps, codec_preference)
-        
-        if not out.isOpened():
-            print("Failed to create video writer. Check your codec installation.")
-            return
+    def process_video_segmented(self, segments):
+        """
+        Process the input as keyframe-aligned segments in a pool of worker processes, each with its
+        own ONNX session and a share of the CPU threads. Detections are merged first so the -r/-fbr
+        rules still apply to the whole video; then every worker renders its segment and the parts
+        are joined losslessly with the ffmpeg concat demuxer (audio is muxed in the same step).
+        """
+        ffmpeg_cmd = find_ffmpeg_command(args.ffmpeg_path if args and hasattr(args, 'ffmpeg_path') else None)
+        if not ffmpeg_cmd:
+            print("Segment processing needs FFmpeg to join the parts; processing as a single segment")
+            return self.process_video()
+        if args and hasattr(args, 'boxes') and args.boxes:
+            print("Segment processing is not available with -b; processing as a single segment")
+            return self.process_video()
+
+        bounds = self._segment_bounds(ffmpeg_cmd, segments)
+        if len(bounds) < 3:
+            print("Video is too short to split; processing as a single segment")
+            return self.process_video()
+        self.original_video_path = self.video_path
+        loaded = bool(self.from_detections) and self.load_detection_sidecar(self.from_detections)
+        self.cap.release()
 
-        total_frames = len(frame_list)
-        with tqdm(total=total_frames, desc="Processing Video", unit="frames", ncols=100, mininterval=0.5) as pbar:
-            for frame, detections, output_path in frame_list:
-                # Create a copy of the frame to avoid modifying the original in frame_list
-                frame_to_process = frame.copy()
-                self.detector.censor_frame(frame_to_process, detections, output_path, nsfw_percentage=exposed_count)
-                out.write(frame_to_process)
-                pbar.update(1)
+        # (first frame, frame count); the last segment runs to the end of the input,
+        # since the container's frame count can be approximate
+        ranges = [(start, end - start) for start, end in zip(bounds, bounds[1:])]
+        ranges[-1] = (ranges[-1][0], None)
+
+        cpu_count = os.cpu_count() or 1
+        workers = min(len(ranges), cpu_count)
+        threads = max(1, cpu_count // workers)
+        print(f"Processing {len(ranges)} segments in {workers} worker processes ({threads} thread(s) each)")
+        options = {
+            "output_folder": self.output_folder,
+            "video_output_folder": self.video_output_folder,
+            "detect_every": self.detect_every,
+            "save_frames": self.save_frames,
+            "frame_sample": self.frame_sample,
+        }
+
+        parts_dir = os.path.join(self.video_output_folder, f".{self.input_filename}_segments")
+        context = multiprocessing.get_context("spawn")
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_segment_worker,
+                                     initargs=(CONFIG, args, threads)) as pool:
+                if loaded:
+                    # 1) Detections come from the sidecar; split them along the segment bounds
+                    results = [(self.frame_detections[start:start + count if count is not None else None],
+                                self.frame_exposed_counts[start:start + count if count is not None else None])
+                               for start, count in ranges]
+                else:
+                    # 1) Detection, merged back in frame order
+                    results = [None] * len(ranges)
+                    futures = {pool.submit(_detect_segment, self.video_path, frame_range, options): index
+                               for index, frame_range in enumerate(ranges)}
+                    with tqdm(total=self.total_frames, desc="Processing Frames", unit="frames", ncols=100) as pbar:
+                        for future in as_completed(futures):
+                            results[futures[future]] = future.result()
+                            pbar.update(len(results[futures[future]][0]))
+
+                ranges = [(start, len(detections)) for (start, _), (detections, _) in zip(ranges, results)]
+                for (start, count), (next_start, _) in zip(ranges, ranges[1:]):
+                    if start + count != next_start:
+                        print(f"Warning: segment starting at frame {start + 1} decoded {count} frames, expected {next_start - start}")
+                self.frame_detections = [d for detections, _ in results for d in detections]
+                self.frame_exposed_counts = [c for _, counts in results for c in counts]
+                if not loaded:
+                    self.save_detection_sidecar()
+
+                # 2) Full-blur verdict over the whole video
+                apply_full_blur, blur_reason, nsfw_percentage = self.full_blur_verdict(self.blur_rule)
+                if apply_full_blur:
+                    print(f"\nWARNING: {blur_reason}")
+                    print(f"Applying full video blur as per monitoring rules (-r option)")
+
+                # 3) Each worker renders (and encodes) its own segment
+                os.makedirs(parts_dir, exist_ok=True)
+                part_paths = [os.path.join(parts_dir, f"part{index:04d}.mp4") for index in range(len(ranges))]
+                blurred_paths = [os.path.join(parts_dir, f"part{index:04d}_fully_blurred.mp4") for index in range(len(ranges))]
+                futures = {}
+                for index, ((start, count), (detections, _)) in enumerate(zip(ranges, results)):
+                    future = pool.submit(_render_segment, self.video_path, (start, count), detections, options,
+                                         part_paths[index], blurred_paths[index] if apply_full_blur else None, nsfw_percentage)
+                    futures[future] = count
+                with tqdm(total=len(self.frame_detections), desc="Processing Video", unit="frames", ncols=100) as pbar:
+                    for future in as_completed(futures):
+                        future.result()
+                        pbar.update(futures[future])
+
+            # 4) Join the parts
+            if apply_full_blur:
+                self._join_segments(ffmpeg_cmd, blurred_paths, "_fully_blurred.mp4", "_fully_blurred_with_audio.mp4", "Fully blurred video")
+            self._join_segments(ffmpeg_cmd, part_paths, CONFIG['OUTPUT_VIDEO_SUFFIX'], CONFIG['OUTPUT_VIDEO_AUDIO_SUFFIX'], "Video")
+        finally:
+            shutil.rmtree(parts_dir, ignore_errors=True)
 
-        out.release()
+        # Delete frame images if requested
+        if args and hasattr(args, 'delete_frames') and args.delete_frames:
+            self.delete_processed_frames()
 
+    def _segment_bounds(self, ffmpeg_cmd, segments):
+        """
+        First frame of each segment followed by the total frame count. Splits are evenly spaced and
+        snapped to the nearest keyframe, so every worker starts decoding on one.
+        """
+        min_frames = max(1, int(CONFIG['SEGMENT_MIN_SECONDS'] * self.original_fps))
+        segments = min(segments, self.total_frames // min_frames)
+        if segments < 2:
+            return [0, self.total_frames]
+
+        times = keyframe_times(ffmpeg_cmd, self.video_path)
+        keyframes = sorted({int(round((t - times[0]) * self.original_fps)) for t in times}) if times else []
+        if not keyframes:
+            print("Keyframe index unavailable; splitting at evenly spaced frames")
+
+        bounds = [0]
+        for index in range(1, segments):
+            split = self.total_frames * index // segments
+            if keyframes:
+                split = min(keyframes, key=lambda keyframe: abs(keyframe - split))
+            if bounds[-1] < split < self.total_frames:
+                bounds.append(split)
+        bounds.append(self.total_frames)
+        return bounds
+
+    def _join_segments(self, ffmpeg_cmd, part_paths, suffix, audio_suffix, description):
+        """Concatenate rendered segments into the final output, with the original audio when -a is set."""
+        audio_output_path = self._audio_output_path(audio_suffix)
+        has_audio = audio_output_path is not None and probe_audio_codec(ffmpeg_cmd, self.video_path)[0]
+        output_path = audio_output_path if has_audio else os.path.join(self.video_output_folder, f"{self.input_filename}{suffix}")
+        if concat_segments(ffmpeg_cmd, part_paths, output_path, self.video_path if has_audio else None):
+            print(f"\n{description}{' with audio' if has_audio else ''} saved at: {output_path}")
+
+    def full_blur_verdict(self, blur_rule):
+        """
+        Decide from the per-frame exposed counts of the detection pass whether the -r / -fbr
+        rules require a fully blurred video. Returns (apply_full_blur, reason, nsfw_percentage).
+        """
         # Calculate the percentage of frames with NSFW content
-        total_exposed_boxes, frames_with_exposed, nsfw_percentage = self.check_exposed_regions(frame_list)
-        
-        # Get monitoring thresholds from CONFIG or command-line arguments
-        # If blur_rule contains actual values (not zeros), use them
-        # Otherwise, fall back to CONFIG values
-        blur_rule_percentage, blur_rule_count = blur_rule
-        
-        # Use the rule values if provided (non-zero), otherwise use config defaults
-        threshold_percentage = blur_rule_percentage if blur_rule_percentage > 0 else CONFIG['MONITOR_THRESHOLD_PERCENT']
-        threshold_count = blur_rule_count if blur_rule_count > 0 else CONFIG['MONITOR_THRESHOLD_COUNT']
+        total_exposed_boxes, frames_with_exposed, nsfw_percentage = self.check_exposed_regions(self.frame_exposed_counts)
+        threshold_percentage, threshold_count = self.monitor_thresholds(blur_rule)
         
         # Determine if we need to apply full video blur based on monitoring rules
         apply_full_blur = False
@@ -578,12 +1761,168 @@ class NudeVideoProcessor:
             blur_reason = f"Frames with exposed content ({frames_with_exposed}) exceeds threshold ({threshold_count})"
             
         # Check -fbr rule (specific label count in frames)
-        should_full_blur, full_blur_reason = self.should_apply_full_blur(frame_list)
+        should_full_blur, full_blur_reason = self.should_apply_full_blur(self.frame_exposed_counts)
         if should_full_blur:
             apply_full_blur = True
             blur_reason = full_blur_reason
+
+        return apply_full_blur, blur_reason, nsfw_percentage
+
+    def _render_censored(self, out, blurred_out, nsfw_percentage):
+        """One render pass writing the individually censored video to out and, if given, the fully blurred one to blurred_out."""
+        def censor_standard(frame_number, frame, detections):
+            # Individually censored frame (the only one dumped to output_frames/)
+            standard_frame = self._writable(frame) if blurred_out is None else frame.copy()
+            self.detector.censor_frame(standard_frame, detections, self._dump_path(frame_number, detections), nsfw_percentage=nsfw_percentage)
+            if blurred_out is None:
+                return standard_frame
+            # Fully blurred frame, rendered from the same decoded frame
+            blurred_frame = self._writable(frame)
+            self.detector.censor_frame(blurred_frame, detections, None, nsfw_percentage=nsfw_percentage, force_full_blur=True)
+            return standard_frame, blurred_frame
+
+        def write_frames(frames):
+            if blurred_out is None:
+                out.write(frames)
+            else:
+                out.write(frames[0])
+                blurred_out.write(frames[1])
+
+        self._render_pass("Processing Video", censor_standard, write_frames, preview=True)
+
+    def monitor_thresholds(self, blur_rule):
+        """(percentage, count) thresholds of the -r rule."""
+        # Get monitoring thresholds from CONFIG or command-line arguments
+        # If blur_rule contains actual values (not zeros), use them
+        # Otherwise, fall back to CONFIG values
+        blur_rule_percentage, blur_rule_count = blur_rule
         
-        # Create a new video with appropriate blurring
+        # Use the rule values if provided (non-zero), otherwise use config defaults
+        threshold_percentage = blur_rule_percentage if blur_rule_percentage > 0 else CONFIG['MONITOR_THRESHOLD_PERCENT']
+        threshold_count = blur_rule_count if blur_rule_count > 0 else CONFIG['MONITOR_THRESHOLD_COUNT']
+        return threshold_percentage, threshold_count
+
+    def scan_video(self, sample_fps=None):
+        """
+        Quick verdict without writing any video: detect on frames sampled by seeking (sample_fps per
+        second, denser around hits) and evaluate the -r / -fbr rules with every frame taking the
+        exposed count of the nearest sampled frame. Stops early as soon as the sampled frames alone
+        already exceed a threshold. Returns (flagged, reason).
+        """
+        total = self.total_frames
+        if total <= 0:
+            self.cap.release()
+            print("Cannot scan: the input does not report its frame count")
+            return False, ""
+
+        sample_fps = sample_fps or CONFIG['SCAN_SAMPLE_FPS']
+        step = max(1, int(round(self.original_fps / sample_fps)))
+        dense_step = max(1, step // CONFIG['SCAN_DENSE_FACTOR'])
+        print(f"Scanning every {step} frame(s), every {dense_step} frame(s) around hits")
+
+        # Sampled frames are real frames, so reaching these counts proves a breach on its own
+        threshold_percentage, threshold_count = self.monitor_thresholds(self.blur_rule)
+        exposed_needed = min(threshold_count, math.ceil(threshold_percentage * total / 100))
+        required_needed = CONFIG['FULL_BLUR_FRAMES']
+
+        pending = list(range(0, total, step))  # sorted, so already a heap
+        queued = set(pending)
+        sampled = {}  # frame index -> exposed label count
+        frames_exposed = frames_required = 0
+        next_position = 0
+        stop_reason = ""
+        start_time = time.time()
+
+        with tqdm(total=len(pending), desc="Scanning", unit="samples", ncols=100, mininterval=0.5) as pbar:
+            while pending and not stop_reason:
+                positions, frames = [], []
+                popped = 0
+                while pending and len(frames) < CONFIG['PIPELINE_BATCH_SIZE']:
+                    position = heapq.heappop(pending)
+                    popped += 1
+                    # Short gaps are decoded through; seeking restarts at the previous keyframe
+                    gap = position - next_position
+                    if 0 <= gap <= CONFIG['SCAN_GRAB_LIMIT']:
+                        for _ in range(gap):
+                            self.cap.grab()
+                    else:
+                        self.cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+                    ret, frame = self.cap.read()
+                    next_position = position + 1
+                    if ret:
+                        positions.append(position)
+                        frames.append(frame)
+
+                for position, detections in zip(positions, self._detect_batch(frames) if frames else []):
+                    exposed = self.check_exposed_count(detections)
+                    sampled[position] = exposed
+                    if exposed >= CONFIG['FULL_BLUR_LABELS']:
+                        frames_required += 1
+                    if exposed > 0:
+                        frames_exposed += 1
+                    if exposed > 0 and position % step == 0:
+                        # Sample the neighbourhood of a base-rate hit more densely, on one global dense_step
+                        # grid - hits on dense samples add nothing, so a long exposed stretch costs
+                        # step / dense_step times the base rate instead of cascading to every frame
+                        first = (position - step) // dense_step + 1
+                        for neighbour in range(first * dense_step, position + step, dense_step):
+                            if 0 <= neighbour < total and neighbour not in queued:
+                                queued.add(neighbour)
+                                heapq.heappush(pending, neighbour)
+                                pbar.total += 1
+                pbar.update(popped)
+
+                if frames_exposed >= exposed_needed:
+                    stop_reason = (f"{frames_exposed} sampled frames with exposed content already reach the -r rule "
+                                   f"({threshold_percentage}% / {threshold_count} frames)")
+                elif frames_required >= required_needed:
+                    stop_reason = (f"{frames_required} sampled frames with {CONFIG['FULL_BLUR_LABELS']}+ exposed labels already "
+                                   f"reach the full blur rule ({CONFIG['FULL_BLUR_FRAMES']} frames)")
+        self.cap.release()
+
+        if stop_reason:
+            flagged, reason = True, stop_reason
+            print(f"\nStopped early after {len(sampled)} sampled frames")
+        elif not sampled:
+            print("\nNo frames could be decoded")
+            return False, ""
+        else:
+            # Every frame takes the exposed count of the nearest sampled frame
+            positions = np.array(sorted(sampled))
+            counts = np.array([sampled[position] for position in positions])
+            edges = np.concatenate(([0], (positions[1:] + positions[:-1] + 1) // 2, [total]))
+            self.frame_exposed_counts = np.repeat(counts, np.diff(edges)).tolist()
+
+            total_exposed_boxes, frames_with_exposed, exposed_percentage = self.check_exposed_regions(self.frame_exposed_counts)
+            print(f"\nEstimated from {len(sampled)} sampled frames: {frames_with_exposed} of {total} frames with exposed content "
+                  f"({exposed_percentage:.1f}%), {total_exposed_boxes} exposed regions")
+            flagged, reason, _ = self.full_blur_verdict(self.blur_rule)
+
+        elapsed = max(time.time() - start_time, 1e-6)
+        print(f"Scan result for {self.input_filename}: {'FLAGGED - ' + reason if flagged else 'OK'}")
+        print(f"Scanned in {elapsed:.1f}s ({total / self.original_fps / elapsed:.0f}x real time)")
+        return flagged, reason
+
+    def create_video(self, exposed_count, blur_rule):
+        if not self.frame_detections:
+            return
+
+        # The verdict only needs the detection pass, so both outputs are rendered in one pass
+        apply_full_blur, blur_reason, nsfw_percentage = self.full_blur_verdict(blur_rule)
+
+        # Use input filename for output naming
+        output_filename = f"{self.input_filename}{CONFIG['OUTPUT_VIDEO_SUFFIX']}"
+        output_path = os.path.join(self.video_output_folder, output_filename)
+        audio_output_path = self._audio_output_path(CONFIG['OUTPUT_VIDEO_AUDIO_SUFFIX'])
+        
+        # Open the encoder (with the original audio muxed in when possible)
+        out, output_path, audio_handled = self._open_video_writer(output_path, audio_output_path)
+        
+        if not out.isOpened():
+            print("Failed to create video writer. Check your codec installation.")
+            return
+
+        blurred_out = None
         if apply_full_blur:
             print(f"\nWARNING: {blur_reason}")
             print(f"Applying full video blur as per monitoring rules (-r option)")
@@ -591,142 +1930,100 @@ class NudeVideoProcessor:
             # Create a new video file with full blur applied
             blurred_filename = f"{self.input_filename}_fully_blurred.mp4"
             blurred_output_path = os.path.join(self.video_output_folder, blurred_filename)
-            blurred_out = create_safe_video_writer(blurred_output_path, img_width, img_height, self.original_fps, codec_preference)
+            blurred_audio_path = self._audio_output_path("_fully_blurred_with_audio.mp4")
+            blurred_out, blurred_output_path, blurred_audio_handled = self._open_video_writer(blurred_output_path, blurred_audio_path)
             
             if not blurred_out.isOpened():
                 print("Failed to create blurred video writer. Continuing with regular output.")
-            else:
-                # Process each frame with full blur
-                with tqdm(total=total_frames, desc="Applying Full Video Blur", unit="frames", ncols=100, mininterval=0.5) as pbar:
-                    for frame, detections, output_path in frame_list:
-                        # Create a blurred copy of the frame
-                        blurred_frame = frame.copy()
-                        # Apply the censor_frame method with force_full_blur=True
-                        self.detector.censor_frame(blurred_frame, detections, output_path, 
-                                                  nsfw_percentage=nsfw_percentage, force_full_blur=True)
-                        # Write the fully blurred frame to the output video
-                        blurred_out.write(blurred_frame)
-                        pbar.update(1)
-                
-                blurred_out.release()
-                print(f"Fully blurred video saved to: {blurred_output_path}")
-                
-                # If audio is requested, add it to the blurred video too
-                if args and hasattr(args, 'with_audio') and args.with_audio and os.path.exists(self.video_path):
-                    blurred_audio_filename = f"{self.input_filename}_fully_blurred_with_audio.mp4"
-                    blurred_with_audio = os.path.join(self.video_output_folder, blurred_audio_filename)
-                    success = self.add_audio_to_video(blurred_output_path, self.video_path, blurred_with_audio)
-                    if success:
-                        print(f"Fully blurred video with audio saved to: {blurred_with_audio}")
-        
-        # Always create a standard processed video with individual blur areas
-        print("\nCreating standard processed video with individual blur areas...")
-        with tqdm(total=total_frames, desc="Censoring Frames", unit="frames", ncols=100, mininterval=0.5, leave=False) as pbar:
-            for frame, detections, output_path in frame_list:
-                self.detector.censor_frame(frame, detections, output_path, nsfw_percentage=nsfw_percentage)
-                pbar.update(1)
-
-        # Add audio from the original video if available
-        if args and hasattr(args, 'with_audio') and args.with_audio and os.path.exists(self.video_path):
-            audio_filename = f"{self.input_filename}{CONFIG['OUTPUT_VIDEO_AUDIO_SUFFIX']}"
-            output_with_audio = os.path.join(self.video_output_folder, audio_filename)
-            success = self.add_audio_to_video(output_path, self.video_path, output_with_audio)
-            if success:
-                print(f"\nVideo with audio saved at: {output_with_audio}")
-            else:
-                print(f"\nFailed to add audio. Video saved at: {output_path}")
-        else:
-            print(f"\nVideo saved at: {output_path}")
+                blurred_out = None
+
+        self._render_censored(out, blurred_out, nsfw_percentage)
+
+        out.release()
+        if blurred_out is not None:
+            blurred_out.release()
+            # Reports the file (and adds audio to it when the encoder could not)
+            self._report_video(blurred_out, blurred_output_path, blurred_audio_handled, blurred_audio_path, "Fully blurred video")
+
+        # Add audio from the original video if the encoder did not already mux it
+        self._report_video(out, output_path, audio_handled, audio_output_path, "Video")
             
         # Delete frame images if requested
         if args and hasattr(args, 'delete_frames') and args.delete_frames:
-            self.delete_processed_frames(frame_list)
+            self._finish_frame_dumps()
+            self.delete_processed_frames()
 
-    def create_video_with_boxes(self, frame_list, include_blur=False):
+    def create_video_with_boxes(self, include_blur=False):
         """Create a video with detection boxes from processed frames"""
-        if not frame_list:
+        if not self.frame_detections:
             return
 
-        img_height, img_width = frame_list[0][0].shape[:2]
-        
-        # Get codec preference from command line args
-        codec_preference = args.codec if args and hasattr(args, 'codec') else "mp4v"
-        
         # Use input filename for output naming
         boxes_filename = f"{self.input_filename}{CONFIG['OUTPUT_VIDEO_BOXES_SUFFIX']}"
         video_output_path = os.path.join(self.video_output_folder, boxes_filename)
         
-        # Create a safe video writer with the original FPS and preferred codec
-        out = create_safe_video_writer(video_output_path, img_width, img_height, self.original_fps, codec_preference)
+        # Open the writer (FFmpeg pipe with audio muxed in, or OpenCV)
+        audio_output_path = self._audio_output_path(CONFIG['OUTPUT_VIDEO_BOXES_AUDIO_SUFFIX'])
+        out, video_output_path, audio_handled = self._open_video_writer(video_output_path, audio_output_path)
         
         if not out.isOpened():
             print("Failed to create video writer. Check your codec installation.")
             return
 
-        total_frames = len(frame_list)
-        with tqdm(total=total_frames, desc="Generating Video with Boxes", unit="frames", ncols=100, mininterval=0.5) as pbar:
-            for frame, detections, output_path in frame_list:
-                # Create a frame with boxes and labels
-                boxed_frame = frame.copy()
-                font = cv2.FONT_HERSHEY_SIMPLEX
-                font_scale = CONFIG['FONT_SCALE']
-                font_thickness = CONFIG['FONT_THICKNESS']
-
-                # Always draw boxes and labels
-                for detection in detections:
-                    box = detection["box"]
-                    x, y, w, h = box[0], box[1], box[2], box[3]
-                    label = detection["class"]
-                    label_text = label if "EXPOSED" not in label else "Unsafe, " + label
-                    
-                    # Select colors based on content type (exposed or normal)
-                    is_exposed = "EXPOSED" in label
-                    box_color = CONFIG['BOX_COLOR_EXPOSED'] if is_exposed else CONFIG['BOX_COLOR_NORMAL']
-                    text_color = CONFIG['TEXT_COLOR_EXPOSED'] if is_exposed else CONFIG['TEXT_COLOR_NORMAL']
-                    
-                    # Select blur strength based on content sensitivity
-                    blur_kernel = CONFIG['BLUR_STRENGTH_HIGH'] if is_exposed else CONFIG['BLUR_STRENGTH_NORMAL']
+        def draw_boxes(frame_number, frame, detections):
+            # Create a frame with boxes and labels
+            boxed_frame = self._writable(frame)
+            font = cv2.FONT_HERSHEY_SIMPLEX
+            font_scale = CONFIG['FONT_SCALE']
+            font_thickness = CONFIG['FONT_THICKNESS']
 
-                    # Make sure coordinates are within bounds
-                    if 0 <= y < frame.shape[0] and 0 <= x < frame.shape[1] and 0 <= y + h < frame.shape[0] and 0 <= x + w < frame.shape[1]:
-                        # Apply blur or solid color if needed
-                        if include_blur and is_exposed and self.detector.should_apply_blur(label):
-                            if CONFIG['USE_SOLID_COLOR']:
-                                # Apply solid color mask
-                                boxed_frame[y:y + h, x:x + w] = np.full(
-                                    (h, w, 3), CONFIG['SOLID_COLOR'], dtype=np.uint8
-                                )
-                            else:
-                                # Apply blur with configured strength
-                                boxed_frame[y:y + h, x:x + w] = cv2.GaussianBlur(boxed_frame[y:y + h, x:x + w], 
-                                                                               (blur_kernel[0], blur_kernel[1]), 
-                                                                               blur_kernel[2])
+            # Always draw boxes and labels
+            for detection in detections:
+                box = detection["box"]
+                x, y, w, h = box[0], box[1], box[2], box[3]
+                label = detection["class"]
+                label_text = label if "EXPOSED" not in label else "Unsafe, " + label
                         
-                        # Always draw the box and label
-                        cv2.rectangle(boxed_frame, (x, y), (x + w, y + h), box_color, 2)
-                        cv2.putText(boxed_frame, label_text, (x, y - 5), font, font_scale, text_color, font_thickness, cv2.LINE_AA)
-                
-                # Write the frame to the output video
-                out.write(boxed_frame)
-                pbar.update(1)
+                # Select colors based on content type (exposed or normal)
+                is_exposed = "EXPOSED" in label
+                box_color = CONFIG['BOX_COLOR_EXPOSED'] if is_exposed else CONFIG['BOX_COLOR_NORMAL']
+                text_color = CONFIG['TEXT_COLOR_EXPOSED'] if is_exposed else CONFIG['TEXT_COLOR_NORMAL']
+                        
+                # Select blur strength based on content sensitivity
+                blur_kernel = CONFIG['BLUR_STRENGTH_HIGH'] if is_exposed else CONFIG['BLUR_STRENGTH_NORMAL']
+
+                # Make sure coordinates are within bounds
+                if 0 <= y < frame.shape[0] and 0 <= x < frame.shape[1] and 0 <= y + h < frame.shape[0] and 0 <= x + w < frame.shape[1]:
+                    # Apply blur or solid color if needed
+                    if include_blur and is_exposed and self.detector.should_apply_blur(label):
+                        if CONFIG['USE_SOLID_COLOR']:
+                            # Apply solid color mask
+                            boxed_frame[y:y + h, x:x + w] = np.full(
+                                (h, w, 3), CONFIG['SOLID_COLOR'], dtype=np.uint8
+                            )
+                        else:
+                            # Apply blur with configured strength
+                            boxed_frame[y:y + h, x:x + w] = cv2.GaussianBlur(boxed_frame[y:y + h, x:x + w], 
+                                                                           (blur_kernel[0], blur_kernel[1]), 
+                                                                           blur_kernel[2])
+                            
+                    # Always draw the box and label
+                    cv2.rectangle(boxed_frame, (x, y), (x + w, y + h), box_color, 2)
+                    cv2.putText(boxed_frame, label_text, (x, y - 5), font, font_scale, text_color, font_thickness, cv2.LINE_AA)
+
+            return boxed_frame
+
+        self._render_pass("Generating Video with Boxes", draw_boxes, out.write, preview=True)
 
         out.release()
         
-        # Add audio from the original video if available
-        if args and hasattr(args, 'with_audio') and args.with_audio and os.path.exists(self.video_path):
-            boxes_audio_filename = f"{self.input_filename}{CONFIG['OUTPUT_VIDEO_BOXES_AUDIO_SUFFIX']}"
-            output_with_audio = os.path.join(self.video_output_folder, boxes_audio_filename)
-            success = self.add_audio_to_video(video_output_path, self.video_path, output_with_audio)
-            if success:
-                print(f"\nVideo with boxes and audio saved at: {output_with_audio}")
-            else:
-                print(f"\nFailed to add audio. Video with boxes saved at: {video_output_path}")
-        else:
-            print(f"\nVideo with boxes saved at: {video_output_path}")
+        # Add audio from the original video if the encoder did not already mux it
+        self._report_video(out, video_output_path, audio_handled, audio_output_path, "Video with boxes")
             
         # Delete frame images if requested
         if args and hasattr(args, 'delete_frames') and args.delete_frames:
-            self.delete_processed_frames(frame_list)
+            self._finish_frame_dumps()
+            self.delete_processed_frames()
 
     def add_audio_to_video(self, video_path, audio_source_path, output_path):
         """Add audio from the original video to the processed video using multiple methods"""
@@ -869,50 +2166,33 @@ class NudeVideoProcessor:
         exposed_count = len(exposed_labels)
         return exposed_count
         
-    def check_exposed_regions(self, frame_list):
+    def check_exposed_regions(self, exposed_counts):
         """
         Analyze all detections across frames to get statistics on exposed content.
+        exposed_counts is the list of per-frame exposed label counts.
         Returns:
         - total_exposed_boxes: Total count of all exposed boxes across all frames
         - frames_with_exposed: Number of frames containing any exposed content
         - exposed_percentage: Percentage of frames containing exposed content
         """
-        total_exposed_boxes = 0
-        frames_with_exposed = 0
-        
-        for _, detections, _ in frame_list:
-            frame_exposed_count = self.check_exposed_count(detections)
-            total_exposed_boxes += frame_exposed_count
-            if frame_exposed_count > 0:
-                frames_with_exposed += 1
+        total_exposed_boxes = sum(exposed_counts)
+        frames_with_exposed = sum(1 for count in exposed_counts if count > 0)
         
-        total_frames = len(frame_list)
+        total_frames = len(exposed_counts)
         exposed_percentage = (frames_with_exposed / total_frames * 100) if total_frames > 0 else 0
         
         return total_exposed_boxes, frames_with_exposed, exposed_percentage
         
-    def should_apply_full_blur(self, frame_list):
+    def should_apply_full_blur(self, exposed_counts):
         """
         Check if the full blur rule conditions are met.
+        exposed_counts is the list of per-frame exposed label counts.
         Returns:
         - should_blur: Boolean indicating if full blur should be applied
         - reason: String explaining why full blur is being applied
         """
         # Count frames that have at least FULL_BLUR_LABELS exposed labels
-        frames_with_required_labels = 0
-        frames_with_any_exposed = 0
-        
-        # Analysis of each frame
-        for _, detections, _ in frame_list:
-            exposed_count = self.check_exposed_count(detections)
-            if exposed_count >= CONFIG['FULL_BLUR_LABELS']:
-                frames_with_required_labels += 1
-            if exposed_count > 0:
-                frames_with_any_exposed += 1
-        
-        # Calculate percentages
-        total_frames = len(frame_list)
-        percent_with_required = (frames_with_required_labels / total_frames * 100) if total_frames > 0 else 0
+        frames_with_required_labels = sum(1 for count in exposed_counts if count >= CONFIG['FULL_BLUR_LABELS'])
         
         # Debug output to help diagnose issues
         print(f"\nFull blur analysis: {frames_with_required_labels} frames with {CONFIG['FULL_BLUR_LABELS']}+ exposed labels")
@@ -929,16 +2209,17 @@ class NudeVideoProcessor:
         # Make sure we return False if no conditions are met
         return False, ""
         
-    def delete_processed_frames(self, frame_list):
+    def delete_processed_frames(self):
         """Delete all processed frame images to save disk space"""
         try:
             print("\nCleaning up frame files...")
-            # Get list of frame files from frame_list
+            # Get list of frame files from the detection pass
             frame_paths = set()
             box_frame_paths = set()
             
-            # Extract paths from frame_list
-            for _, _, output_path in frame_list:
+            # Extract paths for every processed frame
+            for frame_number in range(1, len(self.frame_detections) + 1):
+                output_path = self._frame_output_path(frame_number)
                 if output_path and os.path.exists(output_path):
                     frame_paths.add(output_path)
                     # Also add box images
@@ -968,6 +2249,60 @@ class NudeVideoProcessor:
             print(f"Error while cleaning up frame files: {str(e)}")
 
             
+# ONNX session of a --segments worker process, shared by the segments it handles
+_segment_detector = None
+
+def _init_segment_worker(config, cli_args, threads):
+    """Process pool initializer: adopt the parent's settings and this worker's thread budget."""
+    global args
+    CONFIG.update(config)
+    CONFIG['ONNX_INTRA_OP_THREADS'] = threads
+    CONFIG['PIPELINE_CENSOR_WORKERS'] = threads
+    cv2.setNumThreads(threads)
+    args = cli_args
+
+def _segment_processor(video_path, frame_range, options):
+    global _segment_detector
+    if _segment_detector is None:
+        _segment_detector = NudeDetector()
+        _segment_detector.load_exception_rules("BlurException.rule")
+    return NudeVideoProcessor(video_path, options["output_folder"], video_output_folder=options["video_output_folder"],
+                              streaming=True, detect_every=options["detect_every"], save_frames=options["save_frames"],
+                              frame_sample=options["frame_sample"], frame_range=frame_range,
+                              detector=_segment_detector, progress=False)
+
+def _detect_segment(video_path, frame_range, options):
+    """Worker: detection pass over one segment. Returns (frame_detections, frame_exposed_counts)."""
+    processor = _segment_processor(video_path, frame_range, options)
+    processor.detect_video()
+    return processor.frame_detections, processor.frame_exposed_counts
+
+def _render_segment(video_path, frame_range, frame_detections, options, part_path, blurred_part_path, nsfw_percentage):
+    """Worker: render one segment into part_path (and the fully blurred version into blurred_part_path)."""
+    processor = _segment_processor(video_path, frame_range, options)
+    processor.cap.release()
+    processor.frame_detections = frame_detections
+
+    writers = [(processor._open_video_writer(part_path)[0], part_path)]
+    if blurred_part_path:
+        writers.append((processor._open_video_writer(blurred_part_path)[0], blurred_part_path))
+    for writer, path in writers:
+        if not writer.isOpened():
+            raise RuntimeError(f"Failed to create video writer for {path}")
+
+    if processor.save_frames != "none":
+        processor.detector.frame_writer = FrameDumpWriter()
+    try:
+        processor._render_censored(writers[0][0], writers[1][0] if blurred_part_path else None, nsfw_percentage)
+    finally:
+        for writer, _ in writers:
+            writer.release()
+        processor._finish_frame_dumps()
+
+    for writer, path in writers:
+        if isinstance(writer, FFmpegPipeWriter) and not writer.succeeded:
+            raise RuntimeError(f"Encoding {path} failed: {writer.error}")
+
 def parse_blur_rule(value):
     parts = value.split('/')
     if len(parts) != 2:
@@ -997,8 +2332,16 @@ def parse_args():
     parser.add_argument("-b", "--boxes", action="store_true", help="Create a video with detection boxes from frames")
     parser.add_argument("--blur", action="store_true", help="Apply blur to detected regions when using -b option")
     parser.add_argument("-a", "--with-audio", action="store_true", help="Include original audio in the output video")
-    parser.add_argument("-c", "--codec", type=str, choices=["mp4v", "avc1", "xvid", "mjpg"], default="mp4v",
-                      help="Video codec to use. Default is mp4v for better compatibility.")
+    parser.add_argument("-c", "--codec", type=str, choices=["mp4v", "avc1", "xvid", "mjpg"], default=None,
+                      help="Video codec to use with the OpenCV encoder (selects it under --encoder auto). Default is mp4v for better compatibility.")
+    parser.add_argument("--encoder", choices=["auto", "ffmpeg", "opencv"], default="auto",
+                      help="Video encoder: 'ffmpeg' pipes frames into a single H.264 encode with audio muxed in the same run, "
+                           "'opencv' uses cv2.VideoWriter (-c) and adds audio afterwards. 'auto' (default) encodes with ffmpeg "
+                           "when available unless -c is given, and adds audio afterwards like opencv")
+    parser.add_argument("--preset", type=str, default=CONFIG['FFMPEG_PRESET'],
+                      help=f"x264 preset for the ffmpeg encoder (ultrafast ... veryslow). Default is {CONFIG['FFMPEG_PRESET']}")
+    parser.add_argument("--crf", type=int, default=CONFIG['FFMPEG_CRF'],
+                      help=f"x264 quality (CRF, lower is better) for the ffmpeg encoder. Default is {CONFIG['FFMPEG_CRF']}")
     parser.add_argument("--ffmpeg-path", type=str, default=None, 
                       help="Full path to the ffmpeg executable (e.g., 'C:/ffmpeg/bin/ffmpeg.exe')")
     parser.add_argument("-df", "--delete-frames", action="store_true",
@@ -1011,6 +2354,37 @@ def parse_args():
                       help="Use solid color instead of blur to mask NSFW content")
     parser.add_argument("--mask-color", type=str, default="0,0,0", 
                       help="Color to use for masking in BGR format (blue,green,red). Default is black: '0,0,0'")
+    parser.add_argument("--streaming", dest="streaming", action="store_true", default=None,
+                      help="Never hold decoded frames in memory; re-decode the input for each render pass. "
+                           "By default this is enabled automatically for videos larger than FRAME_BUFFER_LIMIT_MB")
+    parser.add_argument("--in-memory", dest="streaming", action="store_false",
+                      help="Keep all decoded frames in memory between passes (fastest for short videos)")
+    parser.add_argument("--batch-size", type=int, default=CONFIG['PIPELINE_BATCH_SIZE'],
+                      help=f"Number of frames run through the model in one inference call. Default is {CONFIG['PIPELINE_BATCH_SIZE']}")
+    parser.add_argument("--save-frames", choices=["none", "all", "flagged"], default="none",
+                      help="Dump censored frame images to output_frames/ in video mode: none (default), all frames, "
+                           "or only flagged frames (with exposed content)")
+    parser.add_argument("--frame-sample", type=int, default=1,
+                      help="With --save-frames, dump only every Nth frame. Default is 1")
+    parser.add_argument("--preview", action="store_true",
+                      help=f"Keep output_frames/{CONFIG['PREVIEW_FILENAME']} updated with a small censored preview "
+                           f"(about once per {CONFIG['PREVIEW_INTERVAL_SECONDS']:g}s), e.g. for the GUI")
+    parser.add_argument("--from-detections", nargs="?", const="auto", default=None, metavar="FILE",
+                      help="Re-render from a detection sidecar instead of running the detector (e.g. after changing "
+                           f"BlurException.rule, -r or blur settings). Default file: <video_output>/<name>{CONFIG['DETECTIONS_SUFFIX']}, "
+                           "which every video run writes")
+    parser.add_argument("--scan", action="store_true",
+                      help="Only report whether the video breaches the -r / -fbr rules, from frames sampled by seeking "
+                           "(denser around hits, stopping early once a threshold is exceeded). No video is written")
+    parser.add_argument("--scan-fps", type=float, default=CONFIG['SCAN_SAMPLE_FPS'],
+                      help=f"Base sampling rate of --scan in frames per second. Default is {CONFIG['SCAN_SAMPLE_FPS']:g}")
+    parser.add_argument("--segments", type=int, default=0,
+                      help="Split long videos into up to N keyframe-aligned segments processed in parallel worker "
+                           f"processes and joined losslessly with FFmpeg (segments are at least {CONFIG['SEGMENT_MIN_SECONDS']}s). "
+                           "Default is 0 (off)")
+    parser.add_argument("--detect-every", type=int, default=1,
+                      help="Run the detector on every Nth frame only (plus scene cuts); boxes are tracked "
+                           "on the frames in between. Default is 1 (every frame)")
     return parser.parse_args()
 
 # Global args variable for access across classes
@@ -1168,14 +2542,26 @@ if __name__ == "__main__":
         except ValueError:
             print("Invalid color format. Using default black color.")
     
+    # Frames per batched inference call
+    if args.batch_size < 1:
+        print("Invalid batch size. Using 1.")
+    CONFIG['PIPELINE_BATCH_SIZE'] = max(1, args.batch_size)
+
     # Check if we need FFmpeg for this run
-    if args.task == "video" and args.with_audio:
+    if args.task == "video" and (args.with_audio or args.encoder == "ffmpeg" or args.segments > 1):
         check_ffmpeg_availability(args.ffmpeg_path)
 
     if args.task == "video":
-        video_processor = NudeVideoProcessor(args.input, args.output, task=args.task, video_output_folder=video_output_folder, blur_rule=rule)
-        video_processor.process_video()
+        video_processor = NudeVideoProcessor(args.input, args.output, task=args.task, video_output_folder=video_output_folder, blur_rule=rule, streaming=args.streaming, detect_every=args.detect_every,
+                                             save_frames=args.save_frames, frame_sample=args.frame_sample, preview=args.preview,
+                                             from_detections=args.from_detections)
+        if args.scan:
+            video_processor.scan_video(args.scan_fps)
+        elif args.segments > 1:
+            video_processor.process_video_segmented(args.segments)
+        else:
+            video_processor.process_video()
     elif args.task == "frames":
         detector = NudeDetector()
         detector.load_exception_rules("BlurException.rule")
-        process_frames(args.input, detector, args.output)
+        process_frames(args.input, detector, args.output, detect_every=args.detect_every)
@@ -0,0 +1,38 @@
+"""Add content hash and duplicate reference to detections
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "002"
+down_revision: Union[str, None] = "001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("detections", sa.Column("content_sha256", sa.String(64), nullable=True))
+    op.add_column(
+        "detections",
+        sa.Column(
+            "duplicate_of_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("detections.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+    )
+    op.create_index("ix_detections_content_sha256", "detections", ["content_sha256"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_detections_content_sha256", table_name="detections")
+    op.drop_column("detections", "duplicate_of_id")
+    op.drop_column("detections", "content_sha256")
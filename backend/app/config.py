@@ -26,6 +26,14 @@ class Settings(BaseSettings):
     # useautumn
     autumn_secret_key: str = ""
     autumn_enabled: bool = False
+    autumn_base_url: str = "https://api.useautumn.com/v1"
+
+    # Local credit ledger (AUTUMN_LEASE_SIZE=0 sends every check/track to Autumn)
+    autumn_lease_size: int = 20
+    autumn_lease_ttl_seconds: float = 30.0
+    autumn_max_overspend: int = 0
+    autumn_flush_interval_seconds: float = 5.0
+    autumn_cache_ttl_seconds: float = 15.0  # /credits balance + plan cache
 
     # Model
     model_url: str = "https://github.com/im-syn/SafeVision/raw/refs/heads/main/Models/best.onnx"
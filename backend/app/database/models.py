@@ -53,6 +53,9 @@ class Detection(Base):
     risk_level = Column(String(20), nullable=False)
     detections_data = Column(JSON, nullable=False)  # Full detection results array
     threshold_used = Column(Float, nullable=False, default=0.25)
+    content_sha256 = Column(String(64), nullable=True)  # SHA-256 of the uploaded bytes
+    # Set on reference rows that reused an earlier detection of identical bytes
+    duplicate_of_id = Column(UUID(as_uuid=True), ForeignKey("detections.id", ondelete="SET NULL"), nullable=True)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
 
     # Relationships
@@ -61,6 +64,7 @@ class Detection(Base):
     __table_args__ = (
         Index("ix_detections_user_id", "user_id"),
         Index("ix_detections_created_at", "created_at"),
+        Index("ix_detections_content_sha256", "content_sha256"),
     )
 
     def __repr__(self):
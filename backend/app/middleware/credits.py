@@ -37,9 +37,10 @@ async def get_customer_id(x_api_key: Optional[str] = Header(None)) -> Optional[s
 
 async def check_and_track_credits(customer_id: Optional[str]) -> Optional[int]:
     """
-    Check if a customer has remaining credits.
+    Check if a customer has remaining credits and reserve one for this request.
     Returns credits_remaining or None if credits are disabled.
     Raises HTTPException if no credits remain.
+    Every successful call must be followed by track_usage() or release_credits().
     """
     if not autumn_service.enabled or customer_id is None:
         return None
@@ -64,3 +65,9 @@ async def track_usage(customer_id: Optional[str]):
     """Track 1 detection credit usage after successful detection."""
     if autumn_service.enabled and customer_id is not None:
         await autumn_service.track_usage(customer_id)
+
+
+def release_credits(customer_id: Optional[str]):
+    """Give back the credit reserved by check_and_track_credits() when detection fails."""
+    if autumn_service.enabled and customer_id is not None:
+        autumn_service.release_credits(customer_id)
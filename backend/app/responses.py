@@ -0,0 +1,108 @@
+"""
+SafeVision API - Fast Response Serialization
+orjson-backed responses for the hot endpoints (detect + history).
+
+The payload builders below produce exactly the JSON shape of the matching
+pydantic models in app.models, from data that is already well-formed (detector
+output or rows we wrote ourselves). Returning a Response directly skips
+FastAPI's response_model round-trip (dump -> validate -> serialize), while
+the routes still declare response_model so the OpenAPI schema is unchanged.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson; accepts numpy scalars/arrays and writes UTC as 'Z' like pydantic."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z,
+        )
+
+
+def _bbox(bbox: Dict[str, Any]) -> Dict[str, int]:
+    return {
+        "x": bbox.get("x", 0),
+        "y": bbox.get("y", 0),
+        "width": bbox.get("width", 0),
+        "height": bbox.get("height", 0),
+    }
+
+
+def detection_payload(d: Dict[str, Any]) -> Dict[str, Any]:
+    """Serialize one detection as app.models.Detection would."""
+    return {
+        "label": d.get("label", ""),
+        "confidence": d.get("confidence", 0),
+        "risk_level": d.get("risk_level", "SAFE"),
+        "bbox": _bbox(d.get("bbox") or {}),
+        "should_blur": d.get("should_blur", True),
+        "contour": d.get("contour"),
+    }
+
+
+def dimensions_payload(dims: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    dims = dims or {}
+    return {"width": dims.get("width", 0), "height": dims.get("height", 0)}
+
+
+def detection_response_payload(
+    result: Dict[str, Any],
+    detection_id: Optional[str],
+    image_url: Optional[str],
+    credits_remaining: Optional[int],
+) -> Dict[str, Any]:
+    """Serialize a DetectorService result as app.models.DetectionResponse would."""
+    risk_summary = result["risk_summary"]
+    return {
+        "status": "success",
+        "detection_id": detection_id,
+        "image_url": image_url,
+        "image_dimensions": dimensions_payload(result["image_dimensions"]),
+        "detections": [detection_payload(d) for d in result["detections"]],
+        "detection_count": result["detection_count"],
+        "risk_summary": {
+            "overall_risk": risk_summary["overall_risk"],
+            "is_safe": risk_summary["is_safe"],
+            "distribution": risk_summary.get("distribution", {}),
+        },
+        "credits_remaining": credits_remaining,
+    }
+
+
+def history_item_payload(record, image_url: Optional[str]) -> Dict[str, Any]:
+    """Serialize a Detection ORM row as app.models.DetectionHistoryItem would."""
+    return {
+        "id": str(record.id),
+        "image_url": image_url,
+        "image_dimensions": dimensions_payload(record.image_dimensions),
+        "detection_count": record.detection_count,
+        "risk_level": record.risk_level,
+        "threshold_used": record.threshold_used,
+        "created_at": record.created_at,
+    }
+
+
+def history_detail_payload(
+    record,
+    image_url: Optional[str],
+    processed_image_url: Optional[str],
+) -> Dict[str, Any]:
+    """Serialize a Detection ORM row as app.models.DetectionHistoryDetail would."""
+    detections: List[Dict[str, Any]] = [detection_payload(d) for d in record.detections_data or []]
+    return {
+        "id": str(record.id),
+        "image_url": image_url,
+        "processed_image_url": processed_image_url,
+        "image_dimensions": dimensions_payload(record.image_dimensions),
+        "detections": detections,
+        "detection_count": record.detection_count,
+        "risk_level": record.risk_level,
+        "threshold_used": record.threshold_used,
+        "created_at": record.created_at,
+    }
@@ -3,6 +3,7 @@ SafeVision API - Credits Router
 Endpoints for checking credits and creating checkout sessions.
 """
 
+import asyncio
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -34,9 +35,11 @@ async def get_credits(
     if not customer_id:
         raise HTTPException(status_code=401, detail="API key required")
 
-    # Get balance
-    credit_info = await autumn_service.check_credits(customer_id)
-    customer_info = await autumn_service.get_customer_info(customer_id)
+    # Balance and plan are independent lookups - fetch them concurrently
+    credit_info, customer_info = await asyncio.gather(
+        autumn_service.get_balance(customer_id),
+        autumn_service.get_customer_info(customer_id),
+    )
 
     plan_name = None
     if customer_info and "products" in customer_info:
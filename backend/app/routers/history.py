@@ -12,14 +12,11 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import (
-    DetectionHistoryItem,
     DetectionHistoryDetail,
     DetectionHistoryResponse,
     ErrorResponse,
-    ImageDimensions,
-    Detection,
-    BoundingBox,
 )
+from app.responses import FastJSONResponse, history_item_payload, history_detail_payload
 from app.database.session import get_db
 from app.database.models import Detection as DetectionRecord
 from app.services.storage import storage_service
@@ -70,30 +67,17 @@ async def list_detections(
     result = await db.execute(query)
     records = result.scalars().all()
 
-    items = []
-    for record in records:
-        dims = record.image_dimensions or {}
-        items.append(
-            DetectionHistoryItem(
-                id=str(record.id),
-                image_url=_get_image_url(record.original_image_key),
-                image_dimensions=ImageDimensions(
-                    width=dims.get("width", 0),
-                    height=dims.get("height", 0),
-                ),
-                detection_count=record.detection_count,
-                risk_level=record.risk_level,
-                threshold_used=record.threshold_used,
-                created_at=record.created_at,
-            )
-        )
+    items = [
+        history_item_payload(record, _get_image_url(record.original_image_key))
+        for record in records
+    ]
 
-    return DetectionHistoryResponse(
-        items=items,
-        total=total,
-        page=page,
-        page_size=page_size,
-    )
+    return FastJSONResponse({
+        "items": items,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+    })
 
 
 @router.get(
@@ -122,39 +106,11 @@ async def get_detection(
     if record is None:
         raise HTTPException(status_code=404, detail="Detection not found")
 
-    dims = record.image_dimensions or {}
-    detections_data = record.detections_data or []
-
-    # Reconstruct Detection objects from stored JSON
-    detections = []
-    for d in detections_data:
-        bbox_data = d.get("bbox", {})
-        detections.append(
-            Detection(
-                label=d.get("label", ""),
-                confidence=d.get("confidence", 0),
-                risk_level=d.get("risk_level", "SAFE"),
-                bbox=BoundingBox(
-                    x=bbox_data.get("x", 0),
-                    y=bbox_data.get("y", 0),
-                    width=bbox_data.get("width", 0),
-                    height=bbox_data.get("height", 0),
-                ),
-                should_blur=d.get("should_blur", True),
-            )
+    # Stored detections are serialized directly from JSON (same shape as Detection)
+    return FastJSONResponse(
+        history_detail_payload(
+            record,
+            _get_image_url(record.original_image_key),
+            _get_image_url(record.processed_image_key),
         )
-
-    return DetectionHistoryDetail(
-        id=str(record.id),
-        image_url=_get_image_url(record.original_image_key),
-        processed_image_url=_get_image_url(record.processed_image_key),
-        image_dimensions=ImageDimensions(
-            width=dims.get("width", 0),
-            height=dims.get("height", 0),
-        ),
-        detections=detections,
-        detection_count=record.detection_count,
-        risk_level=record.risk_level,
-        threshold_used=record.threshold_used,
-        created_at=record.created_at,
     )
@@ -1,10 +1,18 @@
 """
 SafeVision API - Autumn Credit Service
 Integrates with useautumn.com for credit-based pricing.
+
+Credits are served from a local ledger: each customer is granted a leased block
+of credits from their Autumn balance, usage is decremented locally, and the
+accumulated usage is reconciled with Autumn in batched /events calls on a timer
+and at shutdown. This keeps Autumn off the per-request hot path.
 """
 
+import time
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Tuple
 
 import httpx
 
@@ -14,23 +22,73 @@ logger = logging.getLogger("safevision.autumn")
 
 AUTUMN_BASE_URL = "https://api.useautumn.com/v1"
 
+# Upper bound on cached customers before expired entries are pruned
+CACHE_MAX_ENTRIES = 10_000
+
+
+@dataclass
+class CreditLease:
+    """
+    A block of credits leased from a customer's Autumn balance.
+
+    `balance` is the Autumn balance at the time of the lease (None = unlimited),
+    `granted` the number of credits that may be spent locally before the lease
+    must be renewed, `used` how many of them have been spent, `reserved` how
+    many are held by requests that passed the check but haven't finished yet,
+    and `pending` how many spent credits have not yet been reported to Autumn.
+    """
+    allowed: bool
+    balance: Optional[int]
+    granted: int
+    leased_at: float = field(default_factory=time.monotonic)
+    used: int = 0
+    reserved: int = 0
+    pending: int = 0
+
+    @property
+    def remaining(self) -> int:
+        return self.granted - self.used - self.reserved
+
+    @property
+    def local_balance(self) -> Optional[int]:
+        """Best local estimate of the customer's Autumn balance."""
+        if self.balance is None:
+            return None
+        return self.balance - self.used
+
 
 class AutumnService:
     """
     Handles credit checking and usage tracking via useautumn.com.
     When disabled (no API key), all requests are allowed with unlimited credits.
+    When the ledger is disabled (AUTUMN_LEASE_SIZE=0), every check and track
+    call goes straight to Autumn.
     """
 
     def __init__(self):
         self.enabled = False
         self.client: Optional[httpx.AsyncClient] = None
+        self._leases: Dict[Tuple[str, str], CreditLease] = {}
+        self._lease_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # Short-TTL caches for the /credits endpoint: key -> (stored_at, value)
+        self._balance_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+        self._customer_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # Bumped by invalidate_customer() so results fetched before it are never cached;
+        # the epoch changes whenever the counters are reset
+        self._cache_generations: Dict[str, int] = {}
+        self._cache_epoch = 0
+
+    @property
+    def ledger_enabled(self) -> bool:
+        return self.enabled and settings.autumn_lease_size > 0
 
     def initialize(self):
-        """Initialize the Autumn client if configured."""
+        """Initialize the Autumn client if configured. Starts the ledger flusher when a loop is running."""
         if settings.autumn_enabled and settings.autumn_secret_key:
             self.enabled = True
             self.client = httpx.AsyncClient(
-                base_url=AUTUMN_BASE_URL,
+                base_url=settings.autumn_base_url or AUTUMN_BASE_URL,
                 headers={
                     "Authorization": f"Bearer {settings.autumn_secret_key}",
                     "Content-Type": "application/json",
@@ -38,29 +96,245 @@ class AutumnService:
                 timeout=10.0,
             )
             logger.info("Autumn credit service enabled")
+
+            if self.ledger_enabled:
+                try:
+                    loop = asyncio.get_running_loop()
+                    self._flush_task = loop.create_task(self._flush_loop())
+                except RuntimeError:
+                    logger.warning("No running event loop — ledger usage is only flushed on close()")
+                logger.info(
+                    f"Credit ledger enabled (lease={settings.autumn_lease_size}, "
+                    f"max_overspend={settings.autumn_max_overspend}, "
+                    f"flush every {settings.autumn_flush_interval_seconds}s)"
+                )
         else:
             self.enabled = False
             logger.info("Autumn credit service disabled (no API key configured)")
 
-    async def check_credits(self, customer_id: str, feature_id: str = "detections") -> Dict[str, Any]:
+    # ─── Autumn API ───────────────────────────────────────────────────────
+
+    async def _fetch_entitlement(self, customer_id: str, feature_id: str) -> Dict[str, Any]:
+        """Ask Autumn whether a customer is entitled to a feature. Raises on failure."""
+        response = await self.client.get(
+            "/entitled",
+            params={"customer_id": customer_id, "feature_id": feature_id},
+        )
+        response.raise_for_status()
+        data = response.json()
+        return {
+            "allowed": data.get("allowed", False),
+            "balance": data.get("balance"),
+        }
+
+    async def _send_event(self, customer_id: str, feature_id: str, delta: int):
+        """Report usage to Autumn. Raises on failure."""
+        response = await self.client.post(
+            "/events",
+            json={
+                "customer_id": customer_id,
+                "feature_id": feature_id,
+                "delta": delta,
+            },
+        )
+        response.raise_for_status()
+
+    # ─── Ledger ───────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _take_pending(lease: Optional[CreditLease]) -> int:
+        """Claim a lease's unreported usage so concurrent reconciliations never send it twice."""
+        if lease is None:
+            return 0
+        pending, lease.pending = lease.pending, 0
+        return pending
+
+    def _restore_pending(self, key: Tuple[str, str], delta: int):
+        """Put back usage whose reconciliation failed; it is retried on the next flush."""
+        if delta and key in self._leases:
+            self._leases[key].pending += delta
+
+    def _lease_expired(self, lease: CreditLease) -> bool:
+        # Empty leases (customer out of credits) are kept until the TTL so that
+        # denied requests don't hit Autumn either.
+        return (
+            (lease.granted > 0 and lease.remaining <= 0)
+            or time.monotonic() - lease.leased_at >= settings.autumn_lease_ttl_seconds
+        )
+
+    @staticmethod
+    def _grant_for(allowed: bool, balance: Optional[int]) -> int:
+        """Number of credits to lease locally for a fresh Autumn entitlement."""
+        if not allowed:
+            return 0
+        covered = None if balance is None else balance + settings.autumn_max_overspend
+        if covered is None or covered <= 0:
+            # Unlimited, or allowed past the balance (overage / usage-based plans bill the excess)
+            return settings.autumn_lease_size
+        return min(settings.autumn_lease_size, covered)
+
+    async def _renew_lease(self, key: Tuple[str, str]) -> Optional[CreditLease]:
+        """
+        Reconcile pending usage for a customer and lease a fresh block of credits.
+        Returns None if Autumn could not be reached.
+        """
+        customer_id, feature_id = key
+        old = self._leases.get(key)
+        pending = self._take_pending(old)
+
+        try:
+            if pending:
+                await self._send_event(customer_id, feature_id, pending)
+                pending = 0
+            entitlement = await self._fetch_entitlement(customer_id, feature_id)
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Autumn API error renewing lease: {e.response.status_code} {e.response.text}")
+            self._restore_pending(key, pending)
+            return None
+        except Exception as e:
+            logger.error(f"Autumn connection error: {e}")
+            self._restore_pending(key, pending)
+            return None
+
+        lease = CreditLease(
+            allowed=entitlement["allowed"],
+            balance=entitlement["balance"],
+            granted=self._grant_for(entitlement["allowed"], entitlement["balance"]),
+        )
+        if old is not None:
+            # Usage recorded while the renewal was in flight still needs reporting
+            if old.pending:
+                lease.used = old.pending
+                lease.pending = old.pending
+            # Requests still holding a credit from the old lease spend it from this one
+            lease.reserved = old.reserved
+        self._leases[key] = lease
+        return lease
+
+    async def _get_lease(self, customer_id: str, feature_id: str) -> Optional[CreditLease]:
+        """Return a live lease for a customer, renewing it at most once concurrently."""
+        key = (customer_id, feature_id)
+        lease = self._leases.get(key)
+        if lease is not None and not self._lease_expired(lease):
+            return lease
+
+        lock = self._lease_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            lease = self._leases.get(key)
+            if lease is not None and not self._lease_expired(lease):
+                return lease
+            return await self._renew_lease(key)
+
+    def _prune_leases(self):
+        """Forget expired leases (and their locks) that have nothing left to report or release."""
+        def renewing(key) -> bool:
+            lock = self._lease_locks.get(key)
+            return lock is not None and lock.locked()
+
+        for key in [
+            key for key, lease in self._leases.items()
+            if lease.pending == 0 and lease.reserved == 0 and self._lease_expired(lease) and not renewing(key)
+        ]:
+            del self._leases[key]
+        for key in [key for key in self._lease_locks if key not in self._leases and not renewing(key)]:
+            del self._lease_locks[key]
+
+    async def flush(self):
+        """Report all pending ledger usage to Autumn, one aggregated event per customer."""
+        self._prune_leases()
+        batch = [
+            (key, self._take_pending(lease))
+            for key, lease in self._leases.items()
+            if lease.pending > 0
+        ]
+        if not batch:
+            return
+
+        results = await asyncio.gather(
+            *(self._send_event(key[0], key[1], delta) for key, delta in batch),
+            return_exceptions=True,
+        )
+        for (key, delta), result in zip(batch, results):
+            if isinstance(result, Exception):
+                logger.error(f"Autumn error reconciling usage for {key[0]}: {result}")
+                self._restore_pending(key, delta)
+        logger.debug(f"Reconciled usage for {len(batch)} customer(s) with Autumn")
+
+    async def _flush_loop(self):
+        """Periodically reconcile ledger usage with Autumn."""
+        while True:
+            await asyncio.sleep(settings.autumn_flush_interval_seconds)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Credit ledger flush failed: {e}")
+
+    # ─── Response cache ───────────────────────────────────────────────────
+
+    @staticmethod
+    def _cache_get(cache: Dict, key) -> Optional[Dict[str, Any]]:
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at >= settings.autumn_cache_ttl_seconds:
+            cache.pop(key, None)
+            return None
+        return value
+
+    @staticmethod
+    def _cache_put(cache: Dict, key, value: Dict[str, Any]):
+        now = time.monotonic()
+        if len(cache) >= CACHE_MAX_ENTRIES:
+            ttl = settings.autumn_cache_ttl_seconds
+            for k in [k for k, (t, _) in cache.items() if now - t >= ttl]:
+                del cache[k]
+            if len(cache) >= CACHE_MAX_ENTRIES:
+                cache.clear()
+        cache[key] = (now, value)
+
+    def _cache_generation(self, customer_id: str) -> Tuple[int, int]:
+        return self._cache_epoch, self._cache_generations.get(customer_id, 0)
+
+    def invalidate_customer(self, customer_id: str, feature_id: str = "detections"):
+        """Drop cached balance and plan info for a customer, including any fetch still in flight."""
+        self._balance_cache.pop((customer_id, feature_id), None)
+        self._customer_cache.pop(customer_id, None)
+        if len(self._cache_generations) >= CACHE_MAX_ENTRIES:
+            self._cache_generations.clear()
+            self._cache_epoch += 1
+        self._cache_generations[customer_id] = self._cache_generations.get(customer_id, 0) + 1
+
+    # ─── Public API ───────────────────────────────────────────────────────
+
+    async def check_credits(
+        self, customer_id: str, feature_id: str = "detections", reserve: bool = True
+    ) -> Dict[str, Any]:
         """
         Check if a customer has remaining credits for a feature.
+        With the ledger enabled and `reserve` set, an allowed check holds one credit
+        until track_usage() spends it or release_credits() hands it back.
         Returns {"allowed": bool, "balance": int|None}
         """
         if not self.enabled:
             return {"allowed": True, "balance": None}
 
-        try:
-            response = await self.client.get(
-                "/entitled",
-                params={"customer_id": customer_id, "feature_id": feature_id},
-            )
-            response.raise_for_status()
-            data = response.json()
+        if self.ledger_enabled:
+            lease = await self._get_lease(customer_id, feature_id)
+            if lease is None:
+                # Fail open - allow the request if Autumn is down
+                return {"allowed": True, "balance": None}
+            allowed = lease.remaining > 0
+            if allowed and reserve:
+                lease.reserved += 1
+            balance = lease.local_balance
             return {
-                "allowed": data.get("allowed", False),
-                "balance": data.get("balance"),
+                "allowed": allowed,
+                "balance": max(balance, 0) if balance is not None else None,
             }
+
+        try:
+            return await self._fetch_entitlement(customer_id, feature_id)
         except httpx.HTTPStatusError as e:
             logger.error(f"Autumn API error checking credits: {e.response.status_code} {e.response.text}")
             # Fail open - allow the request if Autumn is down
@@ -72,21 +346,27 @@ class AutumnService:
     async def track_usage(self, customer_id: str, feature_id: str = "detections", delta: int = 1) -> bool:
         """
         Track usage (decrement credits) after a successful detection.
+        With the ledger enabled, usage is recorded locally and reported on the next flush.
         Returns True if tracking succeeded.
         """
         if not self.enabled:
             return True
 
+        self.invalidate_customer(customer_id, feature_id)
+
+        if self.ledger_enabled:
+            lease = self._leases.get((customer_id, feature_id))
+            if lease is None:
+                # No lease (Autumn was down at check time) - keep usage for the next flush
+                lease = CreditLease(allowed=True, balance=None, granted=0, leased_at=0.0)
+                self._leases[(customer_id, feature_id)] = lease
+            lease.reserved = max(0, lease.reserved - delta)
+            lease.used += delta
+            lease.pending += delta
+            return True
+
         try:
-            response = await self.client.post(
-                "/events",
-                json={
-                    "customer_id": customer_id,
-                    "feature_id": feature_id,
-                    "delta": delta,
-                },
-            )
-            response.raise_for_status()
+            await self._send_event(customer_id, feature_id, delta)
             return True
         except httpx.HTTPStatusError as e:
             logger.error(f"Autumn API error tracking usage: {e.response.status_code} {e.response.text}")
@@ -95,17 +375,48 @@ class AutumnService:
             logger.error(f"Autumn connection error: {e}")
             return False
 
+    def release_credits(self, customer_id: str, feature_id: str = "detections", delta: int = 1):
+        """Hand back credits reserved by check_credits() for a request that failed before using them."""
+        lease = self._leases.get((customer_id, feature_id))
+        if lease is not None:
+            lease.reserved = max(0, lease.reserved - delta)
+
+    async def get_balance(self, customer_id: str, feature_id: str = "detections") -> Dict[str, Any]:
+        """
+        Same as check_credits, but served from a short-TTL cache.
+        Intended for display (the /credits endpoint), not for gating detections.
+        """
+        cached = self._cache_get(self._balance_cache, (customer_id, feature_id))
+        if cached is not None:
+            return cached
+
+        generation = self._cache_generation(customer_id)
+        credit_info = await self.check_credits(customer_id, feature_id, reserve=False)
+        # Usage tracked while this was in flight makes the result stale
+        if credit_info.get("balance") is not None and self._cache_generation(customer_id) == generation:
+            self._cache_put(self._balance_cache, (customer_id, feature_id), credit_info)
+        return credit_info
+
     async def get_customer_info(self, customer_id: str) -> Optional[Dict[str, Any]]:
         """
         Get customer balance and plan information.
+        Results are cached for AUTUMN_CACHE_TTL_SECONDS.
         """
         if not self.enabled:
             return None
 
+        cached = self._cache_get(self._customer_cache, customer_id)
+        if cached is not None:
+            return cached
+
+        generation = self._cache_generation(customer_id)
         try:
             response = await self.client.get(f"/customers/{customer_id}")
             response.raise_for_status()
-            return response.json()
+            data = response.json()
+            if self._cache_generation(customer_id) == generation:
+                self._cache_put(self._customer_cache, customer_id, data)
+            return data
         except Exception as e:
             logger.error(f"Autumn error fetching customer: {e}")
             return None
@@ -134,8 +445,17 @@ class AutumnService:
             return None
 
     async def close(self):
-        """Close the HTTP client."""
+        """Stop the ledger flusher, reconcile outstanding usage and close the HTTP client."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
         if self.client:
+            if self.ledger_enabled:
+                await self.flush()
             await self.client.aclose()
 
 
@@ -0,0 +1,78 @@
+"""
+SafeVision API - Streaming Base64 Decoder
+Decodes base64 payloads chunk by chunk into a single preallocated buffer,
+so large uploads are never held as more than one full decoded copy.
+"""
+
+import binascii
+from typing import Union
+
+# Encoded characters decoded per step
+CHUNK_CHARS = 1024 * 1024
+
+# Everything a2b_base64 would skip (whitespace, line breaks, stray symbols), removed
+# up front so it can't shift the 4-character quanta between chunks
+_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+_NON_ALPHABET = bytes(c for c in range(256) if c not in _ALPHABET)
+
+
+def decoded_size_upper_bound(encoded_length: int) -> int:
+    """Maximum number of bytes `encoded_length` base64 characters can decode to."""
+    return (encoded_length + 3) // 4 * 3
+
+
+class Base64StreamDecoder:
+    """
+    Incremental base64 decoder writing into one preallocated bytearray.
+
+    Feed encoded text with `feed()` (any chunk size), then call `finish()` to
+    get the decoded bytes. The buffer is sized from the expected encoded length
+    up front; feeding more than that raises ValueError.
+    """
+
+    def __init__(self, encoded_length: int):
+        self._buffer = bytearray(decoded_size_upper_bound(encoded_length))
+        self._view = memoryview(self._buffer)
+        self._pos = 0
+        self._tail = b""
+
+    def _write(self, encoded: bytes):
+        decoded = binascii.a2b_base64(encoded)
+        end = self._pos + len(decoded)
+        if end > len(self._buffer):
+            raise ValueError("Base64 payload is longer than declared")
+        self._view[self._pos:end] = decoded
+        self._pos = end
+
+    def feed(self, chunk: Union[str, bytes]):
+        """Decode as many complete 4-character quanta of `chunk` as possible; the rest carries over."""
+        if isinstance(chunk, str):
+            chunk = chunk.encode("ascii")
+        chunk = chunk.translate(None, _NON_ALPHABET)
+        if self._tail:
+            chunk = self._tail + chunk
+        usable = len(chunk) - len(chunk) % 4
+        self._tail = chunk[usable:]
+        if usable:
+            self._write(chunk[:usable])
+
+    def finish(self) -> bytearray:
+        """Flush remaining input and return the decoded data (the buffer itself, trimmed)."""
+        if self._tail:
+            raise ValueError("Truncated base64 payload")
+        self._view.release()
+        del self._buffer[self._pos:]
+        return self._buffer
+
+
+def decode_base64(data: str, start: int = 0) -> bytearray:
+    """
+    Decode `data[start:]` in CHUNK_CHARS steps into a single buffer, without
+    slicing off the whole payload first (so data URI headers cost no copy).
+    Accepts the same input as base64.b64decode, including line-wrapped payloads.
+    Raises ValueError (or binascii.Error) on malformed input.
+    """
+    decoder = Base64StreamDecoder(len(data) - start)
+    for pos in range(start, len(data), CHUNK_CHARS):
+        decoder.feed(data[pos:pos + CHUNK_CHARS])
+    return decoder.finish()
@@ -84,6 +84,31 @@ def get_label_category(label: str) -> str:
     return "other"
 
 
+RISK_PRIORITY = ["SAFE", "LOW", "MODERATE", "HIGH", "CRITICAL"]
+
+
+def _build_result(img_width: int, img_height: int, detections: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Assemble the detect() result dict, including the risk summary, from final detections."""
+    risk_distribution: Dict[str, int] = {}
+    highest_risk = "SAFE"
+    for d in detections:
+        risk = d["risk_level"]
+        risk_distribution[risk] = risk_distribution.get(risk, 0) + 1
+        if RISK_PRIORITY.index(risk) > RISK_PRIORITY.index(highest_risk):
+            highest_risk = risk
+
+    return {
+        "image_dimensions": {"width": img_width, "height": img_height},
+        "detections": detections,
+        "detection_count": len(detections),
+        "risk_summary": {
+            "overall_risk": highest_risk,
+            "is_safe": highest_risk in ["SAFE", "LOW"],
+            "distribution": risk_distribution,
+        },
+    }
+
+
 # ─── Image preprocessing ─────────────────────────────────────────────────────
 
 def _read_image(image_path: str, target_size: int = 320):
@@ -271,9 +296,6 @@ class DetectorService:
 
         # Apply threshold and build response
         rules = blur_rules or DEFAULT_BLUR_RULES
-        risk_distribution: Dict[str, int] = {}
-        highest_risk = "SAFE"
-        risk_priority = ["SAFE", "LOW", "MODERATE", "HIGH", "CRITICAL"]
 
         detections = []
         for d in raw_detections:
@@ -282,10 +304,6 @@ class DetectorService:
 
             label = d["class"]
             risk = get_risk_level(label)
-            risk_distribution[risk] = risk_distribution.get(risk, 0) + 1
-
-            if risk_priority.index(risk) > risk_priority.index(highest_risk):
-                highest_risk = risk
 
             # Clamp bounding box to image bounds
             bx, by, bw, bh = d["box"]
@@ -324,16 +342,36 @@ class DetectorService:
                 "contour": contour,
             })
 
-        return {
-            "image_dimensions": {"width": img_width, "height": img_height},
-            "detections": detections,
-            "detection_count": len(detections),
-            "risk_summary": {
-                "overall_risk": highest_risk,
-                "is_safe": highest_risk in ["SAFE", "LOW"],
-                "distribution": risk_distribution,
-            },
-        }
+        return _build_result(img_width, img_height, detections)
+
+    def rebuild_result(
+        self,
+        image_dimensions: Dict[str, int],
+        stored_detections: List[Dict[str, Any]],
+        threshold: float = 0.25,
+        blur_rules: Optional[Dict[str, bool]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Rebuild a detect() result from detections stored by an earlier run on the same image.
+        The stored run must have used a threshold <= `threshold`; blur rules are re-applied.
+        """
+        rules = blur_rules or DEFAULT_BLUR_RULES
+
+        detections = []
+        for d in stored_detections:
+            if d["confidence"] < threshold:
+                continue
+            label = d["label"]
+            detections.append({
+                "label": label,
+                "confidence": d["confidence"],
+                "risk_level": d["risk_level"],
+                "bbox": d["bbox"],
+                "should_blur": rules.get(label, "EXPOSED" in label),
+                "contour": d.get("contour"),
+            })
+
+        return _build_result(image_dimensions["width"], image_dimensions["height"], detections)
 
 
 # Singleton instance
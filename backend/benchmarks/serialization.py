@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+SafeVision API - Response Serialization Benchmark
+Compares the previous detect response path (pydantic model built from detector
+dicts, then FastAPI's response_model round-trip and stdlib json) against the
+orjson fast path in app.responses, plus stdlib json vs orjson for the compute
+server's raw result dicts.
+
+Usage (from backend/):
+    python -m benchmarks.serialization [--iterations 2000]
+"""
+
+import sys
+import os
+import json
+import math
+import random
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from app.models import DetectionResponse
+from app.responses import FastJSONResponse, detection_response_payload
+
+LABELS = ["FACE_FEMALE", "FEMALE_BREAST_EXPOSED", "BUTTOCKS_EXPOSED", "FEET_COVERED", "BELLY_EXPOSED"]
+RISKS = {"FACE_FEMALE": "SAFE", "FEMALE_BREAST_EXPOSED": "HIGH", "BUTTOCKS_EXPOSED": "MODERATE",
+         "FEET_COVERED": "SAFE", "BELLY_EXPOSED": "LOW"}
+
+
+def _contour(x: int, y: int, w: int, h: int, num_points: int = 36):
+    cx, cy, rx, ry = x + w / 2, y + h / 2, w / 2, h / 2
+    return [
+        [int(cx + rx * math.cos(2 * math.pi * i / num_points)),
+         int(cy + ry * math.sin(2 * math.pi * i / num_points))]
+        for i in range(num_points)
+    ]
+
+
+def make_result(count: int, seed: int = 0) -> dict:
+    """Build a DetectorService-shaped result with `count` detections, each with a 36-point contour."""
+    rng = random.Random(seed)
+    detections = []
+    distribution = {}
+    for _ in range(count):
+        label = rng.choice(LABELS)
+        x, y = rng.randint(0, 1500), rng.randint(0, 800)
+        w, h = rng.randint(40, 400), rng.randint(40, 400)
+        risk = RISKS[label]
+        distribution[risk] = distribution.get(risk, 0) + 1
+        detections.append({
+            "label": label,
+            "confidence": round(rng.uniform(0.25, 0.99), 4),
+            "risk_level": risk,
+            "bbox": {"x": x, "y": y, "width": w, "height": h},
+            "should_blur": "EXPOSED" in label,
+            "contour": _contour(x, y, w, h),
+        })
+    return {
+        "image_dimensions": {"width": 1920, "height": 1080},
+        "detections": detections,
+        "detection_count": count,
+        "risk_summary": {"overall_risk": "HIGH", "is_safe": False, "distribution": distribution},
+    }
+
+
+def previous_path(result: dict) -> bytes:
+    """Route builds the model, FastAPI dumps/re-validates/serializes it, JSONResponse renders with json."""
+    model = DetectionResponse(
+        status="success", detection_id=None, image_url=None,
+        image_dimensions=result["image_dimensions"], detections=result["detections"],
+        detection_count=result["detection_count"], risk_summary=result["risk_summary"],
+        credits_remaining=None,
+    )
+    validated = DetectionResponse.model_validate(model.model_dump())
+    content = jsonable_encoder(validated.model_dump(mode="json"))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(result: dict) -> bytes:
+    return FastJSONResponse(detection_response_payload(result, None, None, None)).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detect response serialization")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    # Both paths must produce the same document
+    sample = make_result(5)
+    assert json.loads(previous_path(sample)) == json.loads(fast_path(sample))
+
+    cases = [("typical (3 detections)", 3), ("busy (20 detections)", 20), ("worst case (100 detections)", 100)]
+    print(f"{'case':<30}{'payload':>10}{'previous':>14}{'fast path':>14}{'speedup':>10}")
+    for name, count in cases:
+        result = make_result(count)
+        n = max(50, args.iterations // max(1, count // 5))
+        prev = min(timeit.repeat(lambda: previous_path(result), number=n, repeat=3)) / n
+        fast = min(timeit.repeat(lambda: fast_path(result), number=n, repeat=3)) / n
+        size = len(fast_path(result))
+        print(f"{name:<30}{size / 1024:>8.1f}KB{prev * 1e6:>12.1f}us{fast * 1e6:>12.1f}us{prev / fast:>9.1f}x")
+
+    print("\nCompute server (raw result dict):")
+    print(f"{'case':<30}{'json':>14}{'orjson':>14}{'speedup':>10}")
+    for name, count in cases:
+        result = make_result(count)
+        n = max(50, args.iterations // max(1, count // 5))
+        std = min(timeit.repeat(lambda: json.dumps(result).encode("utf-8"), number=n, repeat=3)) / n
+        orj = min(timeit.repeat(lambda: orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY), number=n, repeat=3)) / n
+        print(f"{name:<30}{std * 1e6:>12.1f}us{orj * 1e6:>12.1f}us{std / orj:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+SafeVision API - Test fixtures
+Run from backend/:  python -m pytest tests
+"""
+
+import sys
+import os
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+
+
+class FakeAutumn:
+    """
+    In-memory stand-in for the Autumn API (/entitled, /events, /customers).
+
+    `balances` maps (customer_id, feature_id) to a balance (None = unlimited),
+    `overage` lists customers that stay allowed past a zero balance,
+    `failing` makes every endpoint answer 503 and `delay` holds GET answers
+    back by that many seconds after they are computed.
+    """
+
+    def __init__(self):
+        self.balances = {}
+        self.overage = set()
+        self.failing = False
+        self.delay = 0.0
+        self.requests = []  # (method, endpoint, params or body)
+        self.lock = threading.Lock()
+
+    def calls(self, endpoint):
+        with self.lock:
+            return [payload for _, name, payload in self.requests if name == endpoint]
+
+    def entitled(self, customer_id, feature_id):
+        balance = self.balances.get((customer_id, feature_id), 0)
+        allowed = balance is None or balance > 0 or customer_id in self.overage
+        return {"allowed": allowed, "balance": balance}
+
+    def track(self, customer_id, feature_id, delta):
+        key = (customer_id, feature_id)
+        if self.balances.get(key, 0) is not None:
+            self.balances[key] = self.balances.get(key, 0) - delta
+
+
+def _handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            endpoint = url.path.rsplit("/v1", 1)[-1]
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            with fake.lock:
+                fake.requests.append(("GET", endpoint.split("/")[1], params))
+                if fake.failing:
+                    status, body = 503, {"error": "unavailable"}
+                elif endpoint == "/entitled":
+                    status, body = 200, fake.entitled(params["customer_id"], params["feature_id"])
+                elif endpoint.startswith("/customers/"):
+                    status, body = 200, {"id": endpoint.split("/")[-1]}
+                else:
+                    status, body = 404, {"error": "not found"}
+            # The answer reflects the state when the request arrived, like a slow network
+            time.sleep(fake.delay)
+            self._reply(status, body)
+
+        def do_POST(self):
+            endpoint = urlparse(self.path).path.rsplit("/v1", 1)[-1]
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            with fake.lock:
+                fake.requests.append(("POST", endpoint.lstrip("/"), body))
+                if fake.failing:
+                    return self._reply(503, {"error": "unavailable"})
+                if endpoint == "/events":
+                    fake.track(body["customer_id"], body["feature_id"], body["delta"])
+                    return self._reply(200, {"success": True})
+            self._reply(404, {"error": "not found"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def fake_autumn():
+    """A FakeAutumn served over HTTP on a local port."""
+    fake = FakeAutumn()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(fake))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    fake.url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    yield fake
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def autumn_settings(fake_autumn, monkeypatch):
+    """Point the credit service at the fake server with a small ledger."""
+    monkeypatch.setattr(settings, "autumn_enabled", True)
+    monkeypatch.setattr(settings, "autumn_secret_key", "test-key")
+    monkeypatch.setattr(settings, "autumn_base_url", fake_autumn.url)
+    monkeypatch.setattr(settings, "autumn_lease_size", 5)
+    monkeypatch.setattr(settings, "autumn_lease_ttl_seconds", 30.0)
+    monkeypatch.setattr(settings, "autumn_max_overspend", 0)
+    monkeypatch.setattr(settings, "autumn_flush_interval_seconds", 3600.0)
+    monkeypatch.setattr(settings, "autumn_cache_ttl_seconds", 15.0)
+    return settings
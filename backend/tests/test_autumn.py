@@ -0,0 +1,240 @@
+"""
+Credit ledger tests against a local fake Autumn server (see conftest.FakeAutumn).
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.autumn import AutumnService
+
+CUSTOMER = "cus_1"
+FEATURE = "detections"
+
+
+def run(scenario):
+    """Run `scenario(service)` on a fresh, initialized AutumnService and close it afterwards."""
+    async def main():
+        service = AutumnService()
+        service.initialize()
+        try:
+            return await scenario(service)
+        finally:
+            await service.close()
+    return asyncio.run(main())
+
+
+@pytest.fixture(autouse=True)
+def _settings(autumn_settings):
+    pass
+
+
+def test_lease_serves_checks_locally(fake_autumn):
+    fake_autumn.balances[(CUSTOMER, FEATURE)] = 100
+
+    async def scenario(service):
+        results = []
+        for _ in range(5):
+            results.append(await service.check_credits(CUSTOMER))
+            await service.track_usage(CUSTOMER)
+        return results
+
+    results = run(scenario)
+    assert all(r["allowed"] for r in results)
+    # One lease of 5 credits covers all five requests
+    assert len(fake_autumn.calls("entitled")) == 1
+
+
+def test_local_decrement_without_events(fake_autumn):
+    fake_autumn.balances[(CUSTOMER, FEATURE)] = 100
+
+    async def scenario(service):
+        balances = []
+        for _ in range(3):
+            balances.append((await service.check_credits(CUSTOMER))["balance"])
+            await service.track_usage(CUSTOMER)
+        events_before_close = len(fake_autumn.calls("events"))
+        return balances, events_before_close
+
+    balances, events_before_close = run(scenario)
+    assert balances == [100, 99, 98]
+    assert events_before_close == 0
+
+
+def test_flush_sends_one_aggregated_event_per_customer(fake_autumn):
+    fake_autumn.balances[(CUSTOMER, FEATURE)] = 100
+    fake_autumn.balances[("cus_2", FEATURE)] = 100
+
+    async def scenario(service):
+        for customer, uses in ((CUSTOMER, 4), ("cus_2", 2)):
+            for _ in range(uses):
+                await service.check_credits(customer)
+                await service.track_usage(customer)
+        await service.flush()
+        return fake_autumn.calls("events")
+
+    events = run(scenario)
+    assert sorted((e["customer_id"], e["delta"]) for e in events) == [(CUSTOMER, 4), ("cus_2", 2)]
+    assert fake_autumn.balances[(CUSTOMER, FEATURE)] == 96
+    assert fake_autumn.balances[("cus_2", FEATURE)] == 98
+
+
+def test_flush_loop_reports_on_a_timer(fake_autumn, autumn_settings, monkeypatch):
+    monkeypatch.setattr(autumn_settings, "autumn_flush_interval_seconds", 0.05)
+    fake_autumn.balances[(CUSTOMER, FEATURE)] = 100
+
+    async def scenario(service):
+        await service.check_credits(CUSTOMER)
+        await service.track_usage(CUSTOMER)
+        await asyncio.sleep(0.3)
+        return fake_autumn.calls("events")
+
+    assert [e["delta"] for e in run(scenario)] == [1]
+
+
+def test_close_flushes_pending_usage(fake_autumn):
+    fake_autumn.balances[(CUSTOMER, FEATURE)] = 100
+
+    async def scenario(service):
+        for _ in range(3):
+            await service.check_credits(CUSTOMER)
+            await service.track_usage(CUSTOMER)
+
+    run(scenario)
+    assert [e["delta"] for e in fake_autumn.calls("events")] == [3]
+    assert fake_autumn.balances[(CUSTOMER, FEATURE)] == 97
+
+
+def test_concurrent_checks_never_exceed_the_balance(fake_autumn):
+    fake_autumn.balances[(CUSTOMER, FEATURE)] = 3
+
+    async def scenario(service):
+        results = await asyncio.gather(*(service.check_credits(CUSTOMER) for _ in range(10)))
+        return [r["allowed"] for r in results]
+
+    assert sum(run(scenario)) == 3
+
+
+def test_over_spend_bound(fake_autumn, autumn_settings, monkeypatch):
+    monkeypatch.setattr(autumn_settings, "autumn_max_overspend", 2)
+    fake_autumn.balances[(CUSTOMER, FEATURE)] = 1
+
+    async def scenario(service):
+        allowed = 0
+        for _ in range(10):
+            if (await service.check_credits(CUSTOMER))["allowed"]:
+                allowed += 1
+                await service.track_usage(CUSTOMER)
+        return allowed
+
+    assert run(scenario) == 3
+    assert fake_autumn.balances[(CUSTOMER, FEATURE)] == -2
+
+
+def test_released_credit_can_be_used_again(fake_autumn):
+    fake_autumn.balances[(CUSTOMER, FEATURE)] = 1
+
+    async def scenario(service):
+        first = await service.check_credits(CUSTOMER)
+        blocked = await service.check_credits(CUSTOMER)
+        # The first request failed, so its credit goes back to the lease
+        service.release_credits(CUSTOMER)
+        retry = await service.check_credits(CUSTOMER)
+        await service.track_usage(CUSTOMER)
+        return first["allowed"], blocked["allowed"], retry["allowed"]
+
+    assert run(scenario) == (True, False, True)
+    assert [e["delta"] for e in fake_autumn.calls("events")] == [1]
+
+
+def test_balance_display_does_not_reserve(fake_autumn):
+    fake_autumn.balances[(CUSTOMER, FEATURE)] = 1
+
+    async def scenario(service):
+        for _ in range(3):
+            await service.get_balance(CUSTOMER)
+        return await service.check_credits(CUSTOMER)
+
+    assert run(scenario)["allowed"]
+
+
+def test_out_of_credits_is_denied(fake_autumn):
+    fake_autumn.balances[(CUSTOMER, FEATURE)] = 0
+
+    async def scenario(service):
+        return [(await service.check_credits(CUSTOMER))["allowed"] for _ in range(3)]
+
+    assert run(scenario) == [False, False, False]
+    # The empty lease is kept until its TTL, so denials don't hit Autumn either
+    assert len(fake_autumn.calls("entitled")) == 1
+
+
+def test_overage_plan_is_allowed_past_zero_balance(fake_autumn):
+    fake_autumn.balances[(CUSTOMER, FEATURE)] = 0
+    fake_autumn.overage.add(CUSTOMER)
+
+    async def scenario(service):
+        allowed = []
+        for _ in range(3):
+            allowed.append((await service.check_credits(CUSTOMER))["allowed"])
+            await service.track_usage(CUSTOMER)
+        return allowed
+
+    assert run(scenario) == [True, True, True]
+    assert len(fake_autumn.calls("entitled")) == 1
+
+
+def test_fail_open_keeps_usage_for_later(fake_autumn):
+    fake_autumn.failing = True
+    fake_autumn.balances[(CUSTOMER, FEATURE)] = 100
+
+    async def scenario(service):
+        result = await service.check_credits(CUSTOMER)
+        await service.track_usage(CUSTOMER)
+        await service.flush()
+        failed_events = len(fake_autumn.calls("events"))
+        # Autumn comes back: the usage recorded while it was down is reported
+        fake_autumn.failing = False
+        await service.flush()
+        return result, failed_events
+
+    result, failed_events = run(scenario)
+    assert result == {"allowed": True, "balance": None}
+    assert failed_events == 1
+    assert fake_autumn.balances[(CUSTOMER, FEATURE)] == 99
+
+
+def test_idle_leases_are_pruned_on_flush(fake_autumn, autumn_settings, monkeypatch):
+    fake_autumn.balances[(CUSTOMER, FEATURE)] = 100
+
+    async def scenario(service):
+        await service.check_credits(CUSTOMER)
+        await service.track_usage(CUSTOMER)
+        await service.flush()
+        kept = (CUSTOMER, FEATURE) in service._leases
+        monkeypatch.setattr(autumn_settings, "autumn_lease_ttl_seconds", 0.0)
+        await service.flush()
+        return kept, dict(service._leases), dict(service._lease_locks)
+
+    kept, leases, locks = run(scenario)
+    assert kept
+    assert leases == {} and locks == {}
+
+
+def test_invalidation_discards_balance_fetched_in_flight(fake_autumn, autumn_settings, monkeypatch):
+    monkeypatch.setattr(autumn_settings, "autumn_lease_size", 0)
+    fake_autumn.balances[(CUSTOMER, FEATURE)] = 10
+    fake_autumn.delay = 0.2
+
+    async def scenario(service):
+        in_flight = asyncio.create_task(service.get_balance(CUSTOMER))
+        await asyncio.sleep(0.05)
+        # A detection is tracked while the balance request is still out
+        await service.track_usage(CUSTOMER)
+        stale = await in_flight
+        fake_autumn.delay = 0.0
+        return stale, await service.get_balance(CUSTOMER)
+
+    stale, fresh = run(scenario)
+    assert stale["balance"] == 10
+    assert fresh["balance"] == 9
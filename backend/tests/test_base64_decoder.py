@@ -0,0 +1,57 @@
+"""
+Streaming base64 decoder tests: results must match base64.b64decode on the whole string.
+"""
+
+import base64
+import os
+
+import pytest
+
+from app.services import base64_decoder
+from app.services.base64_decoder import Base64StreamDecoder, decode_base64
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # Small chunks so every payload spans many of them
+    monkeypatch.setattr(base64_decoder, "CHUNK_CHARS", 7)
+
+
+def test_plain_payload():
+    raw = os.urandom(1000)
+    assert decode_base64(base64.b64encode(raw).decode()) == raw
+
+
+@pytest.mark.parametrize("separator", ["\n", "\r\n", " ", "\t", " \n "])
+def test_embedded_whitespace_keeps_alignment(separator):
+    raw = os.urandom(997)
+    encoded = base64.b64encode(raw).decode()
+    wrapped = separator.join(encoded[i:i + 5] for i in range(0, len(encoded), 5))
+    assert decode_base64(wrapped) == base64.b64decode(wrapped) == raw
+
+
+def test_stray_characters_are_skipped_like_b64decode():
+    raw = os.urandom(300)
+    encoded = base64.b64encode(raw).decode()
+    noisy = "".join(c + ("!" if i % 3 == 0 else "") for i, c in enumerate(encoded))
+    assert decode_base64(noisy) == base64.b64decode(noisy) == raw
+
+
+def test_start_offset_skips_data_uri_header():
+    raw = os.urandom(64)
+    data = "data:image/png;base64," + base64.b64encode(raw).decode()
+    assert decode_base64(data, start=data.index(",") + 1) == raw
+
+
+def test_remainder_carries_between_feeds():
+    raw = os.urandom(50)
+    encoded = base64.b64encode(raw)
+    decoder = Base64StreamDecoder(len(encoded))
+    for i in range(0, len(encoded), 3):
+        decoder.feed(encoded[i:i + 3] + b"\n")
+    assert decoder.finish() == raw
+
+
+def test_truncated_payload_is_rejected():
+    with pytest.raises(ValueError):
+        decode_base64(base64.b64encode(os.urandom(10)).decode()[:-1])
@@ -10,6 +10,7 @@ import logging
 import tempfile
 from typing import Optional
 
+import orjson
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Depends, Request
 from fastapi.responses import JSONResponse
 
@@ -32,6 +33,14 @@ app = FastAPI(
 
 START_TIME = time.time()
 
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson — contour-heavy detect payloads serialize ~10x faster."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
 # ─── API Key Dependency ──────────────────────────────────────────────────────
 
 async def verify_compute_key(request: Request):
@@ -93,7 +102,7 @@ async def detect(
         tmp.close()
 
         result = detector_service.detect(tmp.name, threshold=threshold)
-        return JSONResponse(content=result)
+        return FastJSONResponse(content=result)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e: